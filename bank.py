@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+"""Load sharing and circulating current of banks of parallel single-phase transformers, batched over banks and loads."""
+import argparse
+import itertools
+import sys
+
+import numpy as np
+
+import circuit
+import engine
+
+
+# Unit parameters of a bank, arrays with the units of each bank on the last axis
+BANK_FIELDS = ('turns_ratio', 'vs', 'i2_rated', 'r_eq_sec', 'x_eq_sec', 'g_phi_sec')
+
+# Quantities of the whole bank (shape of the banks and load cases)
+BANK_SOLUTION_FIELDS = ('v2_nl', 'v2', 'vr', 'i_load', 'p_out', 'p_cu', 'p_core', 'p_in', 'eta')
+# Quantities of each unit (bank shape followed by the units)
+UNIT_SOLUTION_FIELDS = ('i_unit', 'loading', 'share', 'i_circulating', 'circulating_pu', 'p_unit_out',
+						'p_unit_cu', 'p_unit_core')
+
+
+class Bank:
+	"""Secondary-referred parameters of the units of one or many banks, shape (..., units).
+
+	The units' primaries share one bus and their secondaries another. Leading
+	axes index banks; all arrays broadcast against each other.
+	"""
+	__slots__ = BANK_FIELDS
+
+	def __init__(self, **values):
+		for name in self.__slots__:
+			setattr(self, name, np.asarray(values[name], dtype=np.float64))
+
+	def __repr__(self):
+		return f"Bank(shape={self.shape})"
+
+	@property
+	def shape(self):
+		return np.broadcast(*(getattr(self, name) for name in self.__slots__)).shape
+
+	@property
+	def v1_rated(self):
+		"""Rated primary voltage of each unit: a * Vs."""
+		return self.turns_ratio * self.vs
+
+	@classmethod
+	def from_results(cls, results):
+		"""One bank of engine.TransformerResult units."""
+		if len(results) < 2:
+			raise ValueError('A bank needs at least two units.')
+		return cls(**{name: [circuit.column(result, name) for result in results] for name in BANK_FIELDS})
+
+	@classmethod
+	def from_batch(cls, result, vs, members):
+		"""Banks drawn from the records of a vectorized.BatchResult and their rated secondary voltages vs.
+
+		members is an integer array (banks, units) of record indices, e.g. from
+		candidate_banks().
+		"""
+		members = np.asarray(members, dtype=np.intp)
+		if members.ndim != 2 or members.shape[1] < 2:
+			raise ValueError('members must be a (banks, units) array with at least two units per bank.')
+		values = {name: circuit.column(result, name) for name in BANK_FIELDS if name != 'vs'}
+		values['vs'] = np.asarray(vs, dtype=np.float64)
+		return cls(**{name: np.broadcast_to(column, (len(result),))[members] for name, column in values.items()})
+
+
+def candidate_banks(count, size):
+	"""(banks, size) array of every combination of size units out of count."""
+	if not 2 <= size <= count:
+		raise ValueError('A bank needs at least two units, and no more than there are.')
+	return np.array(list(itertools.combinations(range(count), size)), dtype=np.intp).reshape(-1, size)
+
+
+class ParallelSolution:
+	"""Bus voltages (V), currents (A), powers (W), VR and η (%) of banks in parallel operation.
+
+	Bank quantities have the broadcast shape of the banks and load cases; unit
+	quantities add the units as a last axis. loading and circulating_pu are per
+	unit of each unit's rated current, share is each unit's fraction of the
+	delivered real power. i_circulating is the current that flows between the
+	units at no load. NaN where the bank cannot supply the load.
+	"""
+	__slots__ = BANK_SOLUTION_FIELDS + UNIT_SOLUTION_FIELDS
+
+	def __init__(self, **values):
+		for name in self.__slots__:
+			setattr(self, name, values[name])
+
+	def __repr__(self):
+		return f"ParallelSolution(shape={np.shape(self.v2)}, units={np.shape(self.i_unit)[-1]})"
+
+	def as_dict(self):
+		return {name: getattr(self, name) for name in self.__slots__}
+
+	@property
+	def overloaded(self):
+		"""Whether any unit carries more than its rated current."""
+		return (self.loading > 1.0).any(axis=-1)
+
+
+def solve(bank, load=1.0, pf=1.0, leading=False, v1=None):
+	"""Operating points of parallel banks: load sharing, circulating current and losses of each unit.
+
+	Each unit is its open-circuit EMF E = V1 / a behind its series impedance
+	Z_eq2, with the magnetizing branch at the primary as in the approximate
+	model. The node equation of the common secondary bus, Σ (E_k - V2) / Z_k =
+	I_load, reduces to the bank's Thevenin equivalent (Millman's theorem), so
+	every bank and load case is solved in closed form. load is a fraction of the
+	bank's rated current Σ I2,rated, and pf is the load power factor at the
+	secondary bus. load, pf, leading and v1 (primary bus voltage, default the
+	first unit's rated primary voltage) broadcast against the banks.
+	"""
+	shape = bank.shape
+	params = {name: np.broadcast_to(getattr(bank, name), shape) for name in BANK_FIELDS}
+	if v1 is None:
+		v1 = params['turns_ratio'][..., 0] * params['vs'][..., 0]
+	v1, load, pf, leading = np.broadcast_arrays(
+		np.asarray(v1, dtype=np.float64), np.asarray(load, dtype=np.float64),
+		np.clip(np.asarray(pf, dtype=np.float64), 0.0, 1.0), np.asarray(leading, dtype=bool))
+	sin_phi = np.where(leading, 1.0, -1.0) * np.sqrt(1.0 - pf * pf)
+
+	with np.errstate(divide='ignore', invalid='ignore'):
+		y = 1.0 / (params['r_eq_sec'] + 1j * params['x_eq_sec'])
+		# EMFs in phase with the primary bus voltage
+		e = v1[..., None] / params['turns_ratio']
+		y_sum = y.sum(axis=-1)
+		v_th = (e * y).sum(axis=-1) / y_sum
+		i_circulating = (e - v_th[..., None]) * y
+
+		# With V2 on the real axis, |V_th| = |V2 + Z_th * I_load| gives V2 in closed form
+		i_load = load * params['i2_rated'].sum(axis=-1) * (pf + 1j * sin_phi)
+		w = i_load / y_sum
+		v_th_mag = np.abs(v_th)
+		v2 = np.sqrt(v_th_mag * v_th_mag - w.imag ** 2) - w.real
+		# Rotate the EMFs into the frame of V2
+		rotation = (v2 + w) / v_th
+		i_unit = (e * rotation[..., None] - v2[..., None]) * y
+
+		p_unit_out = v2[..., None] * i_unit.real
+		p_unit_cu = np.abs(i_unit) ** 2 * params['r_eq_sec']
+		p_unit_core = np.abs(e) ** 2 * params['g_phi_sec']
+		p_out = v2 * np.abs(i_load) * pf
+		p_cu = p_unit_cu.sum(axis=-1)
+		p_core = p_unit_core.sum(axis=-1)
+		p_in = p_out + p_cu + p_core
+		i_rated = params['i2_rated']
+		return ParallelSolution(
+			v2_nl=v_th_mag, v2=v2, vr=np.where(v2 != 0, (v_th_mag - v2) / v2 * 100.0, np.nan),
+			i_load=np.abs(i_load), p_out=p_out, p_cu=p_cu, p_core=p_core, p_in=p_in,
+			eta=np.where(p_in != 0, p_out / p_in * 100.0, np.nan),
+			i_unit=np.abs(i_unit), loading=np.abs(i_unit) / i_rated,
+			share=np.where(p_out[..., None] != 0, p_unit_out / p_out[..., None], np.nan),
+			i_circulating=np.abs(i_circulating), circulating_pu=np.abs(i_circulating) / i_rated,
+			p_unit_out=p_unit_out, p_unit_cu=p_unit_cu, p_unit_core=p_unit_core)
+
+
+def run_cli(argv=None):
+	"""Print the load sharing of one bank of units given by their nameplate and test values."""
+	parser = argparse.ArgumentParser(
+		prog='bank.py', description='Load sharing and circulating current of parallel single-phase transformers.')
+	parser.add_argument('--unit', nargs=9, type=float, action='append', required=True,
+		metavar=('S', 'V1', 'V2', 'VOC', 'IOC', 'POC', 'VSC', 'ISC', 'PSC'),
+		help='nameplate and test values of one unit (repeat for each unit)')
+	parser.add_argument('--load', type=float, default=1.0, help="fraction of the bank's rated current (default: %(default)s)")
+	parser.add_argument('--pf', type=float, default=1.0, help='load power factor (default: %(default)s)')
+	parser.add_argument('--leading', action='store_true', help='leading power factor')
+	parser.add_argument('--v1', type=float, help="primary bus voltage (default: the first unit's rated primary voltage)")
+	args = parser.parse_args(argv)
+
+	try:
+		bank = Bank.from_results([engine.calculate(*values) for values in args.unit])
+	except (engine.CalculationError, ValueError) as e:
+		print(f"Error: {e}", file=sys.stderr)
+		return 1
+	solution = solve(bank, args.load, args.pf, args.leading, args.v1)
+	if not np.isfinite(solution.v2):
+		print('Error: The bank cannot supply this load.', file=sys.stderr)
+		return 1
+	print(f"Secondary bus: {solution.v2:.6g} V (no load {solution.v2_nl:.6g} V), VR = {solution.vr:.4f}%, "
+		  f"load {solution.i_load:.6g} A, η = {solution.eta:.4f}%")
+	print(f"{'unit':>4} {'current A':>12} {'loading':>9} {'share':>8} {'circulating A':>14} {'copper W':>12} {'core W':>10}")
+	for k in range(len(args.unit)):
+		print(f"{k + 1:>4} {solution.i_unit[k]:>12.6g} {solution.loading[k] * 100:>8.2f}% {solution.share[k] * 100:>7.2f}% "
+			  f"{solution.i_circulating[k]:>14.6g} {solution.p_unit_cu[k]:>12.6g} {solution.p_unit_core[k]:>10.6g}")
+	if solution.overloaded:
+		print('Warning: at least one unit is above its rated current.')
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(run_cli())
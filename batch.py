@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*-
+"""Streaming command-line batch mode: CSV/Parquet test records in, results out, constant memory."""
+import argparse
+import csv
+import os
+import sys
+import time
+
+import numpy as np
+
+import cache
+import circuit
+import metrics
+import store
+import vectorized
+
+
+DEFAULT_CHUNK_SIZE = 50000
+
+# Accepted input column names (case-insensitive) for each engine input
+COLUMN_ALIASES = {
+	'power': ('power', 's'),
+	'vp': ('vp', 'v1'),
+	'vs': ('vs', 'v2'),
+	'voc': ('voc',),
+	'ioc': ('ioc',),
+	'poc': ('poc',),
+	'vsc': ('vsc',),
+	'isc': ('isc',),
+	'psc': ('psc',),
+}
+
+
+class BatchStats:
+	"""Row counts and throughput of a finished batch run."""
+	__slots__ = ('rows', 'errors', 'seconds')
+
+	def __init__(self, rows=0, errors=0, seconds=0.0):
+		self.rows = rows
+		self.errors = errors
+		self.seconds = seconds
+
+	@property
+	def rows_per_second(self):
+		return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+	def __repr__(self):
+		return f"BatchStats(rows={self.rows}, errors={self.errors}, seconds={self.seconds:.3f})"
+
+
+def _map_columns(header):
+	"""Map engine input names to header positions; all other columns are passed through."""
+	lowered = [name.strip().lower() for name in header]
+	positions = {}
+	for field, aliases in COLUMN_ALIASES.items():
+		for alias in aliases:
+			if alias in lowered:
+				positions[field] = lowered.index(alias)
+				break
+		else:
+			raise ValueError(f"Input is missing a column for '{field}' (accepted names: {', '.join(aliases)}).")
+	used = set(positions.values())
+	passthrough = [(header[i], i) for i in range(len(header)) if i not in used]
+	return positions, passthrough
+
+
+def _to_float(values):
+	"""Convert a column of strings to float64, NaN where a value does not parse."""
+	try:
+		return np.array(values, dtype=np.float64)
+	except ValueError:
+		column = np.empty(len(values), dtype=np.float64)
+		for i, value in enumerate(values):
+			try:
+				column[i] = float(value)
+			except ValueError:
+				column[i] = np.nan
+		return column
+
+
+def iter_csv(path, chunk_size=DEFAULT_CHUNK_SIZE):
+	"""Yield (passthrough columns, input arrays) chunks from a CSV file with a header row."""
+	with open(path, newline='', encoding='utf-8-sig') as f:
+		reader = csv.reader(f)
+		header = next(reader, None)
+		if header is None:
+			return
+		positions, passthrough = _map_columns(header)
+		while True:
+			rows = [row for _, row in zip(range(chunk_size), reader)]
+			if not rows:
+				return
+			width = len(header)
+			# Short rows are padded so missing cells become input errors instead of exceptions
+			rows = [row if len(row) >= width else row + [''] * (width - len(row)) for row in rows]
+			inputs = {field: _to_float([row[i] for row in rows]) for field, i in positions.items()}
+			extra = {name: [row[i] for row in rows] for name, i in passthrough}
+			yield extra, inputs
+
+
+def iter_parquet(path, chunk_size=DEFAULT_CHUNK_SIZE):
+	"""Yield (passthrough columns, input arrays) chunks from a Parquet file (requires pyarrow)."""
+	try:
+		import pyarrow.parquet as pq
+	except ImportError:
+		raise RuntimeError('Parquet support requires pyarrow (pip install pyarrow).') from None
+	parquet = pq.ParquetFile(path)
+	positions, passthrough = _map_columns(parquet.schema_arrow.names)
+	for record_batch in parquet.iter_batches(batch_size=chunk_size):
+		columns = record_batch.columns
+		inputs = {}
+		for field, i in positions.items():
+			values = columns[i].to_numpy(zero_copy_only=False)
+			inputs[field] = _to_float(values) if values.dtype.kind in 'OUS' else values.astype(np.float64)
+		extra = {name: columns[i].to_pylist() for name, i in passthrough}
+		yield extra, inputs
+
+
+class CsvSink:
+	"""Incremental CSV writer; undefined outputs are written as empty cells."""
+	# 12 significant digits keeps far more precision than the GUI's 4 decimals at a fraction of repr()'s cost
+	FLOAT_FORMAT = '%.12g'
+
+	def __init__(self, path):
+		self._file = open(path, 'w', newline='', encoding='utf-8')
+		self._header_written = False
+		self._row_format = '%d,' + ','.join([self.FLOAT_FORMAT] * len(vectorized.OUTPUT_FIELDS))
+
+	def write(self, extra, result, inputs=None):
+		if not self._header_written:
+			csv.writer(self._file).writerow(list(extra) + ['error'] + list(vectorized.OUTPUT_FIELDS))
+			self._header_written = True
+		values = np.column_stack([result.error] + [getattr(result, name) for name in vectorized.OUTPUT_FIELDS])
+		has_nan = np.isnan(values).any(axis=1).tolist()
+		row_format = self._row_format
+		lines = []
+		for row, nan in zip(values.tolist(), has_nan):
+			if nan:
+				lines.append('%d,' % row[0] + ','.join('' if v != v else self.FLOAT_FORMAT % v for v in row[1:]))
+			else:
+				lines.append(row_format % tuple(row))
+		if extra:
+			prefixes = map(','.join, zip(*([_quote(str(v)) for v in column] for column in extra.values())))
+			lines = [prefix + ',' + line for prefix, line in zip(prefixes, lines)]
+		lines.append('')
+		self._file.write('\r\n'.join(lines))
+
+	def close(self):
+		self._file.close()
+
+
+def _quote(value):
+	"""Quote a passthrough CSV field only when it needs it."""
+	if any(c in value for c in ',"\r\n'):
+		return '"' + value.replace('"', '""') + '"'
+	return value
+
+
+class ParquetSink:
+	"""Incremental Parquet writer, one row group per chunk (requires pyarrow)."""
+	def __init__(self, path):
+		try:
+			import pyarrow as pa
+			import pyarrow.parquet as pq
+		except ImportError:
+			raise RuntimeError('Parquet support requires pyarrow (pip install pyarrow).') from None
+		self._pa = pa
+		self._pq = pq
+		self._path = path
+		self._writer = None
+
+	def write(self, extra, result, inputs=None):
+		pa = self._pa
+		arrays = dict(extra)
+		arrays['error'] = result.error
+		for name in vectorized.OUTPUT_FIELDS:
+			arrays[name] = getattr(result, name)
+		table = pa.table(arrays)
+		if self._writer is None:
+			self._writer = self._pq.ParquetWriter(self._path, table.schema)
+		self._writer.write_table(table)
+
+	def close(self):
+		if self._writer is not None:
+			self._writer.close()
+
+
+def is_parquet(path):
+	"""Whether a records file is Parquet (.parquet/.pq) rather than CSV, judged by its extension."""
+	return os.path.splitext(path)[1].lower() in ('.parquet', '.pq')
+
+
+def run(input_path, output_path, chunk_size=DEFAULT_CHUNK_SIZE, progress=None, model='approximate',
+		split=circuit.DEFAULT_SPLIT):
+	"""Evaluate every record of input_path into output_path, one chunk at a time.
+
+	model 'exact' takes the VR and efficiency columns from the exact T circuit
+	(see circuit.solve_exact()) instead of the faster approximate circuit.
+	progress, if given, is called with the running BatchStats after each chunk.
+	With metrics enabled, each chunk is timed under batch.read, batch.evaluate
+	and batch.write.
+	"""
+	if model not in circuit.MODES:
+		raise ValueError(f"Unknown model '{model}' (expected one of {', '.join(circuit.MODES)}).")
+	chunks = iter_parquet(input_path, chunk_size) if is_parquet(input_path) else iter_csv(input_path, chunk_size)
+	if store.is_store(output_path):
+		# Stores keep the inputs too, so their cases can be reopened
+		sink = store.StoreWriter(output_path, inputs=True)
+	else:
+		sink = ParquetSink(output_path) if is_parquet(output_path) else CsvSink(output_path)
+	stats = BatchStats()
+	start = time.perf_counter()
+	try:
+		read_start = metrics.clock()
+		for extra, inputs in chunks:
+			if metrics.enabled:
+				metrics.observe('batch.read', metrics.clock() - read_start)
+			# Test exports repeat the same units often, so each distinct record is computed once
+			with metrics.span('batch.evaluate'):
+				result = cache.evaluate_deduplicated(*(inputs[name] for name in vectorized.INPUT_FIELDS))
+				if model == 'exact':
+					result = circuit.exact_batch(result, inputs['vs'], split)
+			with metrics.span('batch.write'):
+				sink.write(extra, result, inputs)
+			metrics.count('batch.records', len(result))
+			stats.rows += len(result)
+			stats.errors += int(np.count_nonzero(result.error))
+			stats.seconds = time.perf_counter() - start
+			if progress is not None:
+				progress(stats)
+			read_start = metrics.clock()
+	finally:
+		sink.close()
+	stats.seconds = time.perf_counter() - start
+	return stats
+
+
+def run_cli(argv=None):
+	"""Parse command-line arguments, run the batch and report throughput on stderr."""
+	parser = argparse.ArgumentParser(
+		prog='batch.py',
+		description='Evaluate transformer OC/SC test records from a CSV or Parquet file.',
+		epilog='Error codes: ' + '; '.join(
+			f"{code} = {message}" for code, message in vectorized.ERROR_MESSAGES.items() if code))
+	parser.add_argument('input', help='input .csv or .parquet file with S, V1, V2, Voc, Ioc, Poc, Vsc, Isc, Psc columns')
+	parser.add_argument('output', help='output .csv or .parquet file, or a .store directory')
+	parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='records per chunk (default: %(default)s)')
+	parser.add_argument('--model', choices=circuit.MODES, default='approximate',
+		help='equivalent circuit for the VR and efficiency columns (default: %(default)s)')
+	parser.add_argument('--split', type=float, default=circuit.DEFAULT_SPLIT,
+		help='exact model: fraction of the series impedance on the primary side (default: %(default)s)')
+	parser.add_argument('--quiet', action='store_true', help='do not report progress')
+	parser.add_argument('--metrics', metavar='PATH',
+		help='write per-stage timings to PATH (Prometheus text for .prom/.txt, JSON otherwise)')
+	args = parser.parse_args(argv)
+	if args.chunk_size <= 0:
+		parser.error('--chunk-size must be positive')
+	if not 0.0 <= args.split <= 1.0:
+		parser.error('--split must be between 0 and 1')
+
+	def report(stats):
+		print(f"\r{stats.rows} rows, {stats.errors} errors, {stats.rows_per_second:,.0f} rows/s",
+			  end='', file=sys.stderr, flush=True)
+
+	if args.metrics:
+		metrics.enable()
+	try:
+		stats = run(args.input, args.output, args.chunk_size, None if args.quiet else report, args.model, args.split)
+		if args.metrics:
+			metrics.write(args.metrics)
+	except (OSError, ValueError, RuntimeError) as e:
+		print(f"Error: {e}", file=sys.stderr)
+		return 1
+	if not args.quiet:
+		print(file=sys.stderr)
+	print(f"Processed {stats.rows} rows ({stats.errors} with errors) in {stats.seconds:.3f} s "
+		  f"({stats.rows_per_second:,.0f} rows/s)", file=sys.stderr)
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(run_cli())
@@ -0,0 +1,290 @@
+# -*- coding: utf-8 -*-
+"""Benchmark suite: scalar latency, batch throughput, GUI update cost and startup time, with regression checks."""
+import argparse
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+import batch
+import cache
+import engine
+import vectorized
+
+
+# Relative slowdown beyond which a benchmark counts as a regression
+DEFAULT_THRESHOLD = 0.10
+# Startup goes through process creation and the disk cache, so it is noisier
+STARTUP_THRESHOLD = 0.25
+
+BATCH_SIZES = (1000, 10000, 100000, 1000000)
+QUICK_BATCH_SIZES = (1000, 10000, 100000)
+CSV_ROWS = 20000
+
+# README example transformer (20 kVA, 8000/240 V)
+EXAMPLE = (20000, 8000, 240, 8000, 0.214, 400, 489, 2.5, 240)
+
+SUITES = ('scalar', 'batch', 'gui', 'startup')
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+class Measurement:
+	"""One benchmark figure: the median of its samples, and which direction is better."""
+	__slots__ = ('name', 'value', 'unit', 'higher_is_better', 'threshold', 'samples')
+
+	def __init__(self, name, samples, unit, higher_is_better=False, threshold=DEFAULT_THRESHOLD):
+		self.name = name
+		self.samples = [float(s) for s in samples]
+		self.value = statistics.median(self.samples)
+		self.unit = unit
+		self.higher_is_better = higher_is_better
+		self.threshold = threshold
+
+	def __repr__(self):
+		return f"Measurement({self.name!r}, {self.value:.6g} {self.unit})"
+
+	def as_dict(self):
+		return {
+			'value': self.value, 'unit': self.unit, 'higher_is_better': self.higher_is_better,
+			'threshold': self.threshold, 'samples': self.samples,
+		}
+
+
+def _seconds_per_call(function, number, repeats):
+	"""Seconds per call of function() for each of repeats runs of number calls."""
+	samples = []
+	for _ in range(repeats):
+		start = time.perf_counter()
+		for _ in range(number):
+			function()
+		samples.append((time.perf_counter() - start) / number)
+	return samples
+
+
+def random_records(n, seed=0):
+	"""n valid, distinct input records scattered around the example transformer."""
+	rng = np.random.default_rng(seed)
+
+	def jitter(value):
+		return value * rng.uniform(0.9, 1.1, n)
+
+	return tuple(jitter(value) for value in EXAMPLE)
+
+
+# SCALAR: one unit, as calculated by the Calculate button
+def bench_scalar(quick=False):
+	number, repeats = (2000, 7) if quick else (20000, 9)
+	values = list(EXAMPLE)
+
+	def pipeline():
+		result = engine.calculate(*values)
+		point = engine.rated_load_point(result)
+		engine.regulation_summary(result, point)
+		engine.efficiency(result, point)
+
+	result_cache = cache.ResultCache()
+	result_cache.calculate(*values)
+
+	def to_us(samples):
+		return [s * 1e6 for s in samples]
+
+	return [
+		Measurement('scalar.calculate', to_us(_seconds_per_call(lambda: engine.calculate(*values), number, repeats)), 'us'),
+		Measurement('scalar.pipeline', to_us(_seconds_per_call(pipeline, number, repeats)), 'us'),
+		Measurement('scalar.cache_hit', to_us(_seconds_per_call(
+			lambda: result_cache.calculate(*values), number, repeats)), 'us'),
+	]
+
+
+# BATCH: records per second through the vectorized engine, deduplication and a CSV file
+def bench_batch(quick=False):
+	repeats = 3 if quick else 5
+	measurements = []
+	for n in QUICK_BATCH_SIZES if quick else BATCH_SIZES:
+		columns = random_records(n)
+		samples = [n / s for s in _seconds_per_call(lambda: vectorized.evaluate(*columns), 1, repeats)]
+		measurements.append(Measurement(f"batch.evaluate.{n}", samples, 'records/s', higher_is_better=True))
+	n = QUICK_BATCH_SIZES[-1]
+	# Test exports repeat units, modeled here as 100 distinct records
+	columns = tuple(np.resize(c, n) for c in random_records(100))
+	samples = [n / s for s in _seconds_per_call(lambda: cache.evaluate_deduplicated(*columns), 1, repeats)]
+	measurements.append(Measurement(f"batch.deduplicated.{n}", samples, 'records/s', higher_is_better=True))
+
+	rows = CSV_ROWS // 4 if quick else CSV_ROWS
+	with tempfile.TemporaryDirectory() as directory:
+		input_path = os.path.join(directory, 'input.csv')
+		output_path = os.path.join(directory, 'output.csv')
+		with open(input_path, 'w', encoding='utf-8') as f:
+			f.write('serial,S,V1,V2,Voc,Ioc,Poc,Vsc,Isc,Psc\n')
+			for i, record in enumerate(zip(*random_records(rows))):
+				f.write(f"{i}," + ','.join(f"{v:.6g}" for v in record) + '\n')
+		samples = [rows / s for s in _seconds_per_call(lambda: batch.run(input_path, output_path), 1, repeats)]
+	measurements.append(Measurement(f"batch.csv.{rows}", samples, 'records/s', higher_is_better=True))
+	return measurements
+
+
+# GUI: cost of one live update of the visible result page
+def bench_gui(quick=False):
+	os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+	from PyQt6.QtWidgets import QApplication
+	import depgraph
+	import main
+
+	app = QApplication.instance() or QApplication([])
+	window = main.MainWindow()
+	window.resize(750, 550)
+	window.show()
+	app.processEvents()
+	tabs = window.centralWidget()
+	inputs = dict(zip(depgraph.INPUT_NODES, EXAMPLE))
+	number, repeats = (20, 5) if quick else (200, 7)
+	measurements = []
+	for index, name in ((0, 'input'), (1, 'impedances'), (2, 'voltage_regulation'), (3, 'efficiency')):
+		tabs.setCurrentIndex(index)
+		app.processEvents()
+		step = [0]
+
+		def update():
+			# Alternate Psc so every update changes the short-circuit branch and what depends on it
+			step[0] += 1
+			inputs['psc'] = EXAMPLE[8] + step[0] % 2
+			window.results.set_inputs(inputs)
+			window.results.flush()
+
+		samples = [s * 1e3 for s in _seconds_per_call(update, number, repeats)]
+		measurements.append(Measurement(f"gui.update.{name}", samples, 'ms'))
+	window.close()
+	app.processEvents()
+	return measurements
+
+
+# STARTUP: cold start of the application in a fresh process, offscreen
+def bench_startup(quick=False):
+	runs = 3 if quick else 7
+	env = dict(os.environ, QT_QPA_PLATFORM='offscreen')
+	first_paint = []
+	process = []
+	for _ in range(runs):
+		start = time.perf_counter()
+		completed = subprocess.run(
+			[sys.executable, os.path.join(HERE, 'main.py'), '--startup-time'],
+			cwd=HERE, env=env, capture_output=True, text=True, timeout=60)
+		process.append((time.perf_counter() - start) * 1e3)
+		match = re.search(r'Time to first paint: ([\d.]+) ms', completed.stdout)
+		if completed.returncode != 0 or match is None:
+			raise RuntimeError(f"Startup run failed (exit code {completed.returncode}): {completed.stderr.strip()}")
+		first_paint.append(float(match.group(1)))
+	return [
+		Measurement('startup.first_paint', first_paint, 'ms', threshold=STARTUP_THRESHOLD),
+		Measurement('startup.process', process, 'ms', threshold=STARTUP_THRESHOLD),
+	]
+
+
+BENCHMARKS = {'scalar': bench_scalar, 'batch': bench_batch, 'gui': bench_gui, 'startup': bench_startup}
+
+
+def run(suites=SUITES, quick=False, progress=None):
+	"""Run the named suites; returns a report dictionary (see write_report())."""
+	results = {}
+	for suite in suites:
+		if progress is not None:
+			progress(suite)
+		for measurement in BENCHMARKS[suite](quick):
+			results[measurement.name] = measurement.as_dict()
+	return {
+		'meta': {
+			'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+			'python': platform.python_version(),
+			'numpy': np.__version__,
+			'platform': platform.platform(),
+			'cpu_count': os.cpu_count(),
+			'quick': quick,
+		},
+		'results': results,
+	}
+
+
+def write_report(report, path):
+	with open(path, 'w', encoding='utf-8') as f:
+		json.dump(report, f, indent=2)
+		f.write('\n')
+
+
+def read_report(path):
+	with open(path, encoding='utf-8') as f:
+		return json.load(f)
+
+
+def compare(report, baseline, threshold=None):
+	"""Rows of (name, baseline value, current value, relative change, regressed) for benchmarks in both reports.
+
+	The change is positive when the benchmark got worse. Each benchmark uses
+	its own threshold unless threshold is given.
+	"""
+	rows = []
+	for name, current in report['results'].items():
+		previous = baseline['results'].get(name)
+		if previous is None or previous['value'] == 0:
+			continue
+		change = (current['value'] - previous['value']) / previous['value']
+		if current['higher_is_better']:
+			change = -change
+		limit = threshold if threshold is not None else current['threshold']
+		rows.append((name, previous['value'], current['value'], change, change > limit))
+	return rows
+
+
+def format_report(report):
+	lines = []
+	for name, result in report['results'].items():
+		lines.append(f"{name:<32} {result['value']:>14.6g} {result['unit']}")
+	return '\n'.join(lines)
+
+
+def format_comparison(rows):
+	lines = [f"{'benchmark':<32} {'baseline':>14} {'current':>14} {'change':>9}"]
+	for name, previous, current, change, regressed in rows:
+		flag = '  REGRESSION' if regressed else ''
+		lines.append(f"{name:<32} {previous:>14.6g} {current:>14.6g} {change * 100:>8.1f}%{flag}")
+	return '\n'.join(lines)
+
+
+def run_cli(argv=None):
+	"""Command-line entry point; exits with status 1 if a benchmark regressed against --compare."""
+	parser = argparse.ArgumentParser(
+		prog='bench.py', description='Benchmark the transformer calculator and check for regressions.')
+	parser.add_argument('--suite', action='append', choices=SUITES,
+		help='suite to run (repeatable; default: all)')
+	parser.add_argument('--quick', action='store_true', help='fewer repeats and smaller inputs')
+	parser.add_argument('--output', help='write the results to this JSON file')
+	parser.add_argument('--compare', metavar='BASELINE', help='JSON results of an earlier run to compare against')
+	parser.add_argument('--threshold', type=float,
+		help=f"relative slowdown counted as a regression, for every benchmark (default: {DEFAULT_THRESHOLD}, "
+			 f"startup {STARTUP_THRESHOLD})")
+	args = parser.parse_args(argv)
+
+	report = run(args.suite or SUITES, args.quick, progress=lambda suite: print(f"Running {suite}...", file=sys.stderr))
+	print(format_report(report))
+	if args.output:
+		write_report(report, args.output)
+	if args.compare:
+		rows = compare(report, read_report(args.compare), args.threshold)
+		print()
+		print(format_comparison(rows))
+		regressed = [row[0] for row in rows if row[4]]
+		if regressed:
+			print(f"\n{len(regressed)} benchmark(s) regressed: {', '.join(regressed)}", file=sys.stderr)
+			return 1
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(run_cli())
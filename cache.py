@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""Result memoization: bounded in-memory LRU, optional SQLite tier, and batch deduplication."""
+import collections
+import json
+import sqlite3
+import threading
+
+import numpy as np
+
+import engine
+import vectorized
+
+
+DEFAULT_MAXSIZE = 1024
+
+# Odd 64-bit multipliers, one per input column, for the deduplication row hash
+_HASH_MULTIPLIERS = np.array([
+	0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93, 0xFF51AFD7ED558CCD,
+	0xC4CEB9FE1A85EC53, 0x94D049BB133111EB, 0xBF58476D1CE4E5B9, 0x2545F4914F6CDD1D,
+], dtype=np.uint64)
+
+
+def normalize_key(power, vp, vs, voc, ioc, poc, vsc, isc, psc):
+	"""Cache key for the nine inputs: the values as floats, with -0.0 folded into 0.0.
+
+	Values are not rounded: the key has to cost far less than engine.calculate()
+	itself, and equal inputs typed or parsed the same way give equal floats.
+	"""
+	return (float(power) + 0.0, float(vp) + 0.0, float(vs) + 0.0, float(voc) + 0.0, float(ioc) + 0.0,
+			float(poc) + 0.0, float(vsc) + 0.0, float(isc) + 0.0, float(psc) + 0.0)
+
+
+class ResultCache:
+	"""Memoizes engine.calculate() by input tuple (see normalize_key()).
+
+	The in-memory tier holds at most maxsize entries and evicts the least
+	recently used. With a path, results are also written to a SQLite file that
+	is consulted on in-memory misses, so they survive restarts. Invalid inputs
+	are cached as well and re-raise the same engine.CalculationError.
+	"""
+	def __init__(self, maxsize=DEFAULT_MAXSIZE, path=None):
+		self.maxsize = maxsize
+		self.path = path
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+		self.disk_hits = 0
+		self._entries = collections.OrderedDict()
+		self._lock = threading.Lock()
+		self._db = None
+		if path is not None:
+			self._db = sqlite3.connect(path, check_same_thread=False)
+			self._db.execute('CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+			self._db.commit()
+
+	def __len__(self):
+		return len(self._entries)
+
+	def close(self):
+		"""Close the SQLite tier, if any."""
+		if self._db is not None:
+			self._db.close()
+			self._db = None
+
+	def clear(self):
+		"""Drop every in-memory entry (the SQLite tier is kept)."""
+		with self._lock:
+			self._entries.clear()
+
+	def stats(self):
+		"""Counters as a dictionary."""
+		return {
+			'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+			'disk_hits': self.disk_hits, 'size': len(self._entries), 'maxsize': self.maxsize,
+		}
+
+	def calculate(self, power, vp, vs, voc, ioc, poc, vsc, isc, psc):
+		"""Cached engine.calculate()."""
+		key = normalize_key(power, vp, vs, voc, ioc, poc, vsc, isc, psc)
+		with self._lock:
+			entry = self._entries.get(key)
+			if entry is not None:
+				self._entries.move_to_end(key)
+				self.hits += 1
+				return _unpack(entry)
+			entry = self._load(key)
+			if entry is not None:
+				self.disk_hits += 1
+				self._store(key, entry, persist=False)
+				return _unpack(entry)
+			self.misses += 1
+
+		try:
+			entry = engine.calculate(*key)
+		except engine.CalculationError as e:
+			entry = e
+		with self._lock:
+			self._store(key, entry, persist=True)
+		return _unpack(entry)
+
+	def _store(self, key, entry, persist):
+		self._entries[key] = entry
+		self._entries.move_to_end(key)
+		while len(self._entries) > self.maxsize:
+			self._entries.popitem(last=False)
+			self.evictions += 1
+		if persist and self._db is not None:
+			self._db.execute('INSERT OR REPLACE INTO results VALUES (?, ?)', (json.dumps(key), _serialize(entry)))
+			self._db.commit()
+
+	def _load(self, key):
+		if self._db is None:
+			return None
+		row = self._db.execute('SELECT value FROM results WHERE key = ?', (json.dumps(key),)).fetchone()
+		return _deserialize(row[0]) if row is not None else None
+
+
+def _unpack(entry):
+	"""Return a cached result or re-raise a cached error."""
+	if isinstance(entry, engine.CalculationError):
+		raise engine.CalculationError(entry.title, str(entry))
+	return entry
+
+
+def _serialize(entry):
+	if isinstance(entry, engine.CalculationError):
+		return json.dumps({'error': [entry.title, str(entry)]})
+	return json.dumps({'result': entry.as_dict()})
+
+
+def _deserialize(text):
+	data = json.loads(text)
+	if 'error' in data:
+		return engine.CalculationError(*data['error'])
+	values = data['result']
+	values['warnings'] = tuple(values['warnings'])
+	return engine.TransformerResult(**values)
+
+
+def deduplicate(power, vp, vs, voc, ioc, poc, vsc, isc, psc):
+	"""Split input columns into unique records and the inverse index that restores them.
+
+	Returns (nine unique columns, inverse index), with the columns as given and
+	inverse None when there is nothing to merge. Rows are grouped by a 64-bit hash of their
+	bit patterns, and every row is checked against its representative, so a hash
+	collision can never merge two different records.
+	"""
+	columns = [np.ravel(c) for c in np.broadcast_arrays(
+		*(np.asarray(c, dtype=np.float64) for c in (power, vp, vs, voc, ioc, poc, vsc, isc, psc)))]
+	# + 0.0 folds -0.0 into 0.0 so both spellings deduplicate together
+	bits = [(c + 0.0).view(np.uint64) for c in columns]
+	hashes = np.zeros(len(columns[0]), dtype=np.uint64)
+	with np.errstate(over='ignore'):
+		for column, multiplier in zip(bits, _HASH_MULTIPLIERS):
+			hashes += column * multiplier
+		hashes ^= hashes >> np.uint64(29)
+	_, first, inverse = np.unique(hashes, return_index=True, return_inverse=True)
+	if len(first) == len(hashes):
+		return columns, None
+	inverse = inverse.ravel()
+	for column in bits:
+		if not np.array_equal(column[first][inverse], column):
+			# Hash collision: evaluate every record as given
+			return columns, None
+	return [column[first] for column in columns], inverse
+
+
+def evaluate_deduplicated(power, vp, vs, voc, ioc, poc, vsc, isc, psc):
+	"""vectorized.evaluate() that computes each distinct record only once."""
+	unique, inverse = deduplicate(power, vp, vs, voc, ioc, poc, vsc, isc, psc)
+	result = vectorized.evaluate(*unique)
+	return result if inverse is None else result[inverse]
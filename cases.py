@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""Paged, sortable and filterable view of the cases in a result store, for the GUI's case list."""
+import collections
+import operator
+import re
+
+import numpy as np
+
+import store
+import vectorized
+
+
+# Columns shown by default: (store column, header)
+DEFAULT_COLUMNS = (
+	('power', 'S (VA)'), ('vp', 'V1 (V)'), ('vs', 'V2 (V)'),
+	('r_eq_sec', 'R_eq2 (Ω)'), ('x_eq_sec', 'X_eq2 (Ω)'), ('r_c_sec', 'R_c2 (Ω)'), ('x_m_sec', 'X_m2 (Ω)'),
+	('vr', 'VR (%)'), ('eta', 'η (%)'), ('error', 'Error'),
+)
+
+# Rows read from the store at a time, and pages kept in memory
+PAGE_ROWS = 256
+MAX_PAGES = 64
+# Rows per chunk when streaming two columns into a scatter plot
+SCATTER_ROWS = 1 << 18
+
+# Filter names accepted besides the store's column names (case-insensitive)
+FILTER_ALIASES = {
+	'η': 'eta', 'efficiency': 'eta', 's': 'power', 'v1': 'vp', 'v2': 'vs',
+	'r_eq': 'r_eq_sec', 'x_eq': 'x_eq_sec', 'z_eq': 'z_eq_mag_sec', 'r_c': 'r_c_sec', 'x_m': 'x_m_sec',
+}
+_OPERATORS = {
+	'<': operator.lt, '<=': operator.le, '>': operator.gt, '>=': operator.ge,
+	'=': operator.eq, '==': operator.eq, '!=': operator.ne,
+}
+_CLAUSE = re.compile(r'^\s*([^\s<>=!]+)\s*(<=|>=|==|!=|<|>|=)\s*(\S+)\s*$')
+
+
+def parse_filter(text, columns):
+	"""[(column, comparison, value)] of a filter such as 'eta >= 98, vr < 3' (clauses joined by ',' or 'and')."""
+	clauses = []
+	for part in re.split(r',|\band\b', text.strip()):
+		if not part.strip():
+			continue
+		match = _CLAUSE.match(part)
+		if match is None:
+			raise ValueError(f"Cannot read '{part.strip()}'; use a comparison such as 'eta >= 98'.")
+		name, symbol, value = match.groups()
+		name = FILTER_ALIASES.get(name.lower(), name.lower())
+		if name not in columns:
+			raise ValueError(f"Unknown column '{match.group(1)}'.")
+		try:
+			clauses.append((name, _OPERATORS[symbol], float(value)))
+		except ValueError:
+			raise ValueError(f"'{value}' is not a number.") from None
+	return clauses
+
+
+class CaseSource:
+	"""Rows of a store in the current sort and filter order, read a page at a time.
+
+	Row numbers are positions in that order; record() maps them back to store
+	rows. Without a sort or filter no index is built, so opening is instant.
+	"""
+	def __init__(self, results, columns=DEFAULT_COLUMNS):
+		self.store = results
+		self.columns = [(name, header) for name, header in columns if name in results]
+		self.order = None
+		self.sort_column = None
+		self.descending = False
+		self.filter_text = ''
+		self._pages = collections.OrderedDict()
+
+	def __len__(self):
+		return len(self.store) if self.order is None else len(self.order)
+
+	@classmethod
+	def open(cls, path, columns=DEFAULT_COLUMNS):
+		return cls(store.open_store(path), columns)
+
+	def record(self, row):
+		"""Store row of a displayed row."""
+		return row if self.order is None else int(self.order[row])
+
+	def value(self, row, column):
+		"""Value in a displayed row and column (float, or int for the error code)."""
+		page = self._page(row // PAGE_ROWS)
+		value = page[column][row % PAGE_ROWS]
+		return int(value) if self.columns[column][0] == 'error' else float(value)
+
+	def _page(self, number):
+		page = self._pages.get(number)
+		if page is not None:
+			self._pages.move_to_end(number)
+			return page
+		start = number * PAGE_ROWS
+		stop = min(start + PAGE_ROWS, len(self))
+		index = slice(start, stop) if self.order is None else self.order[start:stop]
+		page = [np.array(self.store[name][index]) for name, _ in self.columns]
+		self._pages[number] = page
+		if len(self._pages) > MAX_PAGES:
+			self._pages.popitem(last=False)
+		return page
+
+	def inputs(self, row):
+		"""The nine input values of a displayed row, or None if the store has no inputs."""
+		if not self.store.has_inputs:
+			return None
+		record = self.record(row)
+		return [float(self.store[name][record]) for name in vectorized.INPUT_FIELDS]
+
+	def iter_points(self, x, y, chunk_rows=SCATTER_ROWS):
+		"""Yield (x, y) arrays of two columns over the filtered rows, in store order, chunk_rows at a time."""
+		rows = self.order
+		if rows is not None:
+			# Sorting alone keeps every row; a filtered subset is read in store order
+			rows = None if len(rows) == len(self.store) else np.sort(rows)
+		total = len(self.store) if rows is None else len(rows)
+		for start in range(0, total, chunk_rows):
+			index = slice(start, start + chunk_rows) if rows is None else rows[start:start + chunk_rows]
+			yield np.array(self.store[x][index], dtype=np.float64), np.array(self.store[y][index], dtype=np.float64)
+
+	def error_message(self, code):
+		return vectorized.ERROR_MESSAGES.get(code, '')
+
+	def sort(self, column, descending=False):
+		"""Order the rows by a column (None for store order); undefined values go last."""
+		self.sort_column = column
+		self.descending = descending
+		self._reorder()
+
+	def set_filter(self, text):
+		"""Show only rows matching a filter (see parse_filter()); raises ValueError for an invalid filter."""
+		parse_filter(text, self.store.columns)
+		self.filter_text = text
+		self._reorder()
+
+	def _reorder(self):
+		clauses = parse_filter(self.filter_text, self.store.columns)
+		rows = None
+		if clauses:
+			mask = np.ones(len(self.store), dtype=bool)
+			for name, compare, value in clauses:
+				mask &= compare(self.store[name], value)
+			rows = np.flatnonzero(mask)
+		if self.sort_column is not None:
+			key = self.store[self.columns[self.sort_column][0]]
+			key = np.asarray(key if rows is None else key[rows], dtype=np.float64)
+			# Negating keeps NaN last and ties in store order when descending
+			order = np.argsort(-key if self.descending else key, kind='stable')
+			rows = order if rows is None else rows[order]
+		elif self.descending:
+			rows = (np.arange(len(self.store)) if rows is None else rows)[::-1]
+		self.order = rows
+		self._pages.clear()
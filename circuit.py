@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+"""Operating points of the approximate and exact T-equivalent circuits, batched over units and loads."""
+import argparse
+import sys
+
+import numpy as np
+
+import vectorized
+
+
+MODES = ('approximate', 'exact')
+
+# Fraction of the series impedance on the primary side of the T (R1 = split * R_eq, R2' = (1 - split) * R_eq)
+DEFAULT_SPLIT = 0.5
+
+# Quantities of an operating point, compared between the two models
+SOLUTION_FIELDS = ('v2_nl', 'v2_fl', 'vr', 'i1', 'p_in', 'p_out', 'p_cu', 'p_core', 'eta')
+
+# BatchResult columns computed at an operating point: (load fraction, power factor, leading)
+BATCH_POINTS = {
+	'vr': (1.0, 1.0, False),
+	'vr_08_lag': (1.0, vectorized.PF_08_COS, False),
+	'vr_08_lead': (1.0, vectorized.PF_08_COS, True),
+}
+
+
+class CircuitSolution:
+	"""Voltages (V, secondary side), primary current (A), powers (W), VR and η (%) of operating points.
+
+	Arrays have the shape of the units followed by the broadcast shape of the
+	operating-point arguments; NaN where a point is undefined or cannot be supplied.
+	"""
+	__slots__ = SOLUTION_FIELDS
+
+	def __init__(self, **values):
+		for name in self.__slots__:
+			setattr(self, name, values[name])
+
+	def __repr__(self):
+		return f"CircuitSolution(shape={np.shape(self.v2_fl)})"
+
+	def as_dict(self):
+		return {name: getattr(self, name) for name in self.__slots__}
+
+
+def column(units, name):
+	"""Attribute of a TransformerResult or BatchResult as a float64 array (None becomes NaN)."""
+	value = getattr(units, name)
+	return np.asarray(np.nan if value is None else value, dtype=np.float64)
+
+
+def _broadcast(units, load, pf, leading, vs):
+	"""Unit parameters shaped to broadcast against the operating points along trailing axes."""
+	load, pf, leading = np.broadcast_arrays(
+		np.asarray(load, dtype=np.float64), np.clip(np.asarray(pf, dtype=np.float64), 0.0, 1.0),
+		np.asarray(leading, dtype=bool))
+	if vs is None and not hasattr(units, 'vs'):
+		raise ValueError(f"vs (rated secondary voltages) is required for a {type(units).__name__}.")
+	names = ('vs', 'turns_ratio', 'i2_rated', 'r_eq_sec', 'x_eq_sec', 'r_c_sec', 'g_phi_sec', 'b_phi_sec')
+	columns = [np.asarray(vs, dtype=np.float64) if name == 'vs' and vs is not None else column(units, name)
+			   for name in names]
+	shape = np.broadcast(*columns).shape + (1,) * load.ndim
+	params = {name: np.broadcast_to(column, np.broadcast(*columns).shape).reshape(shape)
+			  for name, column in zip(names, columns)}
+	sin_phi = np.where(leading, 1.0, -1.0) * np.sqrt(1.0 - pf * pf)
+	return params, load, pf, sin_phi
+
+
+def solve_approximate(units, load=1.0, pf=1.0, leading=False, vs=None):
+	"""Operating points of the approximate circuit (series impedance only, magnetizing branch at the source).
+
+	This is the model behind the VR and efficiency results: the load current
+	angle is taken from the no-load voltage V2,nl = Vs, V2,fl = |Vs - Z_eq2 * I2|
+	and the core loss is Vs² / R_c2. units is a TransformerResult, or a
+	vectorized.BatchResult together with its rated secondary voltages vs; load
+	(fraction of rated current), pf and leading broadcast against each other.
+	"""
+	params, load, pf, sin_phi = _broadcast(units, load, pf, leading, vs)
+	vs = params['vs']
+	i2 = params['i2_rated'] * load
+	with np.errstate(divide='ignore', invalid='ignore'):
+		v2_fl = vectorized.full_load_voltage(vs, i2, params['r_eq_sec'], params['x_eq_sec'], pf, sin_phi)
+		p_cu = i2 * i2 * params['r_eq_sec']
+		# Constant core loss, the same at every operating point
+		p_core = np.broadcast_to(vs * vs / params['r_c_sec'], v2_fl.shape)
+		p_out = v2_fl * i2 * pf
+		p_in = p_out + p_cu + p_core
+		i1 = np.abs(i2 * (pf + 1j * sin_phi) + vs * (params['g_phi_sec'] + 1j * params['b_phi_sec']))
+		return CircuitSolution(
+			v2_nl=np.broadcast_to(vs, v2_fl.shape), v2_fl=v2_fl, vr=vectorized.voltage_regulation(vs, v2_fl),
+			i1=i1 / params['turns_ratio'], p_in=p_in, p_out=p_out, p_cu=p_cu, p_core=p_core,
+			eta=np.where(p_in != 0, p_out / p_in * 100.0, np.nan))
+
+
+def solve_exact(units, load=1.0, pf=1.0, leading=False, split=DEFAULT_SPLIT, vs=None):
+	"""Operating points of the exact T circuit, with the primary held at rated voltage.
+
+	The series impedance is split between the primary (split) and secondary
+	(1 - split) sides of the magnetizing branch G_φ + jB_φ. The power factor is
+	that of the load, measured at the secondary terminals. Loads beyond what the
+	circuit can deliver at rated primary voltage give NaN.
+	"""
+	if not 0.0 <= split <= 1.0:
+		raise ValueError('Split must be between 0 and 1.')
+	params, load, pf, sin_phi = _broadcast(units, load, pf, leading, vs)
+	z_eq = params['r_eq_sec'] + 1j * params['x_eq_sec']
+	z1 = split * z_eq
+	z2 = (1.0 - split) * z_eq
+	y_m = params['g_phi_sec'] + 1j * params['b_phi_sec']
+	with np.errstate(divide='ignore', invalid='ignore'):
+		# Thevenin equivalent seen from the secondary terminals, primary at rated voltage (Vs referred)
+		d = 1.0 + z1 * y_m
+		v_th = params['vs'] / d
+		z_th = z2 + z1 / d
+		# With V2 on the real axis, |V_th| = |V2 + Z_th * I2| gives V2 in closed form
+		i2 = params['i2_rated'] * load * (pf + 1j * sin_phi)
+		w = z_th * i2
+		v2_fl = np.sqrt(np.abs(v_th) ** 2 - w.imag ** 2) - w.real
+		v_m = v2_fl + z2 * i2
+		i1 = i2 + y_m * v_m
+		v1 = v_m + z1 * i1
+		p_cu = np.abs(i1) ** 2 * z1.real + np.abs(i2) ** 2 * z2.real
+		p_core = np.abs(v_m) ** 2 * y_m.real
+		p_out = v2_fl * np.abs(i2) * pf
+		p_in = (v1 * i1.conjugate()).real
+		v2_nl = np.abs(v_th)
+		return CircuitSolution(
+			v2_nl=np.broadcast_to(v2_nl, v2_fl.shape), v2_fl=v2_fl, vr=vectorized.voltage_regulation(v2_nl, v2_fl),
+			i1=np.abs(i1) / params['turns_ratio'], p_in=p_in, p_out=p_out, p_cu=p_cu, p_core=p_core,
+			eta=np.where(p_in != 0, p_out / p_in * 100.0, np.nan))
+
+
+def solve(units, load=1.0, pf=1.0, leading=False, mode='approximate', split=DEFAULT_SPLIT, vs=None):
+	"""Operating points in the given mode: 'approximate' (fast) or 'exact'."""
+	if mode == 'approximate':
+		return solve_approximate(units, load, pf, leading, vs)
+	if mode == 'exact':
+		return solve_exact(units, load, pf, leading, split, vs)
+	raise ValueError(f"Unknown mode '{mode}' (expected one of {', '.join(MODES)}).")
+
+
+def exact_batch(result, vs, split=DEFAULT_SPLIT):
+	"""Copy of a vectorized.BatchResult with its VR and efficiency columns from the exact circuit."""
+	columns = result.as_dict()
+	for name, (load, pf, leading) in BATCH_POINTS.items():
+		solution = solve_exact(result, load, pf, leading, split, vs)
+		columns[name] = solution.vr
+		if name == 'vr':
+			columns['v2_fl'] = solution.v2_fl
+			for field in ('p_in', 'p_out', 'p_cu', 'p_core', 'eta'):
+				columns[field] = getattr(solution, field)
+	return vectorized.BatchResult(**columns)
+
+
+# ERROR REPORT
+class ErrorReport:
+	"""Running error of the approximate model against the exact one, per quantity.
+
+	Absolute errors are approximate minus exact; relative errors are divided by
+	|exact|. VR and η errors are in percentage points. Points undefined in either
+	model are skipped.
+	"""
+	def __init__(self, fields=SOLUTION_FIELDS):
+		self.fields = fields
+		self.count = dict.fromkeys(fields, 0)
+		self.sum_abs = dict.fromkeys(fields, 0.0)
+		self.max_abs = dict.fromkeys(fields, 0.0)
+		self.max_rel = dict.fromkeys(fields, 0.0)
+
+	def add(self, approximate, exact):
+		for name in self.fields:
+			a = np.ravel(getattr(approximate, name))
+			e = np.ravel(getattr(exact, name))
+			ok = np.isfinite(a) & np.isfinite(e)
+			if not ok.any():
+				continue
+			error = np.abs(a[ok] - e[ok])
+			with np.errstate(divide='ignore', invalid='ignore'):
+				relative = error / np.abs(e[ok])
+			relative = relative[np.isfinite(relative)]
+			self.count[name] += len(error)
+			self.sum_abs[name] += float(error.sum())
+			self.max_abs[name] = max(self.max_abs[name], float(error.max()))
+			if len(relative):
+				self.max_rel[name] = max(self.max_rel[name], float(relative.max()))
+
+	def summary(self):
+		"""{quantity: {'points', 'mean_abs', 'max_abs', 'max_rel'}} of the points added so far."""
+		return {
+			name: {
+				'points': self.count[name],
+				'mean_abs': self.sum_abs[name] / self.count[name] if self.count[name] else None,
+				'max_abs': self.max_abs[name] if self.count[name] else None,
+				'max_rel': self.max_rel[name] if self.count[name] else None,
+			}
+			for name in self.fields
+		}
+
+	def format(self):
+		lines = [f"{'quantity':<8} {'points':>10} {'mean |error|':>14} {'max |error|':>14} {'max rel':>10}"]
+		for name, row in self.summary().items():
+			if not row['points']:
+				lines.append(f"{name:<8} {0:>10}")
+				continue
+			lines.append(f"{name:<8} {row['points']:>10} {row['mean_abs']:>14.6g} {row['max_abs']:>14.6g} "
+						 f"{row['max_rel'] * 100:>9.4f}%")
+		return '\n'.join(lines)
+
+
+def compare(units, load=1.0, pf=1.0, leading=False, split=DEFAULT_SPLIT, vs=None, report=None):
+	"""Solve both models at the same operating points and add their differences to report (a new ErrorReport by default)."""
+	if report is None:
+		report = ErrorReport()
+	report.add(solve_approximate(units, load, pf, leading, vs), solve_exact(units, load, pf, leading, split, vs))
+	return report
+
+
+def run_cli(argv=None):
+	"""Report the approximate model's error over the records of a CSV or Parquet file, at the batch operating points."""
+	import batch
+
+	parser = argparse.ArgumentParser(
+		prog='circuit.py',
+		description='Compare the approximate and exact equivalent circuits over a file of OC/SC test records.')
+	parser.add_argument('input', help='input .csv or .parquet file, as for batch.py')
+	parser.add_argument('--split', type=float, default=DEFAULT_SPLIT,
+		help='fraction of the series impedance on the primary side (default: %(default)s)')
+	parser.add_argument('--chunk-size', type=int, default=batch.DEFAULT_CHUNK_SIZE,
+		help='records per chunk (default: %(default)s)')
+	args = parser.parse_args(argv)
+	if not 0.0 <= args.split <= 1.0:
+		parser.error('--split must be between 0 and 1')
+
+	report = ErrorReport()
+	points = list(BATCH_POINTS.values())
+	load, pf, leading = (np.array(column) for column in zip(*points))
+	try:
+		chunks = batch.iter_parquet(args.input, args.chunk_size) if batch.is_parquet(args.input) \
+			else batch.iter_csv(args.input, args.chunk_size)
+		for _, inputs in chunks:
+			result = vectorized.evaluate(*(inputs[name] for name in vectorized.INPUT_FIELDS))
+			valid = result.valid
+			compare(result[valid], load, pf, leading, args.split, inputs['vs'][valid], report)
+	except (OSError, ValueError, RuntimeError) as e:
+		print(f"Error: {e}", file=sys.stderr)
+		return 1
+	print(f"Approximate minus exact circuit at rated current, PF 1 and 0.8 lagging/leading (split {args.split:g}):")
+	print(report.format())
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(run_cli())
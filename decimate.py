@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""Level-of-detail reduction of large plot series to screen resolution, updated incrementally as chunks stream in."""
+import numpy as np
+
+
+# A scatter with at most this many points in view is drawn point by point instead of as a density image
+POINT_LIMIT = 20000
+
+
+def _pixels(values, low, high, size):
+	"""Pixel index of each value in [low, high] split into size pixels; -1 outside or undefined."""
+	with np.errstate(invalid='ignore'):
+		index = np.floor((values - low) * (size / (high - low)))
+		inside = (index >= 0) & (index <= size)
+	pixels = np.where(inside, index, -1).astype(np.intp)
+	# The upper edge belongs to the last pixel
+	pixels[pixels == size] = size - 1
+	return pixels
+
+
+def envelope(x, y, view, width):
+	"""(y_min, y_max) of the points in each of width pixel columns of view; NaN where a column is empty.
+
+	view is (x_min, x_max, y_min, y_max); points outside the x range are
+	skipped, points outside the y range are kept so lines leave the plot.
+	"""
+	x_min, x_max = view[0], view[1]
+	columns = _pixels(x, x_min, x_max, width)
+	ok = (columns >= 0) & np.isfinite(y)
+	columns = columns[ok]
+	y = y[ok]
+	low = np.full(width, np.inf)
+	high = np.full(width, -np.inf)
+	np.minimum.at(low, columns, y)
+	np.maximum.at(high, columns, y)
+	empty = low > high
+	low[empty] = np.nan
+	high[empty] = np.nan
+	return low, high
+
+
+def density(x, y, view, width, height):
+	"""Number of points in each pixel of view, shape (height, width) with row 0 at the top."""
+	x_min, x_max, y_min, y_max = view
+	columns = _pixels(x, x_min, x_max, width)
+	rows = _pixels(y, y_min, y_max, height)
+	ok = (columns >= 0) & (rows >= 0)
+	index = (height - 1 - rows[ok]) * width + columns[ok]
+	return np.bincount(index, minlength=width * height).reshape(height, width)
+
+
+def _combine_envelopes(old, new):
+	with np.errstate(invalid='ignore'):
+		return np.fmin(old[0], new[0]), np.fmax(old[1], new[1])
+
+
+class Series:
+	"""Plot points added in chunks, with screen-resolution summaries of any view.
+
+	A summary is cached per kind; when only new chunks arrived since it was
+	computed for the same view and size, just those chunks are reduced and
+	merged in, so streaming data costs one pass over each chunk.
+	"""
+	def __init__(self):
+		self.clear()
+
+	def __len__(self):
+		return self.count
+
+	def __repr__(self):
+		return f"Series(points={self.count}, chunks={len(self._chunks)})"
+
+	def clear(self):
+		self._chunks = []
+		self._cache = {}
+		self.count = 0
+		self.bounds = None
+
+	def add(self, x, y):
+		"""Append points; x and y are broadcast to the same shape and flattened."""
+		x, y = (np.ravel(values).astype(np.float64) for values in np.broadcast_arrays(x, y))
+		if not len(x):
+			return
+		self._chunks.append((x, y))
+		self.count += len(x)
+		finite = np.isfinite(x) & np.isfinite(y)
+		if finite.any():
+			fx = x[finite]
+			fy = y[finite]
+			bounds = (float(fx.min()), float(fx.max()), float(fy.min()), float(fy.max()))
+			if self.bounds is not None:
+				bounds = (min(bounds[0], self.bounds[0]), max(bounds[1], self.bounds[1]),
+						  min(bounds[2], self.bounds[2]), max(bounds[3], self.bounds[3]))
+			self.bounds = bounds
+
+	def _reduce(self, kind, key, reduce, combine):
+		cached = self._cache.get(kind)
+		if cached is not None and cached[0] == key:
+			value, done = cached[1], cached[2]
+		else:
+			value, done = None, 0
+		for x, y in self._chunks[done:]:
+			part = reduce(x, y)
+			value = part if value is None else combine(value, part)
+		self._cache[kind] = (key, value, len(self._chunks))
+		return value
+
+	def envelope(self, view, width):
+		"""envelope() over all chunks: (y_min, y_max) per pixel column, or None without points."""
+		return self._reduce('envelope', (tuple(view), width),
+							lambda x, y: envelope(x, y, view, width), _combine_envelopes)
+
+	def density(self, view, width, height):
+		"""density() over all chunks, or None without points."""
+		return self._reduce('density', (tuple(view), width, height),
+							lambda x, y: density(x, y, view, width, height), np.add)
+
+	def visible(self, view, limit=POINT_LIMIT):
+		"""(x, y) of the points inside view, or None if there are more than limit of them."""
+		x_min, x_max, y_min, y_max = view
+		xs = []
+		ys = []
+		total = 0
+		for x, y in self._chunks:
+			inside = (x >= x_min) & (x <= x_max) & (y >= y_min) & (y <= y_max)
+			total += int(np.count_nonzero(inside))
+			if total > limit:
+				return None
+			xs.append(x[inside])
+			ys.append(y[inside])
+		if not xs:
+			return np.empty(0), np.empty(0)
+		return np.concatenate(xs), np.concatenate(ys)
+
+
+def fit_view(bounds, margin=0.05):
+	"""View (x_min, x_max, y_min, y_max) around data bounds with a relative margin; None for no data."""
+	if bounds is None:
+		return None
+	x_min, x_max, y_min, y_max = bounds
+	if x_max == x_min:
+		x_min, x_max = x_min - 0.5, x_max + 0.5
+	if y_max == y_min:
+		y_min, y_max = y_min - 0.5, y_max + 0.5
+	dx = (x_max - x_min) * margin
+	dy = (y_max - y_min) * margin
+	return (x_min - dx, x_max + dx, y_min - dy, y_max + dy)
+
+
+def union_bounds(bounds):
+	"""Smallest bounds containing all of the given ones (None entries are skipped)."""
+	bounds = [b for b in bounds if b is not None]
+	if not bounds:
+		return None
+	return (min(b[0] for b in bounds), max(b[1] for b in bounds),
+			min(b[2] for b in bounds), max(b[3] for b in bounds))
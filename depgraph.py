@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""Dependency graph for incremental recomputation of the transformer quantities."""
+import engine
+import efficiency
+import metrics
+import regulation
+
+
+class DependencyGraph:
+	"""Named values that are recomputed only downstream of inputs that changed.
+
+	Nodes must be added after the nodes they depend on, so insertion order is a
+	topological order. A node whose function raises stores the exception as its
+	value, and every node depending on it takes that exception without being
+	evaluated. A recomputed node whose value is unchanged does not dirty its
+	dependants. update() can be limited to the nodes a caller needs, leaving the
+	rest dirty until they are asked for. While metrics are enabled, every node
+	evaluation is timed under the node's span name.
+	"""
+	def __init__(self, span_prefix=''):
+		self.span_prefix = span_prefix
+		self._functions = {}
+		self._spans = {}
+		self._dependencies = {}
+		self._dependants = {}
+		self._values = {}
+		self._versions = {}
+		self._ancestors = {}
+		self._order = []
+		self._dirty = set()
+		self._changed_inputs = []
+
+	def __contains__(self, name):
+		return name in self._values
+
+	def add_input(self, name, value=None):
+		"""Add a source node holding a value set with set()."""
+		self._add(name, None, ())
+		self._values[name] = value
+		self._changed_inputs.append(name)
+
+	def add_node(self, name, function, dependencies, span=None):
+		"""Add a node computed as function(*values of dependencies), timed as span (default: prefixed name)."""
+		for dependency in dependencies:
+			if dependency not in self._values:
+				raise KeyError(f"Unknown dependency '{dependency}' of node '{name}'.")
+		self._add(name, function, tuple(dependencies))
+		self._spans[name] = span or self.span_prefix + name
+		self._values[name] = None
+		self._dirty.add(name)
+
+	def _add(self, name, function, dependencies):
+		if name in self._values:
+			raise KeyError(f"Node '{name}' already exists.")
+		self._functions[name] = function
+		self._dependencies[name] = dependencies
+		self._dependants[name] = []
+		self._versions[name] = 0
+		self._ancestors.clear()
+		for dependency in dependencies:
+			self._dependants[dependency].append(name)
+		self._order.append(name)
+
+	def set(self, name, value):
+		"""Change an input; returns False (and dirties nothing) if the value is unchanged."""
+		if self._functions[name] is not None:
+			raise KeyError(f"Node '{name}' is computed, not an input.")
+		if _same(self._values[name], value):
+			return False
+		self._values[name] = value
+		self._versions[name] += 1
+		self._dirty.update(self._dependants[name])
+		self._changed_inputs.append(name)
+		return True
+
+	def update(self, targets=None):
+		"""Recompute dirty nodes; returns the names whose value changed since the last update, in order.
+
+		With targets, only those nodes and what they depend on are recomputed.
+		"""
+		changed = self._changed_inputs
+		self._changed_inputs = []
+		if not self._dirty:
+			return changed
+		needed = self._needed(targets) if targets is not None else None
+		for name in self._order:
+			if name not in self._dirty or (needed is not None and name not in needed):
+				continue
+			self._dirty.discard(name)
+			value = self._evaluate(name)
+			if _same(self._values[name], value):
+				continue
+			self._values[name] = value
+			self._versions[name] += 1
+			self._dirty.update(self._dependants[name])
+			changed.append(name)
+		return changed
+
+	def _needed(self, targets):
+		"""The targets and every node they depend on, directly or not."""
+		key = tuple(targets)
+		needed = self._ancestors.get(key)
+		if needed is None:
+			needed = set()
+			stack = list(key)
+			while stack:
+				name = stack.pop()
+				if name not in needed:
+					needed.add(name)
+					stack.extend(self._dependencies[name])
+			self._ancestors[key] = needed
+		return needed
+
+	def _evaluate(self, name):
+		arguments = [self._values[dependency] for dependency in self._dependencies[name]]
+		for argument in arguments:
+			if isinstance(argument, Exception):
+				return argument
+		if not metrics.enabled:
+			return self._call(name, arguments)
+		start = metrics.clock()
+		value = self._call(name, arguments)
+		metrics.observe(self._spans[name], metrics.clock() - start)
+		return value
+
+	def _call(self, name, arguments):
+		try:
+			return self._functions[name](*arguments)
+		except (engine.CalculationError, ArithmeticError, ValueError) as e:
+			return e
+
+	def version(self, name):
+		"""Number of times the value of a node has changed; compare versions to detect changes."""
+		return self._versions[name]
+
+	def value(self, name):
+		"""Current value of a node (an exception instance if it could not be computed)."""
+		return self._values[name]
+
+	def get(self, name):
+		"""Current value of a node, raising the stored exception if it could not be computed."""
+		value = self._values[name]
+		if isinstance(value, Exception):
+			raise value
+		return value
+
+
+def _same(old, new):
+	"""Whether a recomputed value equals the previous one (arrays and unknown types count as changed)."""
+	if old is new:
+		return True
+	if type(old) is not type(new):
+		return False
+	if isinstance(old, Exception):
+		return old.args == new.args and getattr(old, 'title', None) == getattr(new, 'title', None)
+	try:
+		return bool(old == new)
+	except (TypeError, ValueError):
+		return False
+
+
+INPUT_NODES = ('power', 'vp', 'vs', 'voc', 'ioc', 'poc', 'vsc', 'isc', 'psc')
+
+
+def parse_input(text):
+	"""Float value of an input field, or the input error the Calculate button would report."""
+	try:
+		return float(text)
+	except ValueError:
+		return engine.CalculationError('Input Error', 'Please ensure all fields are numeric and not empty.')
+
+
+def _result(power, vp, vs, turns_ratio, series, shunt, series_sec, shunt_sec):
+	return engine.TransformerResult(
+		power=power, vp=vp, vs=vs, turns_ratio=turns_ratio, **series, **shunt, **series_sec, **shunt_sec)
+
+
+def _load_model(power, vs, series_sec):
+	# Partial result with just what voltage regulation needs
+	return engine.TransformerResult(power=power, vs=vs, r_eq_sec=series_sec['r_eq_sec'], x_eq_sec=series_sec['x_eq_sec'])
+
+
+def _loss_model(load_model, shunt_sec):
+	values = load_model.as_dict()
+	values['r_c_sec'] = shunt_sec['r_c_sec']
+	return engine.TransformerResult(**values)
+
+
+def _efficiency(loss_model, rated_point):
+	return engine.efficiency(loss_model, rated_point) if loss_model.r_c_sec is not None else None
+
+
+def transformer_graph():
+	"""Graph over the calculation with one input node per field.
+
+	Computed nodes: turns_ratio (a), series (PF_sc, θ_sc, Z_eq, R_eq, X_eq),
+	shunt (PF_oc, θ_oc, Y_φ, G_φ, B_φ, R_c, X_m), series_sec and shunt_sec
+	(referred to secondary), result (engine.TransformerResult), rated_point
+	(engine.rated_load_point, shared by regulation and efficiency), regulation
+	(engine.regulation_summary), regulation_sweep (regulation_sweep_live on a
+	coarse grid), efficiency, max_efficiency and efficiency_curves.
+	Editing Psc recomputes series, series_sec, result and the regulation and
+	efficiency nodes, but never the open-circuit branch. Nodes are timed under
+	calc.<node name>, except the stages calc.short_circuit (series),
+	calc.open_circuit (shunt), calc.referral (series_sec and shunt_sec) and
+	calc.voltage_regulation (regulation).
+	"""
+	graph = DependencyGraph(span_prefix='calc.')
+	for name in INPUT_NODES:
+		graph.add_input(name, parse_input(''))
+	graph.add_node('turns_ratio', engine.turns_ratio, ('vp', 'vs'))
+	graph.add_node('series', engine.short_circuit, ('vsc', 'isc', 'psc'), 'calc.short_circuit')
+	graph.add_node('shunt', engine.open_circuit, ('turns_ratio', 'voc', 'ioc', 'poc'), 'calc.open_circuit')
+	graph.add_node('series_sec', engine.refer_series, ('series', 'turns_ratio'), 'calc.referral')
+	graph.add_node('shunt_sec', engine.refer_shunt, ('shunt', 'turns_ratio'), 'calc.referral')
+	# Dependency order matches the order engine.calculate() reports errors in
+	graph.add_node('result', _result, ('power', 'vp', 'vs', 'turns_ratio', 'series', 'shunt', 'series_sec', 'shunt_sec'))
+	graph.add_node('load_model', _load_model, ('power', 'vs', 'series_sec'))
+	graph.add_node('rated_point', engine.rated_load_point, ('load_model',))
+	graph.add_node('regulation', engine.regulation_summary, ('load_model', 'rated_point'), 'calc.voltage_regulation')
+	graph.add_node('regulation_sweep', regulation.sweep, ('load_model',))
+	graph.add_node('regulation_sweep_live', regulation.live_sweep, ('load_model',))
+	graph.add_node('loss_model', _loss_model, ('load_model', 'shunt_sec'))
+	graph.add_node('efficiency', _efficiency, ('loss_model', 'rated_point'))
+	graph.add_node('max_efficiency', efficiency.max_efficiency, ('loss_model',))
+	graph.add_node('efficiency_curves', efficiency.efficiency_curves, ('loss_model',))
+	return graph
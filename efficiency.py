@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+"""Efficiency curves, maximum-efficiency point and energy-weighted (all-day) efficiency."""
+import math
+import os
+
+import numpy as np
+
+import vectorized
+
+
+# Default number of profile samples reduced per chunk when streaming from files
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+# Load fractions and (lagging) power factors of the efficiency-versus-load curves
+CURVE_LOAD_FRACTIONS = np.linspace(0.0, 1.25, 501)
+CURVE_POWER_FACTORS = (1.0, 0.9, 0.8)
+
+
+def losses(result):
+	"""Rated copper loss and core loss (W) on the secondary side, core loss None without R_c."""
+	p_cu_rated = result.i2_rated ** 2 * result.r_eq_sec
+	p_core = result.vs ** 2 / result.r_c_sec if result.r_c_sec is not None else None
+	return p_cu_rated, p_core
+
+
+def _operating_point(result, load, pf, leading):
+	"""Output power and copper loss (W) at load fractions and power factors (arrays broadcast)."""
+	pf = np.clip(np.asarray(pf, dtype=np.float64), 0.0, 1.0)
+	sin_phi = np.sqrt(1.0 - pf * pf)
+	if not leading:
+		sin_phi = -sin_phi
+	i2 = result.i2_rated * np.asarray(load, dtype=np.float64)
+	v2_fl = vectorized.full_load_voltage(result.vs, i2, result.r_eq_sec, result.x_eq_sec, pf, sin_phi)
+	p_out = v2_fl * i2 * pf
+	p_cu = i2 * i2 * result.r_eq_sec
+	return p_out, p_cu
+
+
+def efficiency_surface(result, load_fractions, power_factors=(1.0,), leading=False):
+	"""η in percent with power factors along rows and load fractions along columns."""
+	_, p_core = losses(result)
+	if p_core is None:
+		return np.full((len(power_factors), len(load_fractions)), np.nan)
+	p_out, p_cu = _operating_point(
+		result, np.asarray(load_fractions)[None, :], np.asarray(power_factors)[:, None], leading)
+	p_in = p_out + p_cu + p_core
+	with np.errstate(divide='ignore', invalid='ignore'):
+		return np.where(p_in != 0, p_out / p_in * 100.0, np.nan)
+
+
+class EfficiencyCurves:
+	"""η in percent versus load fraction, one row per power factor."""
+	__slots__ = ('load_fractions', 'power_factors', 'leading', 'eta')
+
+	def __init__(self, load_fractions, power_factors, leading, eta):
+		self.load_fractions = load_fractions
+		self.power_factors = power_factors
+		self.leading = leading
+		self.eta = eta
+
+	def __repr__(self):
+		return (f"EfficiencyCurves(loads={len(self.load_fractions)}, "
+				f"power_factors={tuple(float(pf) for pf in self.power_factors)})")
+
+
+def efficiency_curves(result, load_fractions=CURVE_LOAD_FRACTIONS, power_factors=CURVE_POWER_FACTORS, leading=False):
+	"""Efficiency-versus-load curves at a few power factors, or None without a core loss."""
+	if result.r_c_sec is None:
+		return None
+	load_fractions = np.asarray(load_fractions, dtype=np.float64)
+	power_factors = np.asarray(power_factors, dtype=np.float64)
+	eta = efficiency_surface(result, load_fractions, power_factors, leading)
+	return EfficiencyCurves(load_fractions, power_factors, leading, eta)
+
+
+class MaxEfficiency:
+	"""Load at which copper loss equals core loss, and the efficiency there."""
+	__slots__ = ('load_fraction', 'power', 'eta', 'p_loss')
+
+	def __init__(self, load_fraction, power, eta, p_loss):
+		self.load_fraction = load_fraction
+		self.power = power
+		self.eta = eta
+		self.p_loss = p_loss
+
+	def __repr__(self):
+		fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+		return f"{type(self).__name__}({fields})"
+
+
+def max_efficiency(result, pf=1.0, leading=False):
+	"""Maximum-efficiency point: x² · P_cu,rated = P_core, so x = sqrt(P_core / P_cu,rated)."""
+	p_cu_rated, p_core = losses(result)
+	if p_core is None or p_cu_rated <= 0:
+		return None
+	load = math.sqrt(p_core / p_cu_rated)
+	p_out, p_cu = _operating_point(result, load, pf, leading)
+	p_out = float(p_out)
+	p_in = p_out + float(p_cu) + p_core
+	eta = p_out / p_in * 100.0 if p_in != 0 else None
+	return MaxEfficiency(load, load * result.power, eta, 2.0 * p_core)
+
+
+class EnergyEfficiency:
+	"""Energy-weighted efficiency over a load profile (energies in Wh)."""
+	__slots__ = ('samples', 'hours', 'energy_out', 'energy_cu', 'energy_core', 'energy_in', 'eta')
+
+	def __init__(self, samples, hours, energy_out, energy_cu, energy_core):
+		self.samples = samples
+		self.hours = hours
+		self.energy_out = energy_out
+		self.energy_cu = energy_cu
+		self.energy_core = energy_core
+		self.energy_in = energy_out + energy_cu + energy_core
+		self.eta = energy_out / self.energy_in * 100.0 if self.energy_in != 0 else None
+
+	def __repr__(self):
+		fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+		return f"{type(self).__name__}({fields})"
+
+
+class EnergyAccumulator:
+	"""Running energy totals fed one chunk of load samples at a time."""
+	def __init__(self, result, step_hours, leading=False):
+		_, p_core = losses(result)
+		if p_core is None:
+			raise ValueError('Core-loss resistance R_c is undefined; energy efficiency needs a core loss.')
+		self.result = result
+		self.step_hours = step_hours
+		self.leading = leading
+		self.p_core = p_core
+		self.samples = 0
+		# Energy totals in Wh
+		self.energy_out = 0.0
+		self.energy_cu = 0.0
+
+	def add(self, load, pf=1.0):
+		"""Accumulate a chunk of load fractions (and per-sample or constant power factors)."""
+		load = np.asarray(load, dtype=np.float64)
+		if load.size == 0:
+			return
+		p_out, p_cu = _operating_point(self.result, load, pf, self.leading)
+		self.energy_out += float(np.sum(p_out)) * self.step_hours
+		self.energy_cu += float(np.sum(p_cu)) * self.step_hours
+		self.samples += load.size
+
+	def finish(self):
+		"""Energy totals so far; the core is energized for every sample."""
+		hours = self.samples * self.step_hours
+		return EnergyEfficiency(self.samples, hours, self.energy_out, self.energy_cu, self.p_core * hours)
+
+
+def all_day_efficiency(result, chunks, step_hours=1.0, pf=1.0, leading=False):
+	"""Energy-weighted efficiency of a profile given as an iterable of load-fraction chunks.
+
+	Each chunk is either an array of load fractions (using the constant pf) or a
+	(load, pf) pair of arrays. Chunks are reduced as they arrive, so multi-year
+	profiles never need to be resident in memory.
+	"""
+	accumulator = EnergyAccumulator(result, step_hours, leading)
+	for chunk in chunks:
+		if isinstance(chunk, tuple):
+			accumulator.add(*chunk)
+		else:
+			accumulator.add(chunk, pf)
+	return accumulator.finish()
+
+
+def iter_profile(path, chunk_size=DEFAULT_CHUNK_SIZE):
+	"""Yield chunks of a load profile file without reading it whole.
+
+	`.npy` files are memory-mapped; a 1-D array is load fractions, a 2-column
+	array is (load, pf). Any other file is text with one `load` or `load,pf`
+	per line (blank lines and lines starting with `#` are skipped).
+	"""
+	if os.path.splitext(path)[1].lower() == '.npy':
+		data = np.load(path, mmap_mode='r')
+		for start in range(0, len(data), chunk_size):
+			block = np.asarray(data[start:start + chunk_size], dtype=np.float64)
+			yield (block[:, 0], block[:, 1]) if block.ndim == 2 else block
+		return
+
+	loads = []
+	pfs = []
+	with open(path, encoding='utf-8') as f:
+		for line in f:
+			line = line.strip()
+			if not line or line.startswith('#'):
+				continue
+			fields = line.split(',')
+			loads.append(float(fields[0]))
+			if len(fields) > 1:
+				pfs.append(float(fields[1]))
+			if len(loads) == chunk_size:
+				yield _text_chunk(loads, pfs)
+				loads = []
+				pfs = []
+	if loads:
+		yield _text_chunk(loads, pfs)
+
+
+def _text_chunk(loads, pfs):
+	"""Turn parsed text columns into the chunk form all_day_efficiency() accepts."""
+	if pfs:
+		if len(pfs) != len(loads):
+			raise ValueError('Load profile mixes lines with and without a power factor column.')
+		return np.array(loads), np.array(pfs)
+	return np.array(loads)
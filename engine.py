@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+"""Qt-free calculation engine for the single-phase transformer equivalent circuit."""
+import math
+
+
+class CalculationError(ValueError):
+	"""Raised when the inputs cannot produce a valid equivalent circuit."""
+	def __init__(self, title, message):
+		super().__init__(message)
+		self.title = title
+
+
+class TransformerResult:
+	"""Equivalent-circuit parameters of one transformer, referred to primary and secondary."""
+	__slots__ = (
+		# Common parameters
+		'power', 'vp', 'vs', 'turns_ratio',
+		# Short-circuit test (series branch), primary side
+		'pf_sc', 'theta_sc_deg', 'z_eq_mag', 'r_eq', 'x_eq',
+		# Open-circuit test (excitation branch), primary side
+		'pf_oc', 'theta_oc_deg', 'y_phi_mag', 'g_phi', 'b_phi', 'r_c', 'x_m',
+		# Referred to secondary
+		'z_eq_mag_sec', 'r_eq_sec', 'x_eq_sec',
+		'y_phi_mag_sec', 'g_phi_sec', 'b_phi_sec', 'r_c_sec', 'x_m_sec',
+		# Non-fatal problems detected while computing (e.g. X_eq forced to zero)
+		'warnings',
+	)
+
+	def __init__(self, **values):
+		for name in self.__slots__:
+			setattr(self, name, values.get(name))
+
+	def __repr__(self):
+		fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+		return f"{type(self).__name__}({fields})"
+
+	def __eq__(self, other):
+		if not isinstance(other, TransformerResult):
+			return NotImplemented
+		return self.as_dict() == other.as_dict()
+
+	def as_dict(self):
+		"""Return the result as a plain dictionary."""
+		return {name: getattr(self, name) for name in self.__slots__}
+
+	@property
+	def i2_rated(self):
+		"""Rated secondary current: I2 = S / V2."""
+		return self.power / self.vs
+
+	@property
+	def z_eq_complex_sec(self):
+		"""Series impedance referred to secondary as a complex number."""
+		return complex(self.r_eq_sec, self.x_eq_sec)
+
+
+def turns_ratio(vp, vs):
+	"""Transformer turns ratio a = N1/N2 = Vp/Vs of a step-down unit."""
+	# Validate step-down configuration
+	if vs > vp:
+		raise CalculationError('Configuration Error', 'Only step-down transformers are permitted (Vs ≤ Vp).')
+	if vs == 0:
+		raise CalculationError('Calculation Error', 'Secondary voltage cannot be zero.')
+	return vp / vs
+
+
+def short_circuit(vsc, isc, psc):
+	"""Series-branch parameters from the short-circuit test, as a dict of TransformerResult fields."""
+	# Power factor: PF_sc = P_sc / (V_sc * I_sc)
+	if vsc * isc == 0:
+		raise CalculationError('Calculation Error', 'Vsc and Isc must be non-zero to compute power factor.')
+	pf_sc = psc / (vsc * isc)
+	pf_sc_clamped = max(-1.0, min(1.0, pf_sc))
+	theta_sc_rad = math.acos(pf_sc_clamped)
+	theta_sc_deg = math.degrees(theta_sc_rad)
+
+	# |Z_eq| = V_sc / I_sc
+	z_eq_mag = vsc / isc
+
+	# R_eq = P_sc / I_sc^2
+	r_eq = psc / (isc ** 2)
+
+	# X_eq = sqrt(|Z_eq|^2 - R_eq^2)
+	warnings = ()
+	x_eq_sq = z_eq_mag ** 2 - r_eq ** 2
+	if x_eq_sq < 0:
+		warnings = ('Inconsistent impedance values detected. Setting X_eq to zero.',)
+		x_eq = 0.0
+	else:
+		x_eq = math.sqrt(x_eq_sq)
+
+	return {'pf_sc': pf_sc, 'theta_sc_deg': theta_sc_deg, 'z_eq_mag': z_eq_mag, 'r_eq': r_eq, 'x_eq': x_eq,
+			'warnings': warnings}
+
+
+def open_circuit(turns_ratio, voc, ioc, poc):
+	"""Excitation-branch parameters from the open-circuit test, as a dict of TransformerResult fields."""
+	a_squared = turns_ratio ** 2
+
+	# Y_φ magnitude: |Y_φ| = I_oc / V_oc
+	if voc == 0:
+		raise CalculationError('Calculation Error', 'Voc cannot be zero.')
+	y_phi_mag = a_squared * ioc / voc
+
+	# Power factor (open-circuit): PF_oc = P_oc / (V_oc * I_oc)
+	if voc * ioc == 0:
+		raise CalculationError('Calculation Error', 'Voc and Ioc must be non-zero.')
+	pf_oc = poc / (voc * ioc)
+	pf_oc_clamped = max(-1.0, min(1.0, pf_oc))
+	theta_oc_rad = math.acos(pf_oc_clamped)
+	theta_oc_deg = math.degrees(theta_oc_rad)
+
+	# G_φ = |Y_φ| * cos(θ_oc)
+	g_phi = abs(y_phi_mag) * math.cos(-theta_oc_rad)
+
+	# B_φ = |Y_φ| * sin(θ_oc)
+	b_phi = y_phi_mag * math.sin(-theta_oc_rad)
+
+	# R_c = 1 / G_φ
+	r_c = (a_squared ** 2) * (1.0 / g_phi) if g_phi > 1e-12 else None
+
+	# X_m = 1 / |B_φ|
+	x_m = (a_squared ** 2) * (1.0 / abs(b_phi)) if abs(b_phi) > 1e-12 else None
+
+	return {'pf_oc': pf_oc, 'theta_oc_deg': theta_oc_deg, 'y_phi_mag': y_phi_mag, 'g_phi': g_phi, 'b_phi': b_phi,
+			'r_c': r_c, 'x_m': x_m}
+
+
+def refer_series(series, turns_ratio):
+	"""Series-branch values referred to the secondary (impedances divide by a²)."""
+	a_squared = turns_ratio ** 2
+	return {
+		'z_eq_mag_sec': series['z_eq_mag'] / a_squared,
+		'r_eq_sec': series['r_eq'] / a_squared,
+		'x_eq_sec': series['x_eq'] / a_squared,
+	}
+
+
+def refer_shunt(shunt, turns_ratio):
+	"""Excitation-branch values referred to the secondary."""
+	a_squared = turns_ratio ** 2
+	r_c = shunt['r_c']
+	x_m = shunt['x_m']
+	return {
+		'y_phi_mag_sec': shunt['y_phi_mag'] / a_squared,
+		'g_phi_sec': shunt['g_phi'] / a_squared,
+		'b_phi_sec': shunt['b_phi'] / a_squared,
+		'r_c_sec': (r_c / a_squared) if r_c is not None else None,
+		'x_m_sec': (x_m / a_squared) if x_m is not None else None,
+	}
+
+
+def calculate(power, vp, vs, voc, ioc, poc, vsc, isc, psc):
+	"""Compute all equivalent-circuit parameters from nameplate and OC/SC test values."""
+	a = turns_ratio(vp, vs)
+	series = short_circuit(vsc, isc, psc)
+	shunt = open_circuit(a, voc, ioc, poc)
+	return TransformerResult(
+		power=power, vp=vp, vs=vs, turns_ratio=a,
+		**series, **shunt, **refer_series(series, a), **refer_shunt(shunt, a))
+
+
+def full_load_voltage(result, pf=1.0, leading=False, load=1.0):
+	"""Secondary terminal voltage magnitude at a given load fraction and power factor."""
+	# Current lags voltage by θ for lagging loads and leads it for leading loads
+	phi = math.acos(pf)
+	if not leading:
+		phi = -phi
+	i2 = load * result.i2_rated * complex(math.cos(phi), math.sin(phi))
+	# V2,fl = V2,nl - Z_eq2 * I2 with V2,nl = Vs (rated)
+	return abs(complex(result.vs, 0) - result.z_eq_complex_sec * i2)
+
+
+def _regulation_percent(v2_nl, v2_fl_mag):
+	if v2_fl_mag == 0:
+		return None
+	return (v2_nl - v2_fl_mag) / v2_fl_mag * 100.0
+
+
+def voltage_regulation(result, pf=1.0, leading=False, load=1.0):
+	"""Voltage regulation in percent: VR = (V_nl - V_fl) / V_fl * 100%, or None if V_fl is zero."""
+	return _regulation_percent(result.vs, full_load_voltage(result, pf, leading, load))
+
+
+def rated_load_point(result):
+	"""Rated secondary current and full-load voltage at unity power factor.
+
+	Both regulation_summary() and efficiency() start from this point; pass it to
+	them to compute it only once.
+	"""
+	return {'i2_rated': result.i2_rated, 'v2_fl': full_load_voltage(result)}
+
+
+def regulation_summary(result, rated_point=None):
+	"""Rated current, no-load/full-load voltages and VR at unity, 0.8 lagging and 0.8 leading power factor."""
+	if rated_point is None:
+		rated_point = rated_load_point(result)
+	return {
+		'i2_rated': rated_point['i2_rated'],
+		# No-load secondary voltage: V2,nl = a * V1 = Vs (rated)
+		'v2_nl': result.vs,
+		'v2_fl': rated_point['v2_fl'],
+		'vr': _regulation_percent(result.vs, rated_point['v2_fl']),
+		'vr_08_lag': voltage_regulation(result, 0.8),
+		'vr_08_lead': voltage_regulation(result, 0.8, leading=True),
+	}
+
+
+class EfficiencyResult:
+	"""Losses and efficiency of one operating point (powers in W, η in %)."""
+	__slots__ = ('p_in', 'p_out', 'p_cu', 'p_core', 'eta')
+
+	def __init__(self, p_in, p_out, p_cu, p_core, eta):
+		self.p_in = p_in
+		self.p_out = p_out
+		self.p_cu = p_cu
+		self.p_core = p_core
+		self.eta = eta
+
+	def __repr__(self):
+		fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+		return f"{type(self).__name__}({fields})"
+
+	def __eq__(self, other):
+		if not isinstance(other, EfficiencyResult):
+			return NotImplemented
+		return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+
+def efficiency(result, rated_point=None):
+	"""Losses and efficiency at rated current and unity power factor."""
+	if rated_point is None:
+		rated_point = rated_load_point(result)
+	i2_rated = rated_point['i2_rated']
+	v2_fl_mag = rated_point['v2_fl']
+
+	# Copper loss: P_cu = I2^2 * R_eq (on secondary side)
+	p_cu = (i2_rated ** 2) * result.r_eq_sec
+
+	# Core loss: P_core = V2,nl^2 / R_c (secondary side)
+	p_core = (result.vs ** 2) / result.r_c_sec if result.r_c_sec is not None else None
+
+	# Output power: P_out = V2,fl * I2 * cos(θ) (assuming unity pf)
+	p_out = v2_fl_mag * i2_rated * 1.0
+
+	# Input power: P_in = P_out + P_cu + P_core
+	p_in = p_out + p_cu + p_core if p_core is not None else None
+
+	# Efficiency: η = (P_out / P_in) * 100%
+	eta = (p_out / p_in * 100.0) if (p_in is not None and p_in != 0) else None
+	return EfficiencyResult(p_in, p_out, p_cu, p_core, eta)
@@ -0,0 +1,371 @@
+# -*- coding: utf-8 -*-
+"""Radial feeder power flow by backward/forward sweep over lines and transformer equivalent circuits, batched over load steps."""
+import argparse
+import csv
+import sys
+
+import numpy as np
+
+import circuit
+
+
+# Largest voltage change between sweeps, per unit of nominal, at which a load step has converged
+DEFAULT_TOLERANCE = 1e-9
+DEFAULT_MAX_ITERATIONS = 50
+# Load steps solved together; memory is about 64 bytes per node and step
+DEFAULT_BATCH_STEPS = 32
+
+# Network CSV columns, with the batch.py output names accepted for transformer rows
+NETWORK_COLUMNS = {
+	'parent': ('parent',),
+	'r': ('r', 'r_eq_sec'),
+	'x': ('x', 'x_eq_sec'),
+	'ratio': ('ratio', 'turns_ratio'),
+	'g': ('g', 'g_phi_sec'),
+	'b': ('b', 'b_phi_sec'),
+	'p': ('p',),
+	'q': ('q',),
+}
+NETWORK_DEFAULTS = {'ratio': 1.0, 'g': 0.0, 'b': 0.0, 'p': 0.0, 'q': 0.0}
+
+
+class _Topology:
+	"""Sweep order of a feeder: nodes renumbered by depth, so each level is a contiguous slice."""
+	def __init__(self, parent, r, x, ratio, g, b, source_voltage):
+		n = len(parent)
+		# Depth by pointer jumping; the root is its own parent
+		depth = (np.arange(n) > 0).astype(np.intp)
+		ancestor = parent.copy()
+		while (ancestor != 0).any():
+			depth, ancestor = depth + depth[ancestor], ancestor[ancestor]
+		# Within a level, children of the same parent are adjacent
+		self.order = np.lexsort((parent, depth))
+		self.inverse = np.empty(n, dtype=np.intp)
+		self.inverse[self.order] = np.arange(n)
+		self.parent = self.inverse[parent[self.order]]
+		self.inv_ratio = (1.0 / ratio)[self.order][:, None]
+		self.z = (r + 1j * x)[self.order][:, None]
+		self.r = r[self.order]
+		# Magnetizing branches sit at the primary, i.e. on the parent node, referred by 1/a²
+		y_primary = ((g + 1j * b) / (ratio * ratio))[self.order]
+		y_primary[0] = 0.0
+		self.g_primary = y_primary.real
+		self.shunt = np.zeros(n, dtype=np.complex128)
+		np.add.at(self.shunt, self.parent[1:], y_primary[1:])
+		self.shunt = self.shunt[:, None]
+
+		bounds = np.searchsorted(depth[self.order], np.arange(depth.max() + 2))
+		self.levels = []
+		for start, stop in zip(bounds[1:-1], bounds[2:]):
+			parents = self.parent[start:stop]
+			groups = np.flatnonzero(np.r_[True, parents[1:] != parents[:-1]])
+			self.levels.append((start, stop, groups, parents[groups]))
+		self.nominal = np.empty(n)
+		self.nominal[0] = abs(source_voltage)
+		for start, stop, _, _ in self.levels:
+			self.nominal[start:stop] = self.nominal[self.parent[start:stop]] * self.inv_ratio[start:stop, 0]
+
+
+class Feeder:
+	"""Radial network of lines and single-phase transformers fed from node 0, the source.
+
+	Every other node hangs off an earlier node through one branch: a series
+	impedance r + jx (Ω, referred to the node's side) behind an ideal ratio:1
+	step-down, with a shunt g + jb (S, same side) at its primary end as in the
+	approximate transformer model. Lines have ratio 1 and no shunt.
+	"""
+	def __init__(self, source_voltage):
+		self.source_voltage = source_voltage
+		self._parts = []
+		self._count = 1
+		self._topology = None
+
+	def __len__(self):
+		return self._count
+
+	def __repr__(self):
+		return f"Feeder(nodes={self._count}, source_voltage={self.source_voltage!r})"
+
+	def add_branches(self, parent, r, x, ratio=1.0, g=0.0, b=0.0):
+		"""Add one branch and node per parent; returns the new node numbers.
+
+		Parents must be earlier nodes, which may include nodes added by the same
+		call; this keeps every network radial.
+		"""
+		parent = np.atleast_1d(np.asarray(parent, dtype=np.intp))
+		n = len(parent)
+		nodes = np.arange(self._count, self._count + n)
+		if ((parent < 0) | (parent >= nodes)).any():
+			raise ValueError('Every branch must hang off an earlier node.')
+		columns = [np.broadcast_to(np.asarray(value, dtype=np.float64), (n,)) for value in (r, x, ratio, g, b)]
+		if not all(np.isfinite(column).all() for column in columns):
+			raise ValueError('Branch parameters must be finite (was an invalid transformer record added?).')
+		if (columns[2] <= 0).any():
+			raise ValueError('Turns ratios must be positive.')
+		self._parts.append((parent,) + tuple(columns))
+		self._count += n
+		self._topology = None
+		return nodes
+
+	def add_line(self, parent, r, x):
+		"""Add a line segment from node parent; returns its far-end node."""
+		return int(self.add_branches([parent], r, x)[0])
+
+	def add_transformer(self, parent, unit):
+		"""Add a transformer (engine.TransformerResult) fed from node parent; returns its secondary node."""
+		return int(self.add_transformers([parent], unit)[0])
+
+	def add_transformers(self, parent, units):
+		"""Add transformers, one per parent, from the records of a vectorized.BatchResult; returns their secondary nodes."""
+		return self.add_branches(parent, *(circuit.column(units, name)
+										   for name in ('r_eq_sec', 'x_eq_sec', 'turns_ratio', 'g_phi_sec', 'b_phi_sec')))
+
+	def branches(self):
+		"""(parent, r, x, ratio, g, b) arrays over all nodes; node 0 has no branch (parent 0, zeros)."""
+		parent = np.concatenate([[0]] + [part[0] for part in self._parts]).astype(np.intp)
+		return (parent,) + tuple(np.concatenate([[1.0 if i == 3 else 0.0]] + [part[i] for part in self._parts])
+								 for i in range(1, 6))
+
+	def topology(self):
+		if self._topology is None:
+			if self._count < 2:
+				raise ValueError('The feeder has no branches.')
+			self._topology = _Topology(*self.branches(), self.source_voltage)
+		return self._topology
+
+	def nominal_voltages(self):
+		"""No-load voltage magnitude of every node: the source voltage divided down by the turns ratios."""
+		topology = self.topology()
+		return topology.nominal[topology.inverse]
+
+	def leaves(self):
+		"""Nodes with no branches hanging off them: the service points of a feeder."""
+		parent = self.branches()[0]
+		has_child = np.zeros(self._count, dtype=bool)
+		has_child[parent[1:]] = True
+		return np.flatnonzero(~has_child)
+
+
+class FeederSolution:
+	"""Node voltages (V, complex), branch currents (A, complex, node side) and losses (W) of load steps.
+
+	Node and branch arrays have shape (steps, nodes), or (nodes,) for a single
+	step; entry k of a branch array is the branch feeding node k (node 0 has
+	none). p_loss, p_source and q_source are totals per step.
+	"""
+	__slots__ = ('voltage', 'v_pu', 'i_branch', 'p_loss_series', 'p_loss_core', 'p_loss', 'p_source', 'q_source',
+				 'iterations', 'converged')
+
+	def __init__(self, **values):
+		for name in self.__slots__:
+			setattr(self, name, values[name])
+
+	def __repr__(self):
+		return f"FeederSolution(shape={np.shape(self.voltage)}, iterations={self.iterations})"
+
+
+def _currents(topology, v, s_conj):
+	"""Backward sweep: the current into every node through its branch, loads and shunts included."""
+	# conj(S / V) as conj(S) V / |V|², which is cheaper than a complex division
+	with np.errstate(divide='ignore', invalid='ignore'):
+		i = s_conj * v / (v.real * v.real + v.imag * v.imag) + topology.shunt * v
+	for start, stop, groups, parents in reversed(topology.levels):
+		i[parents] += np.add.reduceat(i[start:stop] * topology.inv_ratio[start:stop], groups, axis=0)
+	return i
+
+
+def _voltages(topology, v, i):
+	"""Forward sweep: node voltages from the source down, in place."""
+	for start, stop, _, _ in topology.levels:
+		v[start:stop] = v[topology.parent[start:stop]] * topology.inv_ratio[start:stop] - topology.z[start:stop] * i[start:stop]
+
+
+def solve(feeder, p, q=0.0, source=None, tolerance=DEFAULT_TOLERANCE, max_iterations=DEFAULT_MAX_ITERATIONS):
+	"""Power flow of the feeder at one or many load steps, by backward/forward sweep.
+
+	p and q are the constant-power loads (W, var) at every node, shape (nodes,)
+	or (steps, nodes); node 0's load is ignored. source overrides the source
+	voltage, per step if an array. Steps that do not converge within
+	max_iterations (e.g. beyond the feeder's voltage collapse) are flagged in
+	converged.
+	"""
+	topology = feeder.topology()
+	n = len(feeder)
+	p = np.asarray(p, dtype=np.float64)
+	q = np.asarray(q, dtype=np.float64)
+	single = np.broadcast(p, q).ndim < 2
+	p, q = (np.atleast_2d(values) for values in np.broadcast_arrays(p, q))
+	if p.shape[-1] != n:
+		raise ValueError(f"Loads have {p.shape[-1]} nodes; the feeder has {n}.")
+	steps = p.shape[0]
+	# Node-major arrays, so each level of the sweep is a contiguous block of rows
+	s_conj = (p - 1j * q).T[topology.order]
+	s_conj[0] = 0.0
+	v0 = np.broadcast_to(np.asarray(feeder.source_voltage if source is None else source, dtype=np.complex128), (steps,))
+	v = np.repeat(topology.nominal[:, None].astype(np.complex128), steps, axis=1)
+	v[0] = v0
+
+	converged = np.zeros(steps, dtype=bool)
+	iterations = 0
+	scale = 1.0 / topology.nominal[:, None]
+	scale_squared = scale * scale
+	with np.errstate(invalid='ignore', over='ignore'):
+		while iterations < max_iterations and not converged.all():
+			previous = v.copy()
+			_voltages(topology, v, _currents(topology, v, s_conj))
+			iterations += 1
+			# Squared magnitudes avoid a square root per node and step
+			previous -= v
+			change = ((previous.real * previous.real + previous.imag * previous.imag) * scale_squared).max(axis=0)
+			converged = change <= tolerance * tolerance
+	i = _currents(topology, v, s_conj)
+
+	v_abs = np.abs(v)
+	p_loss_series = np.abs(i) ** 2 * topology.r[:, None]
+	p_loss_core = v_abs[topology.parent] ** 2 * topology.g_primary[:, None]
+	source_power = v[0] * i[0].conj()
+
+	def nodes(values):
+		values = values[topology.inverse].T
+		return values[0] if single else values
+
+	def totals(values):
+		return values[0] if single else values
+
+	p_loss = p_loss_series.sum(axis=0) + p_loss_core.sum(axis=0)
+	return FeederSolution(
+		voltage=nodes(v), v_pu=nodes(v_abs * scale), i_branch=nodes(i), p_loss_series=nodes(p_loss_series),
+		p_loss_core=nodes(p_loss_core), p_loss=totals(p_loss), p_source=totals(source_power.real),
+		q_source=totals(source_power.imag), iterations=iterations, converged=totals(converged))
+
+
+class SeriesSummary:
+	"""Extremes and energy over a load time series.
+
+	v_pu_min/v_pu_max and the loss energies (Wh) are per node; p_loss, p_source,
+	v_pu_min_step and converged are per step.
+	"""
+	__slots__ = ('v_pu_min', 'v_pu_max', 'energy_loss_series', 'energy_loss_core', 'p_loss', 'p_source',
+				 'v_pu_min_step', 'converged')
+
+	def __init__(self, **values):
+		for name in self.__slots__:
+			setattr(self, name, values[name])
+
+	def __repr__(self):
+		return f"SeriesSummary(steps={len(self.p_loss)}, nodes={len(self.v_pu_min)})"
+
+
+def solve_series(feeder, p, q=None, step_hours=1.0, batch_steps=DEFAULT_BATCH_STEPS, progress=None, **kwargs):
+	"""Solve a (steps, nodes) load time series batch_steps steps at a time, keeping per-node extremes and energy.
+
+	p and q may be memory-mapped arrays. progress, if given, is called with
+	(steps done, steps); remaining keyword arguments go to solve().
+	"""
+	steps, n = np.shape(p)
+	v_min = np.full(n, np.inf)
+	v_max = np.full(n, -np.inf)
+	energy_series = np.zeros(n)
+	energy_core = np.zeros(n)
+	p_loss = np.empty(steps)
+	p_source = np.empty(steps)
+	v_min_step = np.empty(steps)
+	converged = np.empty(steps, dtype=bool)
+	for start in range(0, steps, batch_steps):
+		stop = min(start + batch_steps, steps)
+		solution = solve(feeder, p[start:stop], 0.0 if q is None else q[start:stop], **kwargs)
+		v_pu = solution.v_pu[:, 1:]
+		np.minimum(v_min, solution.v_pu.min(axis=0), out=v_min)
+		np.maximum(v_max, solution.v_pu.max(axis=0), out=v_max)
+		energy_series += solution.p_loss_series.sum(axis=0) * step_hours
+		energy_core += solution.p_loss_core.sum(axis=0) * step_hours
+		p_loss[start:stop] = solution.p_loss
+		p_source[start:stop] = solution.p_source
+		v_min_step[start:stop] = v_pu.min(axis=1)
+		converged[start:stop] = solution.converged
+		del solution, v_pu
+		if progress is not None:
+			progress(stop, steps)
+	return SeriesSummary(
+		v_pu_min=v_min, v_pu_max=v_max, energy_loss_series=energy_series, energy_loss_core=energy_core,
+		p_loss=p_loss, p_source=p_source, v_pu_min_step=v_min_step, converged=converged)
+
+
+def read_network(path, source_voltage):
+	"""(Feeder, p, q) from a CSV file with one row per node after the source, in node order (1, 2, ...).
+
+	Columns: parent, r, x, and optionally ratio, g, b (transformer rows may use
+	the batch.py output names turns_ratio, r_eq_sec, x_eq_sec, g_phi_sec,
+	b_phi_sec) and the loads p, q.
+	"""
+	with open(path, newline='', encoding='utf-8-sig') as f:
+		reader = csv.reader(f)
+		header = [name.strip().lower() for name in next(reader, [])]
+		rows = list(reader)
+	columns = {}
+	for field, aliases in NETWORK_COLUMNS.items():
+		index = next((header.index(name) for name in aliases if name in header), None)
+		if index is None:
+			if field not in NETWORK_DEFAULTS:
+				raise ValueError(f"{path} needs a '{field}' column.")
+			columns[field] = np.full(len(rows), NETWORK_DEFAULTS[field])
+			continue
+		try:
+			columns[field] = np.array([float(row[index]) if row[index].strip() else NETWORK_DEFAULTS.get(field, np.nan)
+									   for row in rows])
+		except (IndexError, ValueError):
+			raise ValueError(f"{path}: column '{field}' has a missing or non-numeric value.") from None
+	feeder = Feeder(source_voltage)
+	feeder.add_branches(columns['parent'], columns['r'], columns['x'], columns['ratio'], columns['g'], columns['b'])
+	return feeder, np.r_[0.0, columns['p']], np.r_[0.0, columns['q']]
+
+
+def run_cli(argv=None):
+	"""Solve a feeder read from CSV at its own loads, or through a load time series."""
+	parser = argparse.ArgumentParser(
+		prog='feeder.py', description='Radial feeder power flow through lines and transformer equivalent circuits.')
+	parser.add_argument('network', help='network .csv: parent, r, x[, ratio, g, b, p, q], one row per node')
+	parser.add_argument('--source', type=float, required=True, help='source voltage (V)')
+	parser.add_argument('--loads', help='(steps, nodes) .npy of real power per node, instead of the p column')
+	parser.add_argument('--reactive', help='(steps, nodes) .npy of reactive power per node (with --loads)')
+	parser.add_argument('--step-hours', type=float, default=1.0, help='hours per load step (default: %(default)s)')
+	parser.add_argument('--output', help='per-node results .csv')
+	args = parser.parse_args(argv)
+
+	try:
+		feeder, p, q = read_network(args.network, args.source)
+		if args.loads:
+			p = np.load(args.loads, mmap_mode='r')
+			q = np.load(args.reactive, mmap_mode='r') if args.reactive else None
+			summary = solve_series(feeder, p, q, args.step_hours)
+			v_low, v_high = summary.v_pu_min, summary.v_pu_max
+			loss_wh = summary.energy_loss_series + summary.energy_loss_core
+		else:
+			solution = solve(feeder, p, q)
+			v_low = v_high = solution.v_pu
+			loss_wh = solution.p_loss_series + solution.p_loss_core
+	except (OSError, ValueError) as e:
+		print(f"Error: {e}", file=sys.stderr)
+		return 1
+
+	leaves = feeder.leaves()
+	worst = leaves[np.argmin(v_low[leaves])]
+	if args.loads:
+		print(f"{len(feeder)} nodes, {len(p)} steps: {summary.converged.sum()} converged")
+		print(f"Losses {summary.p_loss.sum() * args.step_hours / 1000:.6g} kWh of "
+			  f"{summary.p_source.sum() * args.step_hours / 1000:.6g} kWh supplied")
+	else:
+		print(f"{len(feeder)} nodes, {solution.iterations} iterations{'' if solution.converged else ' (not converged)'}")
+		print(f"Losses {solution.p_loss:.6g} W of {solution.p_source:.6g} W supplied")
+	print(f"Lowest service voltage {v_low[worst]:.4f} pu at node {worst}, highest {v_high[leaves].max():.4f} pu")
+	if args.output:
+		with open(args.output, 'w', newline='', encoding='utf-8') as f:
+			writer = csv.writer(f)
+			writer.writerow(['node', 'v_pu_min', 'v_pu_max', 'loss_wh' if args.loads else 'loss_w'])
+			for node in range(len(feeder)):
+				writer.writerow([node, f"{v_low[node]:.6f}", f"{v_high[node]:.6f}", f"{loss_wh[node]:.6g}"])
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(run_cli())
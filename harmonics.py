@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+"""Harmonic load loss, K-factor and kVA derating from load current spectra (IEEE C57.110 method)."""
+import argparse
+import sys
+
+import numpy as np
+
+import engine
+import waveform
+
+
+# Winding eddy-current and other stray loss at rated sinusoidal current, per unit of the I²R_dc loss.
+# Not separable from the short-circuit test, so they come from the manufacturer or these typical values.
+DEFAULT_EDDY_FRACTION = 0.1
+DEFAULT_STRAY_FRACTION = 0.0
+
+# Exponent of the harmonic order for other stray losses (structural parts), as in IEEE C57.110
+STRAY_EXPONENT = 0.8
+
+# Analysis window in fundamental cycles (10 at 50 Hz and 12 at 60 Hz give IEC 61000-4-7's ~200 ms)
+DEFAULT_BLOCK_CYCLES = 10
+DEFAULT_MAX_ORDER = 50
+
+# Windows per FFT call when streaming a capture
+BLOCKS_PER_CHUNK = 256
+
+
+class HarmonicLosses:
+	"""Load losses (W), K-factor and derating of units under non-sinusoidal current; arrays broadcast over units.
+
+	p_sinusoidal is the I²R_eq loss the sinusoidal model gives for the same RMS
+	current; derating is the largest RMS current (per unit of rated) this
+	spectrum shape allows without exceeding the rated load loss.
+	"""
+	__slots__ = ('i_rms', 'thd', 'k_factor', 'f_hl_stray', 'p_dc', 'p_eddy', 'p_stray', 'p_load_loss',
+				 'p_sinusoidal', 'derating', 'derated_power')
+
+	def __init__(self, **values):
+		for name in self.__slots__:
+			setattr(self, name, values[name])
+
+	def __repr__(self):
+		fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+		return f"{type(self).__name__}({fields})"
+
+	@property
+	def harmonic_loss_ratio(self):
+		"""Load loss relative to the sinusoidal model at the same RMS current."""
+		with np.errstate(divide='ignore', invalid='ignore'):
+			return self.p_load_loss / self.p_sinusoidal
+
+
+def load_losses(r_eq_sec, i2_rated, orders, currents, power=None, eddy_fraction=DEFAULT_EDDY_FRACTION,
+				stray_fraction=DEFAULT_STRAY_FRACTION, per_unit=False):
+	"""Harmonic-weighted load losses of many units at once.
+
+	currents holds the RMS current of each harmonic order (last axis, A on the
+	secondary side, or per unit of rated current if per_unit); the leading axes
+	broadcast against r_eq_sec, i2_rated and power. R_eq, measured at the
+	fundamental, is taken to include the rated eddy and stray fractions:
+	R_eq = R_dc * (1 + eddy_fraction + stray_fraction).
+	"""
+	orders = np.asarray(orders, dtype=np.float64)
+	r_eq_sec = np.asarray(r_eq_sec, dtype=np.float64)
+	i2_rated = np.asarray(i2_rated, dtype=np.float64)
+	currents = np.asarray(currents, dtype=np.float64)
+	if per_unit:
+		currents = currents * i2_rated[..., None]
+	squared = currents * currents
+	r_dc = r_eq_sec / (1.0 + eddy_fraction + stray_fraction)
+
+	with np.errstate(divide='ignore', invalid='ignore'):
+		i_squared = squared.sum(axis=-1)
+		eddy_sum = (squared * orders ** 2).sum(axis=-1)
+		stray_sum = (squared * orders ** STRAY_EXPONENT).sum(axis=-1)
+		# K-factor (UL 1561) equals IEEE C57.110's F_HL: both normalize Σ I_h² h² by Σ I_h²
+		k_factor = eddy_sum / i_squared
+		f_hl_stray = stray_sum / i_squared
+		fundamental = squared[..., orders == 1].sum(axis=-1)
+		thd = np.sqrt((squared[..., orders > 1].sum(axis=-1)) / fundamental) * 100.0
+
+		p_dc = i_squared * r_dc
+		p_eddy = eddy_fraction * r_dc * eddy_sum
+		p_stray = stray_fraction * r_dc * stray_sum
+		# Largest per-unit current whose load loss stays at the rated (sinusoidal) load loss
+		derating = np.sqrt((1.0 + eddy_fraction + stray_fraction)
+						   / (1.0 + k_factor * eddy_fraction + f_hl_stray * stray_fraction))
+		derating = np.minimum(derating, 1.0)
+	return HarmonicLosses(
+		i_rms=np.sqrt(i_squared), thd=thd, k_factor=k_factor, f_hl_stray=f_hl_stray,
+		p_dc=p_dc, p_eddy=p_eddy, p_stray=p_stray, p_load_loss=p_dc + p_eddy + p_stray,
+		p_sinusoidal=i_squared * r_eq_sec, derating=derating,
+		derated_power=None if power is None else derating * np.asarray(power, dtype=np.float64))
+
+
+def result_losses(result, orders, currents, **kwargs):
+	"""load_losses() for an engine.TransformerResult."""
+	return load_losses(result.r_eq_sec, result.i2_rated, orders, currents, power=result.power, **kwargs)
+
+
+# SPECTRA from sampled current
+class _SpectrumAccumulator:
+	"""Mean square of each harmonic over whole-cycle analysis windows."""
+	def __init__(self, block, block_cycles, max_order):
+		self.block = block
+		# With block_cycles cycles per window, harmonic h falls in FFT bin h * block_cycles
+		self.bins = np.arange(max_order + 1) * block_cycles
+		if self.bins[-1] > block // 2:
+			raise ValueError(f"The sample rate is too low to resolve harmonic {max_order}.")
+		self.sum_squares = np.zeros(max_order + 1)
+		self.blocks = 0
+
+	def add(self, samples):
+		"""Add whole windows from samples; returns the number of samples used."""
+		count = len(samples) // self.block
+		if not count:
+			return 0
+		windows = samples[:count * self.block].reshape(count, self.block)
+		spectrum = np.fft.rfft(windows, axis=1)[:, self.bins]
+		# RMS of a harmonic is |X| * sqrt(2) / N; the DC bin is |X| / N
+		rms = np.abs(spectrum) * (np.sqrt(2.0) / self.block)
+		rms[:, 0] /= np.sqrt(2.0)
+		self.sum_squares += (rms * rms).sum(axis=0)
+		self.blocks += count
+		return count * self.block
+
+	def spectrum(self):
+		if not self.blocks:
+			raise ValueError('The recording is shorter than one analysis window.')
+		return np.sqrt(self.sum_squares / self.blocks)
+
+
+def _window(sample_rate, fundamental, block_cycles):
+	if fundamental <= 0 or sample_rate <= 0:
+		raise ValueError('Sample rate and fundamental frequency must be positive.')
+	return int(round(block_cycles * sample_rate / fundamental))
+
+
+def current_spectrum(samples, sample_rate, fundamental, max_order=DEFAULT_MAX_ORDER,
+					 block_cycles=DEFAULT_BLOCK_CYCLES):
+	"""(orders, RMS current per order) of a recorded current, averaged in power over block_cycles-cycle windows.
+
+	samples may be 2-D (units, samples) to analyze many recordings of the same
+	length at once. Order 0 is the DC component.
+	"""
+	block = _window(sample_rate, fundamental, block_cycles)
+	samples = np.asarray(samples, dtype=np.float64)
+	count = samples.shape[-1] // block
+	if not count:
+		raise ValueError('The recording is shorter than one analysis window.')
+	accumulator = _SpectrumAccumulator(block, block_cycles, max_order)
+	windows = samples[..., :count * block].reshape(samples.shape[:-1] + (count, block))
+	rms = np.abs(np.fft.rfft(windows, axis=-1)[..., accumulator.bins]) * (np.sqrt(2.0) / block)
+	rms[..., 0] /= np.sqrt(2.0)
+	return np.arange(max_order + 1), np.sqrt((rms * rms).mean(axis=-2))
+
+
+def capture_spectrum(capture, channel=1, scale=1.0, fundamental=60.0, max_order=DEFAULT_MAX_ORDER,
+					 block_cycles=DEFAULT_BLOCK_CYCLES, progress=None):
+	"""current_spectrum() of one channel of a waveform.Capture, streamed in memory-mapped chunks.
+
+	Samples times scale are amperes. progress, if given, is called with (frames done, frames).
+	"""
+	if not 0 <= channel < capture.channels:
+		raise ValueError(f"Channel {channel} does not exist in a {capture.channels}-channel capture.")
+	block = _window(capture.sample_rate, fundamental, block_cycles)
+	accumulator = _SpectrumAccumulator(block, block_cycles, max_order)
+	chunk = block * BLOCKS_PER_CHUNK
+	for start in range(0, capture.frames - block + 1, chunk):
+		stop = min(start + chunk, capture.frames)
+		frames = capture.read(start, stop)
+		accumulator.add((frames[:, channel].astype(np.float64) - capture.zero) * scale)
+		del frames
+		if progress is not None:
+			progress(stop, capture.frames)
+	return np.arange(max_order + 1), accumulator.spectrum()
+
+
+def run_cli(argv=None):
+	"""Print the harmonic content of a load current capture and the resulting losses and derating of one unit."""
+	parser = argparse.ArgumentParser(
+		prog='harmonics.py', description='Harmonic load loss, K-factor and derated kVA from a load current capture.')
+	parser.add_argument('capture', help='load current capture (.wav, or raw .bin/.raw/.dat)')
+	parser.add_argument('--inputs', nargs=9, type=float, required=True,
+		metavar=('S', 'V1', 'V2', 'VOC', 'IOC', 'POC', 'VSC', 'ISC', 'PSC'), help='nameplate and test values of the unit')
+	parser.add_argument('--channel', type=int, default=1, help='current channel (default: %(default)s)')
+	parser.add_argument('--scale', type=float, default=1.0, help='secondary amperes per sample unit (default: %(default)s)')
+	parser.add_argument('--fundamental', type=float, default=60.0, help='fundamental frequency in Hz (default: %(default)s)')
+	parser.add_argument('--max-order', type=int, default=DEFAULT_MAX_ORDER, help='highest harmonic (default: %(default)s)')
+	parser.add_argument('--eddy-fraction', type=float, default=DEFAULT_EDDY_FRACTION,
+		help='rated winding eddy loss per unit of I²R (default: %(default)s)')
+	parser.add_argument('--stray-fraction', type=float, default=DEFAULT_STRAY_FRACTION,
+		help='rated other stray loss per unit of I²R (default: %(default)s)')
+	parser.add_argument('--sample-rate', type=float, help='raw captures: samples per second per channel')
+	parser.add_argument('--channels', type=int, default=2, help='raw captures: interleaved channels (default: %(default)s)')
+	parser.add_argument('--dtype', default='<i2', help='raw captures: NumPy sample type (default: %(default)s)')
+	args = parser.parse_args(argv)
+
+	try:
+		result = engine.calculate(*args.inputs)
+		capture = waveform.open_capture(args.capture, args.sample_rate, args.channels, args.dtype)
+		orders, currents = capture_spectrum(capture, args.channel, args.scale, args.fundamental, args.max_order)
+		losses = result_losses(result, orders, currents, eddy_fraction=args.eddy_fraction,
+							   stray_fraction=args.stray_fraction)
+	except (OSError, ValueError) as e:
+		print(f"Error: {e}", file=sys.stderr)
+		return 1
+	print(f"I_rms = {losses.i_rms:.6g} A, THD = {losses.thd:.2f}%, K-factor = {losses.k_factor:.3f}")
+	print(f"Load loss = {losses.p_load_loss:.6g} W (I²R_dc {losses.p_dc:.6g} W, eddy {losses.p_eddy:.6g} W, "
+		  f"stray {losses.p_stray:.6g} W), {losses.harmonic_loss_ratio:.3f} x the sinusoidal model")
+	print(f"Derated capacity = {losses.derating * 100:.1f}% of rated, {losses.derated_power / 1000:.6g} kVA")
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(run_cli())
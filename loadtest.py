@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+"""Load-test harness for the calculation service: keep-alive connections against localhost, throughput and latency."""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+import bench
+import vectorized
+
+
+DEFAULT_CONNECTIONS = 16
+DEFAULT_DURATION = 5.0
+DEFAULT_BATCH_SIZE = 1000
+# Distinct units cycled through by /calculate clients; well above the service's cache size, so
+# requests measure the calculation rather than cache hits
+DEFAULT_UNITS = 1 << 14
+ENDPOINTS = ('calculate', 'batch')
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+class LoadResult:
+	"""Requests completed in a run, with throughput and latency percentiles (ms)."""
+	__slots__ = ('requests', 'failures', 'seconds', 'records_per_request', 'latencies_ms')
+
+	def __init__(self, requests, failures, seconds, records_per_request, latencies_ms):
+		self.requests = requests
+		self.failures = failures
+		self.seconds = seconds
+		self.records_per_request = records_per_request
+		self.latencies_ms = latencies_ms
+
+	def __repr__(self):
+		return f"LoadResult(requests={self.requests}, failures={self.failures}, rps={self.requests_per_second:.0f})"
+
+	@property
+	def requests_per_second(self):
+		return self.requests / self.seconds if self.seconds > 0 else 0.0
+
+	@property
+	def records_per_second(self):
+		return self.requests_per_second * self.records_per_request
+
+	def percentile(self, q):
+		if not self.latencies_ms:
+			return None
+		return float(np.percentile(self.latencies_ms, q))
+
+	def format(self):
+		lines = [
+			f"{self.requests:,} requests in {self.seconds:.2f} s, {self.failures} failed: "
+			f"{self.requests_per_second:,.0f} requests/s"
+			+ (f", {self.records_per_second:,.0f} records/s" if self.records_per_request > 1 else ''),
+		]
+		if self.latencies_ms:
+			lines.append(
+				f"latency ms: mean {statistics.fmean(self.latencies_ms):.3f}, p50 {self.percentile(50):.3f}, "
+				f"p90 {self.percentile(90):.3f}, p99 {self.percentile(99):.3f}, max {max(self.latencies_ms):.3f}")
+		return '\n'.join(lines)
+
+
+def request_body(endpoint, batch_size=DEFAULT_BATCH_SIZE, seed=0):
+	"""(path, JSON body) of a representative request: one unit around the example, or batch_size distinct units.
+
+	Different seeds give different units, so a sequence of /calculate requests
+	is not answered from the service's cache.
+	"""
+	if endpoint == 'calculate':
+		unit = [float(column[0]) for column in bench.random_records(1, seed)]
+		return '/calculate', json.dumps(dict(zip(vectorized.INPUT_FIELDS, unit))).encode()
+	columns = bench.random_records(batch_size, seed)
+	return '/batch', json.dumps({'columns': {
+		name: column.tolist() for name, column in zip(vectorized.INPUT_FIELDS, columns)}}).encode()
+
+
+def request_bodies(endpoint, batch_size=DEFAULT_BATCH_SIZE, units=DEFAULT_UNITS, seed=0):
+	"""(path, [JSON bodies]): units distinct /calculate requests, or one /batch request."""
+	if endpoint == 'calculate':
+		columns = bench.random_records(units, seed)
+		return '/calculate', [json.dumps(dict(zip(vectorized.INPUT_FIELDS, unit))).encode()
+							  for unit in zip(*(column.tolist() for column in columns))]
+	path, body = request_body(endpoint, batch_size, seed)
+	return path, [body]
+
+
+async def _client(host, port, requests, offset, deadline, latencies, counts):
+	"""One keep-alive connection sending requests back to back until the deadline, cycling from offset."""
+	reader, writer = await asyncio.open_connection(host, port, limit=1 << 24)
+	clock = time.perf_counter
+	sent = offset
+	try:
+		while clock() < deadline:
+			start = clock()
+			writer.write(requests[sent % len(requests)])
+			sent += 1
+			head = await reader.readuntil(b'\r\n\r\n')
+			length = 0
+			for line in head.split(b'\r\n')[1:]:
+				if line[:15].lower() == b'content-length:':
+					length = int(line[15:])
+			await reader.readexactly(length)
+			latencies.append((clock() - start) * 1e3)
+			if head[9:12] == b'200':
+				counts[0] += 1
+			else:
+				counts[1] += 1
+	finally:
+		writer.close()
+
+
+async def _run_async(host, port, path, bodies, connections, duration, offset=0):
+	requests = [(f"POST {path} HTTP/1.1\r\nHost: {host}:{port}\r\nContent-Type: application/json\r\n"
+				 f"Content-Length: {len(body)}\r\n\r\n").encode() + body for body in bodies]
+	latencies = []
+	counts = [0, 0]
+	start = time.perf_counter()
+	deadline = start + duration
+	# Connections start at different points of the request list
+	step = max(len(requests) // connections, 1)
+	await asyncio.gather(*(_client(host, port, requests, offset + i * step, deadline, latencies, counts)
+						   for i in range(connections)))
+	return counts[0], counts[1], time.perf_counter() - start, latencies
+
+
+def _run_process(args):
+	return asyncio.run(_run_async(*args))
+
+
+def run(host, port, endpoint='calculate', connections=DEFAULT_CONNECTIONS, duration=DEFAULT_DURATION,
+		batch_size=DEFAULT_BATCH_SIZE, processes=1, warm_up=0.5, units=DEFAULT_UNITS):
+	"""Drive the service with connections keep-alive clients per process for duration seconds.
+
+	Each client sends its next request as soon as the previous response
+	arrives. /calculate clients cycle through units distinct units (units=1
+	measures cache hits). A short warm-up run (not counted) comes first.
+	"""
+	path, bodies = request_bodies(endpoint, batch_size, units)
+	if warm_up > 0:
+		asyncio.run(_run_async(host, port, path, bodies, min(connections, 4), warm_up))
+	args = [(host, port, path, bodies, connections, duration, i * len(bodies) // processes) for i in range(processes)]
+	if processes > 1:
+		with multiprocessing.Pool(processes) as pool:
+			parts = pool.map(_run_process, args)
+	else:
+		parts = [_run_process(args[0])]
+	latencies = [value for part in parts for value in part[3]]
+	return LoadResult(
+		requests=sum(part[0] for part in parts), failures=sum(part[1] for part in parts),
+		seconds=max(part[2] for part in parts), records_per_request=batch_size if endpoint == 'batch' else 1,
+		latencies_ms=latencies)
+
+
+class LocalServer:
+	"""service.py in a child process on a free localhost port; use as a context manager."""
+	def __init__(self, extra_args=()):
+		self.extra_args = list(extra_args)
+		self.process = None
+		self.host = '127.0.0.1'
+		self.port = None
+
+	def __enter__(self):
+		self.process = subprocess.Popen(
+			[sys.executable, os.path.join(HERE, 'service.py'), '--host', self.host, '--port', '0'] + self.extra_args,
+			cwd=HERE, stdout=subprocess.PIPE, text=True)
+		line = self.process.stdout.readline()
+		if not line.startswith('Serving on '):
+			self.process.kill()
+			raise RuntimeError('The service did not start.')
+		self.port = int(line.rsplit(':', 1)[1])
+		return self
+
+	def __exit__(self, *exc_info):
+		self.process.terminate()
+		self.process.wait(timeout=10)
+		return False
+
+
+def run_cli(argv=None):
+	"""Command-line entry point: load-test a running service, or one started for the run."""
+	parser = argparse.ArgumentParser(prog='loadtest.py', description='Load-test the calculation service on localhost.')
+	parser.add_argument('--endpoint', choices=ENDPOINTS, action='append', help='endpoint to test (repeatable; default: both)')
+	parser.add_argument('--port', type=int, help='port of a running service (default: start one for the run)')
+	parser.add_argument('--connections', type=int, default=DEFAULT_CONNECTIONS,
+		help='keep-alive connections per process (default: %(default)s)')
+	parser.add_argument('--processes', type=int, default=1, help='client processes (default: %(default)s)')
+	parser.add_argument('--duration', type=float, default=DEFAULT_DURATION, help='seconds per endpoint (default: %(default)s)')
+	parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+		help='units per batch request (default: %(default)s)')
+	parser.add_argument('--units', type=int, default=DEFAULT_UNITS,
+		help='distinct units sent to /calculate; 1 measures cache hits (default: %(default)s)')
+	args = parser.parse_args(argv)
+
+	def test(port):
+		for endpoint in args.endpoint or ENDPOINTS:
+			print(f"POST /{endpoint}, {args.processes} x {args.connections} connections, {args.duration:g} s")
+			print(run('127.0.0.1', port, endpoint, args.connections, args.duration, args.batch_size, args.processes,
+					  units=args.units).format())
+
+	try:
+		if args.port:
+			test(args.port)
+		else:
+			with LocalServer() as server:
+				test(server.port)
+	except (OSError, RuntimeError) as e:
+		print(f"Error: {e}", file=sys.stderr)
+		return 1
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(run_cli())
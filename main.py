@@ -1,18 +1,38 @@
 ﻿# -*- coding: utf-8 -*-
+import importlib
 import sys
-import math
-from PyQt6.QtWidgets import (
+import time
+# Reference point for --startup-time, taken before the heavy imports; the imports below
+# must come after it to be counted, hence the E402 exemptions
+_START_TIME = time.perf_counter()
+import math  # noqa: E402
+from PyQt6.QtWidgets import (  # noqa: E402
 	QApplication, QMainWindow, QWidget, QVBoxLayout, QLabel,
 	QLineEdit, QPushButton, QTabWidget, QFormLayout, QMessageBox,
-	QHBoxLayout, QGroupBox, QGridLayout, QSizePolicy
+	QHBoxLayout, QGroupBox, QGridLayout, QSizePolicy, QProgressBar, QFileDialog,
+	QDialog, QTableWidget, QTableWidgetItem, QHeaderView, QTableView, QAbstractItemView,
+	QComboBox, QSplitter
 )
-from PyQt6.QtGui import QPixmap, QFont
-from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QFont, QPainter, QPen, QColor, QImage, QPolygonF  # noqa: E402
+from PyQt6.QtCore import Qt, QEvent, QObject, QPointF, QRectF, QTimer, QAbstractTableModel, QModelIndex  # noqa: E402
+
+import engine  # noqa: E402
+import metrics  # noqa: E402
+import pixmaps  # noqa: E402
+import resultmodel  # noqa: E402
+import tasks  # noqa: E402
 
 
 class InputPage(QWidget):
-	def __init__(self, parent=None):
+	# Quiet period after the last keystroke before live results are recomputed
+	LIVE_DEBOUNCE_MS = 150
+
+	def __init__(self, parent=None, task_manager=None, results=None):
 		super().__init__(parent)
+		# Long-running jobs (batch files) run on this tasks.TaskManager
+		self.task_manager = task_manager
+		# Shared resultmodel.ResultModel the result pages subscribe to
+		self.results = results if results is not None else resultmodel.ResultModel(self)
 		# Main vertical layout
 		main_layout = QVBoxLayout()
 		main_layout.setContentsMargins(5, 5, 5, 5)
@@ -124,12 +144,7 @@ class InputPage(QWidget):
 		right_group = QGroupBox()
 		right_layout = QVBoxLayout()
 		self.image_label = QLabel()
-		pixmap = QPixmap('img1.jpeg')
-		if not pixmap.isNull():
-			scaled_pixmap = pixmap.scaled(200, 200, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
-			self.image_label.setPixmap(scaled_pixmap)
-		else:
-			self.image_label.setText('Image not found')
+		pixmaps.cache.set_image(self.image_label, 'img1.jpeg', 200, 200)
 		self.image_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
 		self.image_label.setStyleSheet('border: 1px solid #ccc;')
 		self.image_label.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
@@ -148,289 +163,162 @@ class InputPage(QWidget):
 		btn_box = QHBoxLayout()
 		btn_box.addStretch()
 		btn_box.addWidget(calc_btn)
+		if task_manager is not None:
+			batch_btn = QPushButton('Batch File...')
+			batch_btn.clicked.connect(self.run_batch_file)
+			batch_btn.setFixedWidth(120)
+			btn_box.addWidget(batch_btn)
+			uncertainty_btn = QPushButton('Uncertainty...')
+			uncertainty_btn.clicked.connect(self.run_uncertainty)
+			uncertainty_btn.setFixedWidth(120)
+			btn_box.addWidget(uncertainty_btn)
+			waveform_btn = QPushButton('Waveforms...')
+			waveform_btn.clicked.connect(self.run_waveforms)
+			waveform_btn.setFixedWidth(120)
+			btn_box.addWidget(waveform_btn)
 		btn_box.addStretch()
 		main_layout.addLayout(btn_box)
 
 		self.setLayout(main_layout)
 
+		# Live recompute: edits are debounced, then only the affected graph nodes and visible pages update
+		self.results.subscribe(self, ('turns_ratio', 'series'), self._show_series, 'input')
+		self._live_timer = QTimer(self)
+		self._live_timer.setSingleShot(True)
+		self._live_timer.setInterval(self.LIVE_DEBOUNCE_MS)
+		self._live_timer.timeout.connect(self._live_update)
+		for field in self._input_fields().values():
+			field.textChanged.connect(self._live_timer.start)
+
+	def _input_fields(self):
+		"""Input line edits keyed by engine argument name, in engine.calculate() order."""
+		return {
+			'power': self.power_rating, 'vp': self.primary_voltage, 'vs': self.secondary_voltage,
+			'voc': self.voc, 'ioc': self.ioc, 'poc': self.poc,
+			'vsc': self.vsc, 'isc': self.isc, 'psc': self.psc,
+		}
+
 	def calculate(self):
 		"""Main calculation method that validates inputs and computes all transformer parameters."""
-		print("\n=== CALCULATE BUTTON CLICKED ===")
+		metrics.count('calculate')
 		# Validate and parse all input fields
 		try:
-			power = float(self.power_rating.text())
-			print(f"Power: {power}")
-			print(f"Power: {power}")
-			vp = float(self.primary_voltage.text())
-			print(f"Primary Voltage: {vp}")
-			vs = float(self.secondary_voltage.text())
-			voc = float(self.voc.text())
-			ioc = float(self.ioc.text())
-			poc = float(self.poc.text())
-			vsc = float(self.vsc.text())
-			isc = float(self.isc.text())
-			psc = float(self.psc.text())
+			with metrics.span('input.parse'):
+				power = float(self.power_rating.text())
+				vp = float(self.primary_voltage.text())
+				vs = float(self.secondary_voltage.text())
+				voc = float(self.voc.text())
+				ioc = float(self.ioc.text())
+				poc = float(self.poc.text())
+				vsc = float(self.vsc.text())
+				isc = float(self.isc.text())
+				psc = float(self.psc.text())
 		except ValueError:
+			metrics.count('calculate.input_error')
 			QMessageBox.warning(self, 'Input Error', 'Please ensure all fields are numeric and not empty.')
 			return
 
-		# Validate step-down configuration
-		if vs > vp:
-			QMessageBox.warning(self, 'Configuration Error', 'Only step-down transformers are permitted (Vs ≤ Vp).')
-			return
-
-		# Calculate transformer turns ratio: a = N1/N2 = Vp/Vs
-		if vs == 0:
-			QMessageBox.warning(self, 'Calculation Error', 'Secondary voltage cannot be zero.')
-			return
-		turns_ratio = vp / vs
-		
-		# Display transformer turns ratio
-		self.ratio_display.setText(f"{turns_ratio:.2f}")
-
-		# SHORT-CIRCUIT TEST: Compute series impedance parameters
-		# Power factor: PF_sc = P_sc / (V_sc * I_sc)
-		if vsc * isc == 0:
-			QMessageBox.warning(self, 'Calculation Error', 'Vsc and Isc must be non-zero to compute power factor.')
-			return
-		pf_sc = psc / (vsc * isc)
-		pf_sc_clamped = max(-1.0, min(1.0, pf_sc))
-		theta_sc_rad = math.acos(pf_sc_clamped)
-		theta_sc_deg = math.degrees(theta_sc_rad)
-		
-		# Update power factor and phase angle displays
-		self.pf_display.setText(f"{pf_sc:.2f}")
-		self.phase_display.setText(f"{theta_sc_deg:.2f}")
-
-		a_squared = turns_ratio ** 2
-
-		# |Z_eq| = V_sc / I_sc
-		z_eq_mag = vsc / isc
-		
-		# R_eq = P_sc / I_sc^2
-		r_eq = psc / (isc ** 2)
-		
-		# X_eq = sqrt(|Z_eq|^2 - R_eq^2)
-		x_eq_sq = z_eq_mag ** 2 - r_eq ** 2
-		if x_eq_sq < 0:
-			QMessageBox.warning(self, 'Calculation Warning', 
-							   'Inconsistent impedance values detected. Setting X_eq to zero.')
-			x_eq = 0.0
-		else:
-			x_eq = math.sqrt(x_eq_sq)
-
-		# Z_eq in polar form
-		z_eq_polar = f"{z_eq_mag:.2f} ∠ {theta_sc_deg:.2f}°"
-
-		# OPEN-CIRCUIT TEST: Compute excitation branch parameters
-		# Y_Ï• magnitude: |Y_Ï•| = I_oc / V_oc
-		if voc == 0:
-			QMessageBox.warning(self, 'Calculation Error', 'Voc cannot be zero.')
-			return
-		y_phi_mag = a_squared * ioc / voc
-		
-		# Power factor (open-circuit): PF_oc = P_oc / (V_oc * I_oc)
-		if voc * ioc == 0:
-			QMessageBox.warning(self, 'Calculation Error', 'Voc and Ioc must be non-zero.')
+		# Validate in the headless engine; the pages are filled from the result model's graph below
+		try:
+			result = engine.calculate(power, vp, vs, voc, ioc, poc, vsc, isc, psc)
+		except engine.CalculationError as e:
+			metrics.count('calculate.error')
+			QMessageBox.warning(self, e.title, str(e))
 			return
-		pf_oc = poc / (voc * ioc)
-		pf_oc_clamped = max(-1.0, min(1.0, pf_oc))
-		theta_oc_rad = math.acos(pf_oc_clamped)
-		theta_oc_deg = math.degrees(theta_oc_rad)
-
-		# G_φ = |Y_φ| * cos(θ_oc)
-		g_phi = abs(y_phi_mag) * math.cos(-theta_oc_rad)
-		
-		# B_Ï• = |Y_Ï•| * sin(θ_oc)
-		b_phi = y_phi_mag * math.sin(-theta_oc_rad)
-		
-		# R_c = 1 / G_Ï•
-		r_c = (a_squared **2) * (1.0 / g_phi) if g_phi > 1e-12 else None
-		
-		# X_m = 1 / |B_Ï•|
-		x_m = (a_squared **2) * (1.0 / abs(b_phi)) if abs(b_phi) > 1e-12 else None
+		for message in result.warnings:
+			QMessageBox.warning(self, 'Calculation Warning', message)
 
-		# Format Z_Ï• as rectangular form
-		z_phi_rect = None
-		if r_c is not None and x_m is not None:
-			z_phi_rect = f"{r_c:.2f} + j{x_m:.2f} Ω"
+		# Publish the inputs now; the ratio displays and the visible tab update, other tabs when opened
+		self._live_timer.stop()
+		self._live_update()
+		self.results.flush()
 
-		# REFERRED PARAMETERS: Calculate secondary-side values using turns ratio
-		# Z_eq2 = Z_eq1 / a^2 (impedances divide by a² when referred to secondary)
-		
-		z_eq_mag_sec = z_eq_mag / a_squared
-		r_eq_sec = r_eq / a_squared
-		x_eq_sec = x_eq / a_squared
-		z_eq_polar_sec = f"{z_eq_mag_sec:.4f} ∠ {theta_sc_deg:.4f}°"
-
-		# Y_φ2, G_φ2, B_φ2 (admittances multiply by a² when referred to secondary)
-		y_phi_mag_sec = y_phi_mag / a_squared
-		g_phi_sec = g_phi / a_squared
-		b_phi_sec = b_phi / a_squared
-		
-		# R_c2, X_m2 (impedances divide by a² when referred to secondary)
-		r_c_sec = (r_c / a_squared) if r_c is not None else None
-		x_m_sec = (x_m / a_squared) if x_m is not None else None
-		z_phi_rect_sec = None
-		if r_c_sec is not None and x_m_sec is not None:
-			z_phi_rect_sec = f"{r_c_sec:.4f} + j{x_m_sec:.4f} Ω"
-
-		# Update all tabs with calculated values
-		self._update_tabs(
-			# Primary side parameters
-			z_eq_polar, r_eq, x_eq, y_phi_mag, theta_oc_deg, g_phi, b_phi, r_c, x_m, z_phi_rect,
-			# Secondary side parameters
-			z_eq_polar_sec, r_eq_sec, x_eq_sec, y_phi_mag_sec, g_phi_sec, b_phi_sec, r_c_sec, x_m_sec, z_phi_rect_sec,
-			# Common parameters
-			power, vs, vp, turns_ratio
-		)
-		
 		# Show success message
-		print("Calculation completed successfully!")
 		QMessageBox.information(self, 'Success', 'Calculations completed! Check all tabs for results.')
 
-	def _update_tabs(self, z_eq_polar, r_eq, x_eq, y_phi_mag, theta_oc_deg, g_phi, b_phi, r_c, x_m, z_phi_rect,
-					 z_eq_polar_sec, r_eq_sec, x_eq_sec, y_phi_mag_sec, g_phi_sec, b_phi_sec, r_c_sec, x_m_sec, z_phi_rect_sec,
-					 power, vs, vp, turns_ratio):
-		"""Update Impedances, Voltage Regulation, and Efficiency tabs with computed values."""
-		# Find parent tab widget
-		parent = self.parent()
-		while parent is not None and not isinstance(parent, QTabWidget):
-			parent = parent.parent()
-		if parent is None:
+	def run_batch_file(self):
+		"""Evaluate a CSV/Parquet file of test records in the background (see batch.run())."""
+		input_path, _ = QFileDialog.getOpenFileName(
+			self, 'Batch Input', '', 'Test records (*.csv *.parquet *.pq);;All files (*)')
+		if not input_path:
 			return
-
-		# Iterate through all tabs and update relevant pages
-		for i in range(parent.count()):
-			tab_name = parent.tabText(i).lower()
-			page = parent.widget(i)
-
-			# UPDATE IMPEDANCES PAGE
-			if tab_name.startswith('imped'):
-				try:
-					# Primary side values
-					page.primary_values['Zeq'].setText(z_eq_polar)
-					page.primary_values['Req'].setText(f"{r_eq:.4f} Ω")
-					page.primary_values['Xeq'].setText(f"{x_eq:.4f} jΩ")
-					page.primary_values['Yφ'].setText(f"{y_phi_mag:.4f} ∠ -{theta_oc_deg:.4f}°")
-					page.primary_values['Gφ'].setText(f"{g_phi:.4f} S")
-					page.primary_values['Bφ'].setText(f"{b_phi:.4f} S")
-					page.primary_values['Zφ'].setText(z_phi_rect if z_phi_rect else '')
-					page.primary_values['Rc'].setText(f"{r_c:.4f} Ω" if r_c is not None else '')
-					page.primary_values['Xₘ'].setText(f"{x_m:.4f} Ω" if x_m is not None else '')
-
-					# Secondary side values (referred to secondary)
-					page.secondary_values['Zeq'].setText(z_eq_polar_sec)
-					page.secondary_values['Req'].setText(f"{r_eq_sec:.4f} Ω")
-					page.secondary_values['Xeq'].setText(f"{x_eq_sec:.4f} jΩ")
-					page.secondary_values['Yφ'].setText(f"{y_phi_mag_sec:.4f} ∠ -{theta_oc_deg:.4f}°")
-					page.secondary_values['Gφ'].setText(f"{g_phi_sec:.4f} S")
-					page.secondary_values['Bφ'].setText(f"{b_phi_sec:.4f} S")
-					page.secondary_values['Zφ'].setText(z_phi_rect_sec if z_phi_rect_sec else '')
-					page.secondary_values['Rc'].setText(f"{r_c_sec:.4f} Ω" if r_c_sec is not None else '')
-					page.secondary_values['Xₘ'].setText(f"{x_m_sec:.4f} Ω" if x_m_sec is not None else '')
-				except Exception as e:
-					print(f"Error updating impedances page: {e}")
-					import traceback
-					traceback.print_exc()
-
-			# UPDATE VOLTAGE REGULATION PAGE
-			elif tab_name.startswith('volt'):
-				try:
-					# Calculate rated secondary current: I2 = S / V2
-					i2_rated = power / vs if vs != 0 else None
-					if i2_rated is None:
-						continue
-					page.i2_rated.setText(f"{i2_rated:.4f} A")
-
-					# No-load secondary voltage: V2,nl = a * V1 = Vs (rated)
-					v2_nl = vs
-					page.v2_nl.setText(f"{v2_nl:.4f} V")
-					
-					# Use secondary-side impedance for voltage drop calculations
-					z_eq_complex = complex(r_eq_sec, x_eq_sec)
-					v2_nl_phasor = complex(v2_nl, 0)
-
-					# UNITY POWER FACTOR (pf = 1.0)
-					i2_unity = complex(i2_rated, 0)
-					v2_fl_phasor = v2_nl_phasor - z_eq_complex * i2_unity
-					v2_fl_mag = abs(v2_fl_phasor)
-					page.v2_fl.setText(f"{v2_fl_mag:.4f} V")
-
-					# Voltage regulation: VR = (V_nl - V_fl) / V_fl * 100%
-					if v2_fl_mag != 0:
-						vr_pct = (v2_nl - v2_fl_mag) / v2_fl_mag * 100.0
-						page.vr.setText(f"{vr_pct:.4f} %")
-					else:
-						page.vr.setText('')
-
-					# 0.8 PF LAGGING (current lags voltage by θ)
-					phi_08 = math.acos(0.8)
-					i2_lag = i2_rated * complex(math.cos(-phi_08), math.sin(-phi_08))
-					v2_fl_lag_phasor = v2_nl_phasor - z_eq_complex * i2_lag
-					v2_fl_lag_mag = abs(v2_fl_lag_phasor)
-					if v2_fl_lag_mag != 0:
-						vr_lag_pct = (v2_nl - v2_fl_lag_mag) / v2_fl_lag_mag * 100.0
-						page.vr_08_lag.setText(f"{vr_lag_pct:.4f} %")
-					else:
-						page.vr_08_lag.setText('')
-
-					# 0.8 PF LEADING (current leads voltage by θ)
-					i2_lead = i2_rated * complex(math.cos(phi_08), math.sin(phi_08))
-					v2_fl_lead_phasor = v2_nl_phasor - z_eq_complex * i2_lead
-					v2_fl_lead_mag = abs(v2_fl_lead_phasor)
-					if v2_fl_lead_mag != 0:
-						vr_lead_pct = (v2_nl - v2_fl_lead_mag) / v2_fl_lead_mag * 100.0
-						page.vr_08_lead.setText(f"{vr_lead_pct:.4f} %")
-					else:
-						page.vr_08_lead.setText('')
-				except Exception as e:
-					print(f"Error updating voltage regulation page: {e}")
-					import traceback
-					traceback.print_exc()			# UPDATE EFFICIENCY PAGE
-			elif tab_name.startswith('effi'):
-				try:
-					# Calculate rated secondary current
-					i2_rated = power / vs if vs != 0 else None
-					if i2_rated is None or r_eq_sec is None or r_c is None:
-						continue
-
-					# Use secondary-side impedance for accurate calculations
-					z_eq_complex = complex(r_eq_sec, x_eq_sec)
-					v2_nl_phasor = complex(vs, 0)
-					i2_unity = complex(i2_rated, 0)
-					v2_fl_phasor = v2_nl_phasor - z_eq_complex * i2_unity
-					v2_fl_mag = abs(v2_fl_phasor)
-
-					# Copper loss: P_cu = I2^2 * R_eq (on secondary side)
-					p_cu = (i2_rated ** 2) * r_eq_sec
-
-					# Core loss: P_core = V2,nl^2 / R_c (using primary-side R_c and primary voltage)
-					# For accurate core loss, use primary voltage referred value
-					p_core = (v2_nl ** 2) / r_c_sec if r_c_sec is not None else None
-
-					# Output power: P_out = V2,fl * I2 * cos(θ) (assuming unity pf)
-					p_out = v2_fl_mag * i2_rated * 1.0
-
-					# Input power: P_in = P_out + P_cu + P_core
-					if p_core is not None:
-						p_in = p_out + p_cu + p_core
-					else:
-						p_in = None
-
-					# Efficiency: Î· = (P_out / P_in) * 100%
-					eta_pct = (p_out / p_in * 100.0) if (p_in is not None and p_in != 0) else None
-
-					# Update display fields
-					page.pin.setText(f"{p_in:.4f} W" if p_in is not None else '')
-					page.pout.setText(f"{p_out:.4f} W")
-					page.pcu.setText(f"{p_cu:.4f} W")
-					page.pcore.setText(f"{p_core:.4f} W" if p_core is not None else '')
-					page.eta.setText(f"{eta_pct:.4f} %" if eta_pct is not None else '')
-				except Exception as e:
-					print(f"Error updating efficiency page: {e}")
-					import traceback
-					traceback.print_exc()
+		output_path, _ = QFileDialog.getSaveFileName(
+			self, 'Batch Output', '', 'CSV (*.csv);;Parquet (*.parquet)')
+		if not output_path:
+			return
+		task = self.task_manager.submit('Batch evaluation', _run_batch, input_path, output_path)
+		task.finished.connect(lambda stats: QMessageBox.information(
+			self, 'Batch Complete',
+			f"Evaluated {stats.rows} records ({stats.errors} with errors) in {stats.seconds:.1f} s."))
+		task.failed.connect(lambda e: QMessageBox.warning(self, 'Batch Error', str(e)))
+
+	def run_uncertainty(self):
+		"""Propagate the instrument accuracies through the calculation in the background (see uncertainty.propagate())."""
+		try:
+			values = [float(field.text()) for field in self._input_fields().values()]
+		except ValueError:
+			QMessageBox.warning(self, 'Input Error', 'Please ensure all fields are numeric and not empty.')
+			return
+		try:
+			engine.calculate(*values)
+		except engine.CalculationError as e:
+			QMessageBox.warning(self, e.title, str(e))
+			return
+		dialog = UncertaintyDialog(self)
+		task = self.task_manager.submit('Uncertainty analysis', _run_uncertainty, values)
+		task.partial_result.connect(dialog.show_result)
+		task.finished.connect(dialog.show_result)
+		task.failed.connect(lambda e: QMessageBox.warning(self, 'Uncertainty Error', str(e)))
+		# Closing the dialog stops the run
+		dialog.rejected.connect(task.cancel)
+		dialog.show()
+
+	def run_waveforms(self):
+		"""Fill the test fields from open- and short-circuit waveform captures in the background (see waveform.measure())."""
+		dialog = WaveformDialog(self)
+		if dialog.exec() != QDialog.DialogCode.Accepted:
+			return
+		try:
+			options = dialog.options()
+		except ValueError:
+			QMessageBox.warning(self, 'Input Error', 'Channels, scales, sample rate and header bytes must be numeric.')
+			return
+		task = self.task_manager.submit(
+			'Waveform reduction', _run_waveforms, dialog.open_circuit.text(), dialog.short_circuit.text(), options)
+		task.finished.connect(self._show_test_values)
+		task.failed.connect(lambda e: QMessageBox.warning(self, 'Waveform Error', str(e)))
+
+	def _show_test_values(self, values):
+		"""Put {voc, ioc, poc, vsc, isc, psc} values into their fields, which triggers a live update."""
+		fields = self._input_fields()
+		for name, value in values.items():
+			fields[name].setText(f"{value:.6g}")
+
+	def _show_ratio(self, turns_ratio, pf_sc, theta_sc_deg):
+		"""Update the computed turns ratio, power factor and phase angle displays (None clears them)."""
+		self.ratio_display.setText(f"{turns_ratio:.2f}" if turns_ratio is not None else '')
+		self.pf_display.setText(f"{pf_sc:.2f}" if pf_sc is not None else '')
+		self.phase_display.setText(f"{theta_sc_deg:.2f}" if theta_sc_deg is not None else '')
+
+	def _show_series(self, values):
+		series = values['series']
+		self._show_ratio(values['turns_ratio'], series and series['pf_sc'], series and series['theta_sc_deg'])
+
+	def _live_update(self):
+		"""Publish the field values to the result model, which recomputes only what changed."""
+		import depgraph
+		metrics.count('live_update')
+		with metrics.span('input.parse'):
+			values = {name: depgraph.parse_input(field.text()) for name, field in self._input_fields().items()}
+		self.results.set_inputs(values)
+
+	def load_case(self, values):
+		"""Fill the nine fields from a saved case (engine.calculate() order) and publish it at once."""
+		for field, value in zip(self._input_fields().values(), values):
+			field.setText('' if value != value else f"{value:.12g}")
+		self._live_timer.stop()
+		self._live_update()
+		self.results.flush()
 
 class ImpedancesPage(QWidget):
 	"""Page displaying transformer impedance parameters referred to primary and secondary."""
@@ -476,12 +364,7 @@ class ImpedancesPage(QWidget):
 
 		# Right: Image
 		primary_img = QLabel()
-		pixmap = QPixmap('img2.jpeg')
-		if not pixmap.isNull():
-			scaled_pixmap = pixmap.scaled(320, 250, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
-			primary_img.setPixmap(scaled_pixmap)
-		else:
-			primary_img.setText('Image not found')
+		pixmaps.cache.set_image(primary_img, 'img2.jpeg', 320, 250)
 		primary_img.setAlignment(Qt.AlignmentFlag.AlignCenter)
 		primary_img.setStyleSheet('border: 1px solid #ccc; background-color: #fafafa;')
 		primary_img.setMinimumHeight(120)
@@ -496,12 +379,7 @@ class ImpedancesPage(QWidget):
 
 		# Left: Image
 		secondary_img = QLabel()
-		pixmap = QPixmap('img3.jpeg')
-		if not pixmap.isNull():
-			scaled_pixmap = pixmap.scaled(320, 250, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
-			secondary_img.setPixmap(scaled_pixmap)
-		else:
-			secondary_img.setText('Image not found')
+		pixmaps.cache.set_image(secondary_img, 'img3.jpeg', 320, 250)
 		secondary_img.setAlignment(Qt.AlignmentFlag.AlignCenter)
 		secondary_img.setStyleSheet('border: 1px solid #ccc; background-color: #fafafa;')
 		secondary_img.setMinimumHeight(120)
@@ -539,6 +417,333 @@ class ImpedancesPage(QWidget):
 
 		self.setLayout(main_layout)
 
+	def show_result(self, r):
+		"""Display an engine.TransformerResult (None clears every value)."""
+		if r is None:
+			for label in list(self.primary_values.values()) + list(self.secondary_values.values()):
+				label.setText('')
+			return
+
+		# Z_eq in polar form, Z_φ in rectangular form
+		z_eq_polar = f"{r.z_eq_mag:.2f} ∠ {r.theta_sc_deg:.2f}°"
+		z_eq_polar_sec = f"{r.z_eq_mag_sec:.4f} ∠ {r.theta_sc_deg:.4f}°"
+		z_phi_rect = f"{r.r_c:.2f} + j{r.x_m:.2f} Ω" if r.r_c is not None and r.x_m is not None else None
+		z_phi_rect_sec = f"{r.r_c_sec:.4f} + j{r.x_m_sec:.4f} Ω" if r.r_c_sec is not None and r.x_m_sec is not None else None
+
+		# Primary side values
+		self.primary_values['Zeq'].setText(z_eq_polar)
+		self.primary_values['Req'].setText(f"{r.r_eq:.4f} Ω")
+		self.primary_values['Xeq'].setText(f"{r.x_eq:.4f} jΩ")
+		self.primary_values['Yφ'].setText(f"{r.y_phi_mag:.4f} ∠ -{r.theta_oc_deg:.4f}°")
+		self.primary_values['Gφ'].setText(f"{r.g_phi:.4f} S")
+		self.primary_values['Bφ'].setText(f"{r.b_phi:.4f} S")
+		self.primary_values['Zφ'].setText(z_phi_rect if z_phi_rect else '')
+		self.primary_values['Rc'].setText(f"{r.r_c:.4f} Ω" if r.r_c is not None else '')
+		self.primary_values['Xₘ'].setText(f"{r.x_m:.4f} Ω" if r.x_m is not None else '')
+
+		# Secondary side values (referred to secondary)
+		self.secondary_values['Zeq'].setText(z_eq_polar_sec)
+		self.secondary_values['Req'].setText(f"{r.r_eq_sec:.4f} Ω")
+		self.secondary_values['Xeq'].setText(f"{r.x_eq_sec:.4f} jΩ")
+		self.secondary_values['Yφ'].setText(f"{r.y_phi_mag_sec:.4f} ∠ -{r.theta_oc_deg:.4f}°")
+		self.secondary_values['Gφ'].setText(f"{r.g_phi_sec:.4f} S")
+		self.secondary_values['Bφ'].setText(f"{r.b_phi_sec:.4f} S")
+		self.secondary_values['Zφ'].setText(z_phi_rect_sec if z_phi_rect_sec else '')
+		self.secondary_values['Rc'].setText(f"{r.r_c_sec:.4f} Ω" if r.r_c_sec is not None else '')
+		self.secondary_values['Xₘ'].setText(f"{r.x_m_sec:.4f} Ω" if r.x_m_sec is not None else '')
+
+class LodPlot(QWidget):
+	"""Interactive plot of decimate.Series layers, reduced to screen resolution before drawing.
+
+	Line layers are drawn from per-pixel-column min/max envelopes and scatter
+	layers as point-density images (or point by point once few enough are in
+	view), so a frame costs one pass over the data however many points there
+	are, and chunks added since the last frame are only binned once. The wheel
+	zooms around the cursor, dragging pans and a double-click fits the data.
+	"""
+	# Room for the axis labels around the plot area
+	MARGINS = (52, 10, 10, 30)
+	# Zoom factor per wheel notch
+	ZOOM_STEP = 0.8
+	# Legend in the top right corner, else the bottom right
+	LEGEND_TOP = True
+
+	def __init__(self, placeholder='', parent=None):
+		super().__init__(parent)
+		self.placeholder = placeholder
+		# (decimate.Series, QColor, 'line' or 'scatter', legend label)
+		self.layers = []
+		# (x, y, color) points drawn as circles, and y values drawn as dashed guides
+		self.markers = []
+		self.guides = []
+		# View (x_min, x_max, y_min, y_max); None fits home, or the data if home is None too
+		self.view = None
+		self.home = None
+		self.x_label = ''
+		self.x_format = lambda value: f"{value:.4g}"
+		self.y_format = lambda value: f"{value:.4g}"
+		self._drag = None
+		self.setMinimumSize(260, 180)
+		self.setStyleSheet('border: 1px solid #ccc; background-color: #fafafa;')
+
+	def add_layer(self, series, color, style='line', label=''):
+		self.layers.append((series, QColor(color), style, label))
+		self.update()
+
+	def clear(self):
+		"""Remove all layers and markers and return to a fitted view."""
+		self.layers = []
+		self.markers = []
+		self.guides = []
+		self.view = None
+		self.home = None
+		self.update()
+
+	def fit(self):
+		self.view = None
+		self.update()
+
+	def current_view(self):
+		"""The view being shown, or None when there is nothing to show."""
+		import decimate
+		if self.view is not None:
+			return self.view
+		if self.home is not None:
+			return self.home
+		bounds = decimate.union_bounds([series.bounds for series, _, _, _ in self.layers]
+									   + [(x, x, y, y) for x, y, _ in self.markers])
+		if bounds is not None and self.guides:
+			bounds = decimate.union_bounds([bounds] + [(bounds[0], bounds[1], y, y) for y in self.guides])
+		return decimate.fit_view(bounds)
+
+	def _plot_rect(self):
+		left, top, right, bottom = self.MARGINS
+		return QRectF(self.rect()).adjusted(left, top, -right, -bottom)
+
+	def paintEvent(self, event):
+		painter = QPainter(self)
+		painter.fillRect(self.rect(), QColor('#fafafa'))
+		plot = self._plot_rect()
+		painter.setPen(QColor('#888888'))
+		painter.drawRect(plot)
+		view = self.current_view()
+		width = int(plot.width())
+		height = int(plot.height())
+		if view is None or width < 2 or height < 2:
+			painter.drawText(plot, Qt.AlignmentFlag.AlignCenter, self.placeholder)
+			return
+		x_min, x_max, y_min, y_max = view
+
+		def to_point(x, y):
+			return QPointF(plot.left() + (x - x_min) / (x_max - x_min) * width,
+						   plot.top() + (y_max - y) / (y_max - y_min) * height)
+
+		painter.save()
+		painter.setClipRect(plot)
+		painter.setPen(QPen(QColor('#cccccc'), 1, Qt.PenStyle.DashLine))
+		for y in self.guides:
+			painter.drawLine(to_point(x_min, y), to_point(x_max, y))
+		for series, color, style, _ in self.layers:
+			if style == 'scatter':
+				self._draw_scatter(painter, plot, series, color, view, width, height, to_point)
+			else:
+				self._draw_line(painter, plot, series, color, view, width, height)
+		painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+		for x, y, color in self.markers:
+			painter.setPen(QPen(QColor(color), 2))
+			painter.drawEllipse(to_point(x, y), 3, 3)
+		painter.restore()
+
+		# Legend
+		labelled = sum(1 for layer in self.layers if layer[3])
+		top = plot.top() + 4 if self.LEGEND_TOP else plot.bottom() - 4 - 14 * labelled
+		for _, color, _, label in self.layers:
+			if label:
+				painter.setPen(QPen(color, 2))
+				painter.drawLine(QPointF(plot.right() - 90, top + 7), QPointF(plot.right() - 74, top + 7))
+				painter.setPen(QColor('black'))
+				painter.drawText(QRectF(plot.right() - 70, top, 66, 14), Qt.AlignmentFlag.AlignLeft, label)
+				top += 14
+
+		# Axis labels
+		painter.setPen(QColor('black'))
+		left = self.MARGINS[0] - 2
+		painter.drawText(QRectF(0, plot.top() - 5, left, 14), Qt.AlignmentFlag.AlignRight, self.y_format(y_max))
+		painter.drawText(QRectF(0, plot.bottom() - 9, left, 14), Qt.AlignmentFlag.AlignRight, self.y_format(y_min))
+		labels = QRectF(plot.left(), plot.bottom() + 4, plot.width(), 20)
+		painter.drawText(labels, Qt.AlignmentFlag.AlignLeft, self.x_format(x_min))
+		painter.drawText(labels, Qt.AlignmentFlag.AlignHCenter,
+						 self.x_label or self.x_format((x_min + x_max) / 2.0))
+		painter.drawText(labels, Qt.AlignmentFlag.AlignRight, self.x_format(x_max))
+
+	def _draw_line(self, painter, plot, series, color, view, width, height):
+		import numpy as np
+		envelope = series.envelope(view, width)
+		if envelope is None:
+			return
+		low, high = envelope
+		columns = np.flatnonzero(~np.isnan(low))
+		if not len(columns):
+			return
+		x_min, x_max, y_min, y_max = view
+		low = low[columns]
+		high = high[columns]
+		# Each occupied column contributes its min and max, so dense data draws as a band; they are
+		# visited in the direction the curve goes next so a smooth curve does not zigzag
+		middle = (low + high) / 2.0
+		rising = np.append(middle[1:] >= middle[:-1], True)
+		values = np.where(rising[:, None], np.column_stack((low, high)), np.column_stack((high, low))).ravel()
+		xs = np.repeat(plot.left() + columns + 0.5, 2)
+		ys = plot.top() + (y_max - values) / (y_max - y_min) * height
+		# Keep far-off values within what QPainter handles reliably
+		ys = np.clip(ys, plot.top() - height, plot.bottom() + height)
+		# A band of tall columns is drawn with a plain one-pixel pen: wide or antialiased strokes
+		# of it are slow and look the same
+		thin = bool(np.all(high - low < 2.0 * (y_max - y_min) / height))
+		painter.setRenderHint(QPainter.RenderHint.Antialiasing, thin)
+		painter.setPen(QPen(color, 1.5 if thin else 1.0))
+		painter.drawPolyline(QPolygonF([QPointF(x, y) for x, y in zip(xs.tolist(), ys.tolist())]))
+
+	def _draw_scatter(self, painter, plot, series, color, view, width, height, to_point):
+		import numpy as np
+		points = series.visible(view)
+		if points is not None:
+			painter.setPen(QPen(color, 3))
+			painter.drawPoints(QPolygonF([to_point(x, y) for x, y in zip(points[0].tolist(), points[1].tolist())]))
+			return
+		counts = series.density(view, width, height)
+		if counts is None:
+			return
+		# Opacity grows with the logarithm of the points per pixel; empty pixels stay transparent
+		alpha = np.log1p(counts) * (195.0 / math.log1p(int(counts.max())))
+		alpha = np.where(counts > 0, alpha + 60.0, 0.0).astype(np.uint32)
+		pixels = np.ascontiguousarray((alpha << 24) | np.uint32(color.rgb() & 0xFFFFFF))
+		image = QImage(pixels.data, width, height, width * 4, QImage.Format.Format_ARGB32)
+		painter.drawImage(plot.topLeft(), image)
+
+	def wheelEvent(self, event):
+		view = self.current_view()
+		plot = self._plot_rect()
+		if view is None or plot.width() < 2 or plot.height() < 2:
+			return
+		x_min, x_max, y_min, y_max = view
+		position = event.position()
+		fx = min(max((position.x() - plot.left()) / plot.width(), 0.0), 1.0)
+		fy = min(max((plot.bottom() - position.y()) / plot.height(), 0.0), 1.0)
+		factor = self.ZOOM_STEP ** (event.angleDelta().y() / 120.0)
+		x = x_min + fx * (x_max - x_min)
+		y = y_min + fy * (y_max - y_min)
+		x_span = (x_max - x_min) * factor
+		y_span = (y_max - y_min) * factor
+		self.view = (x - fx * x_span, x + (1.0 - fx) * x_span, y - fy * y_span, y + (1.0 - fy) * y_span)
+		self.update()
+		event.accept()
+
+	def mousePressEvent(self, event):
+		view = self.current_view()
+		if event.button() == Qt.MouseButton.LeftButton and view is not None:
+			self._drag = (event.position(), view)
+
+	def mouseMoveEvent(self, event):
+		if self._drag is None:
+			return
+		start, (x_min, x_max, y_min, y_max) = self._drag
+		plot = self._plot_rect()
+		dx = (event.position().x() - start.x()) / max(plot.width(), 1.0) * (x_max - x_min)
+		dy = (event.position().y() - start.y()) / max(plot.height(), 1.0) * (y_max - y_min)
+		self.view = (x_min - dx, x_max - dx, y_min + dy, y_max + dy)
+		self.update()
+
+	def mouseReleaseEvent(self, event):
+		self._drag = None
+
+	def mouseDoubleClickEvent(self, event):
+		self.fit()
+
+
+def _power_factor_label(angle):
+	"""Axis label of a current angle in degrees (negative lagging, positive leading)."""
+	pf = math.cos(math.radians(angle))
+	if abs(angle) < 1e-9:
+		return f"{pf:.2f}"
+	return f"{pf:.2f} {'lead' if angle > 0 else 'lag'}"
+
+
+class RegulationPlot(LodPlot):
+	"""Voltage regulation versus power factor at several load fractions, lagging on the left, leading on the right."""
+	# Load fractions drawn as separate curves, with their pen colors
+	CURVES = ((0.25, '#9ecae1'), (0.5, '#6baed6'), (0.75, '#3182bd'), (1.0, '#08519c'))
+
+	def __init__(self, parent=None):
+		super().__init__('VR vs power factor', parent)
+		self.sweep = None
+
+	def set_sweep(self, sweep):
+		"""Show a regulation.RegulationSweep (or clear the plot with None)."""
+		import numpy as np
+		import decimate
+		self.clear()
+		self.x_format = _power_factor_label
+		self.y_format = lambda value: f"{value:.1f}%"
+		self.sweep = sweep
+		if sweep is None or sweep.worst_vr is None:
+			return
+		self.guides = [0.0]
+		for load, color in self.CURVES:
+			values = sweep.at_load(load)
+			# Undefined stretches break the curve, so each defined run is its own series
+			finite = np.isfinite(values)
+			breaks = np.flatnonzero(np.diff(finite)) + 1
+			label = f"{load * 100:.0f}% load"
+			for run in np.split(np.arange(len(values)), breaks):
+				if finite[run[0]]:
+					series = decimate.Series()
+					series.add(sweep.angles_deg[run], values[run])
+					self.add_layer(series, color, label=label)
+					label = ''
+
+		# Mark the worst-case point
+		worst_angle = math.degrees(math.acos(min(1.0, sweep.worst_power_factor)))
+		if not sweep.worst_leading:
+			worst_angle = -worst_angle
+		self.markers = [(worst_angle, sweep.worst_vr, 'red')]
+
+
+class EfficiencyPlot(LodPlot):
+	"""Efficiency versus load at a few lagging power factors, with the maximum-efficiency point."""
+	# Pen colors of the curves, by row of efficiency.EfficiencyCurves
+	COLORS = ('#08519c', '#3182bd', '#9ecae1')
+	# Light loads whose low efficiency is left below the initial view
+	HOME_MIN_LOAD = 0.1
+	LEGEND_TOP = False
+
+	def __init__(self, parent=None):
+		super().__init__('η vs load', parent)
+
+	def set_curves(self, curves, best=None):
+		"""Show efficiency.EfficiencyCurves and a MaxEfficiency point (None clears the plot)."""
+		import numpy as np
+		import decimate
+		self.clear()
+		self.x_format = lambda value: f"{value:.0f}%"
+		self.y_format = lambda value: f"{value:.2f}%"
+		self.x_label = 'load'
+		if curves is None:
+			return
+		loads = curves.load_fractions * 100.0
+		for pf, eta, color in zip(curves.power_factors, curves.eta, self.COLORS):
+			series = decimate.Series()
+			series.add(loads, eta)
+			self.add_layer(series, color, label=f"PF {pf:.2f}")
+		if best is not None and best.eta is not None:
+			self.markers = [(best.load_fraction * 100.0, best.eta, 'red')]
+		# Start on the useful range rather than down to zero efficiency at no load
+		shown = curves.eta[:, curves.load_fractions >= self.HOME_MIN_LOAD]
+		if np.isfinite(shown).any():
+			_, _, y_min, y_max = decimate.fit_view((0.0, 1.0, float(np.nanmin(shown)), float(np.nanmax(shown))))
+			self.home = (float(loads[0]), float(loads[-1]), y_min, y_max)
+
+
 class VoltageRegulationPage(QWidget):
 	"""Page displaying voltage regulation calculations at different power factors."""
 	def __init__(self, parent=None):
@@ -585,23 +790,52 @@ class VoltageRegulationPage(QWidget):
 		self.vr_08_lead = self._create_output_label()
 		form.addRow('VR at 0.8 PF Leading (%):', self.vr_08_lead)
 
+		self.vr_worst = self._create_output_label()
+		form.addRow('Worst-Case VR (%):', self.vr_worst)
+
 		form_widget.setLayout(form)
 		main_layout.addWidget(form_widget)
 
-		# Image below the form
+		# Image and power factor sweep plot below the form
+		bottom_h = QHBoxLayout()
 		photo = QLabel()
-		pixmap = QPixmap('img4.jpeg')
-		if not pixmap.isNull():
-			scaled_pixmap = pixmap.scaled(320, 250, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
-			photo.setPixmap(scaled_pixmap)
-		else:
-			photo.setText('Image not found')
+		pixmaps.cache.set_image(photo, 'img4.jpeg', 320, 250)
 		photo.setAlignment(Qt.AlignmentFlag.AlignCenter)
 		photo.setStyleSheet('border: 1px solid #ccc; background-color: #fafafa; padding: 5px;')
-		main_layout.addWidget(photo)
+		bottom_h.addWidget(photo, 1)
+
+		self.sweep_plot = RegulationPlot()
+		bottom_h.addWidget(self.sweep_plot, 1)
+		main_layout.addLayout(bottom_h)
 		main_layout.addStretch()
 		self.setLayout(main_layout)
 
+	def show_regulation(self, summary, sweep):
+		"""Display engine.regulation_summary() values and a regulation.RegulationSweep (None clears them)."""
+		def percent(value):
+			return f"{value:.4f} %" if value is not None else ''
+
+		if summary is None:
+			for label in (self.i2_rated, self.v2_nl, self.v2_fl, self.vr, self.vr_08_lag, self.vr_08_lead):
+				label.setText('')
+		else:
+			self.i2_rated.setText(f"{summary['i2_rated']:.4f} A")
+			self.v2_nl.setText(f"{summary['v2_nl']:.4f} V")
+			self.v2_fl.setText(f"{summary['v2_fl']:.4f} V")
+			# Unity, 0.8 lagging and 0.8 leading power factor at rated current
+			self.vr.setText(percent(summary['vr']))
+			self.vr_08_lag.setText(percent(summary['vr_08_lag']))
+			self.vr_08_lead.setText(percent(summary['vr_08_lead']))
+
+		# Dense power factor / load fraction sweep for the plot and worst case
+		self.sweep_plot.set_sweep(sweep)
+		if sweep is not None and sweep.worst_vr is not None:
+			side = 'lead' if sweep.worst_leading else 'lag'
+			self.vr_worst.setText(f"{sweep.worst_vr:.4f} % at {sweep.worst_power_factor:.2f} PF {side}, "
+								  f"{sweep.worst_load_fraction * 100:.0f}% load")
+		else:
+			self.vr_worst.setText('')
+
 	def _create_output_label(self):
 		"""Helper method to create consistently styled output labels."""
 		label = QLabel('')
@@ -654,23 +888,45 @@ class EfficiencyPage(QWidget):
 		self.eta = self._create_output_label()
 		form.addRow('Efficiency, η (%):', self.eta)
 
+		self.eta_max = self._create_output_label()
+		form.addRow('Maximum Efficiency, ηmax (%):', self.eta_max)
+
 		form_widget.setLayout(form)
 		main_layout.addWidget(form_widget)
 
-		# Image below the form
+		# Image and efficiency-versus-load plot below the form
+		bottom_h = QHBoxLayout()
 		photo = QLabel()
-		pixmap = QPixmap('img5.jpeg')
-		if not pixmap.isNull():
-			scaled_pixmap = pixmap.scaled(320, 250, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
-			photo.setPixmap(scaled_pixmap)
-		else:
-			photo.setText('Image not found')
+		pixmaps.cache.set_image(photo, 'img5.jpeg', 320, 250)
 		photo.setAlignment(Qt.AlignmentFlag.AlignCenter)
 		photo.setStyleSheet('border: 1px solid #ccc; background-color: #fafafa; padding: 5px;')
-		main_layout.addWidget(photo)
+		bottom_h.addWidget(photo, 1)
+
+		self.curve_plot = EfficiencyPlot()
+		bottom_h.addWidget(self.curve_plot, 1)
+		main_layout.addLayout(bottom_h)
 		main_layout.addStretch()
 		self.setLayout(main_layout)
 
+	def show_efficiency(self, eff, best, curves=None):
+		"""Display an engine.EfficiencyResult, efficiency.MaxEfficiency and EfficiencyCurves (None clears them)."""
+		if eff is None:
+			for label in (self.pin, self.pout, self.pcu, self.pcore, self.eta):
+				label.setText('')
+		else:
+			self.pin.setText(f"{eff.p_in:.4f} W" if eff.p_in is not None else '')
+			self.pout.setText(f"{eff.p_out:.4f} W")
+			self.pcu.setText(f"{eff.p_cu:.4f} W")
+			self.pcore.setText(f"{eff.p_core:.4f} W" if eff.p_core is not None else '')
+			self.eta.setText(f"{eff.eta:.4f} %" if eff.eta is not None else '')
+
+		# Maximum efficiency where copper loss equals core loss (unity pf)
+		if best is not None and best.eta is not None:
+			self.eta_max.setText(f"{best.eta:.4f} % at {best.load_fraction * 100:.1f}% load")
+		else:
+			self.eta_max.setText('')
+		self.curve_plot.set_curves(curves, best)
+
 	def _create_output_label(self):
 		"""Helper method to create consistently styled output labels."""
 		label = QLabel('')
@@ -756,8 +1012,440 @@ class InfoPage(QWidget):
 		self.setLayout(layout)
 
 
+class LazyTab(QWidget):
+	"""Tab placeholder that builds its page the first time the tab is shown."""
+	def __init__(self, factory, parent=None):
+		super().__init__(parent)
+		self.factory = factory
+		self.page = None
+		layout = QVBoxLayout()
+		layout.setContentsMargins(0, 0, 0, 0)
+		self.setLayout(layout)
+
+	def showEvent(self, event):
+		self.ensure_built()
+		super().showEvent(event)
+
+	def ensure_built(self):
+		"""Build the page if needed and return it."""
+		if self.page is None:
+			self.page = self.factory()
+			self.layout().addWidget(self.page)
+		return self.page
+
+
+class CaseTableModel(QAbstractTableModel):
+	"""Table model over a cases.CaseSource; cells are read from the source's pages only when the view shows them."""
+	def __init__(self, parent=None):
+		super().__init__(parent)
+		self.source = None
+
+	def set_source(self, source):
+		self.beginResetModel()
+		self.source = source
+		self.endResetModel()
+
+	def rowCount(self, parent=QModelIndex()):
+		return 0 if self.source is None or parent.isValid() else len(self.source)
+
+	def columnCount(self, parent=QModelIndex()):
+		# Case number, then the source's columns
+		return 0 if self.source is None or parent.isValid() else len(self.source.columns) + 1
+
+	def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+		if self.source is None or not index.isValid():
+			return None
+		row, column = index.row(), index.column()
+		if role == Qt.ItemDataRole.DisplayRole:
+			if column == 0:
+				return str(self.source.record(row) + 1)
+			value = self.source.value(row, column - 1)
+			if isinstance(value, int):
+				return str(value) if value else ''
+			return '' if value != value else f"{value:.6g}"
+		if role == Qt.ItemDataRole.TextAlignmentRole:
+			return Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+		if role == Qt.ItemDataRole.ToolTipRole and column > 0 and self.source.columns[column - 1][0] == 'error':
+			code = self.source.value(row, column - 1)
+			return self.source.error_message(code) if code else None
+		return None
+
+	def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+		if self.source is None or role != Qt.ItemDataRole.DisplayRole or orientation != Qt.Orientation.Horizontal:
+			return None
+		return '#' if section == 0 else self.source.columns[section - 1][1]
+
+	def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+		if self.source is None:
+			return
+		self.beginResetModel()
+		self.source.sort(None if column == 0 else column - 1, order == Qt.SortOrder.DescendingOrder)
+		self.endResetModel()
+
+	def set_filter(self, text):
+		"""Apply a cases.parse_filter() filter; raises ValueError (and keeps the rows) if it is invalid."""
+		if self.source is None:
+			return
+		import cases
+		# Validate first so an invalid filter leaves the model untouched, then reset around the change as sort() does
+		cases.parse_filter(text, self.source.store.columns)
+		self.beginResetModel()
+		self.source.set_filter(text)
+		self.endResetModel()
+
+
+class CasesPage(QWidget):
+	"""Case list of a result store, sortable and filterable; the selected case is loaded into the Input page.
+
+	Below the list, a fleet scatter of two columns over the filtered cases is
+	streamed in from the store a chunk per event-loop turn.
+	"""
+	# Quiet period after the last keystroke in the filter before it is applied
+	FILTER_DEBOUNCE_MS = 300
+	# Columns of the fleet scatter when a store is opened
+	SCATTER_COLUMNS = ('vr', 'eta')
+
+	def __init__(self, input_page, task_manager=None, parent=None):
+		super().__init__(parent)
+		self.input_page = input_page
+		self.task_manager = task_manager
+		layout = QVBoxLayout()
+		layout.setContentsMargins(5, 5, 5, 5)
+		layout.setSpacing(5)
+
+		controls = QHBoxLayout()
+		open_btn = QPushButton('Open Store...')
+		open_btn.clicked.connect(lambda: self.open_store())
+		controls.addWidget(open_btn)
+		if task_manager is not None:
+			import_btn = QPushButton('Import Records...')
+			import_btn.clicked.connect(self.import_records)
+			controls.addWidget(import_btn)
+		self.filter_edit = QLineEdit()
+		self.filter_edit.setPlaceholderText('Filter, e.g. eta >= 98, vr < 3, r_eq < 0.05')
+		controls.addWidget(self.filter_edit, 1)
+		layout.addLayout(controls)
+		self.status = QLabel('Open a result store, or import a file of test records.')
+		layout.addWidget(self.status)
+
+		self.model = CaseTableModel(self)
+		self.table = QTableView()
+		self.table.setModel(self.model)
+		self.table.setSortingEnabled(True)
+		self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+		self.table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+		self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+		self.table.verticalHeader().setVisible(False)
+		# Fixed row heights and column widths keep scrolling independent of the number of cases
+		self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+		self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+		self.table.selectionModel().currentRowChanged.connect(self._load_row)
+
+		scatter = QWidget()
+		scatter_layout = QVBoxLayout()
+		scatter_layout.setContentsMargins(0, 0, 0, 0)
+		axes = QHBoxLayout()
+		self.x_combo = QComboBox()
+		self.y_combo = QComboBox()
+		axes.addWidget(QLabel('Scatter X:'))
+		axes.addWidget(self.x_combo)
+		axes.addWidget(QLabel('Y:'))
+		axes.addWidget(self.y_combo)
+		axes.addStretch()
+		scatter_layout.addLayout(axes)
+		self.scatter = LodPlot('Fleet scatter')
+		scatter_layout.addWidget(self.scatter, 1)
+		scatter.setLayout(scatter_layout)
+
+		splitter = QSplitter(Qt.Orientation.Vertical)
+		splitter.addWidget(self.table)
+		splitter.addWidget(scatter)
+		layout.addWidget(splitter, 1)
+		self.setLayout(layout)
+		self.x_combo.currentIndexChanged.connect(self._restart_scatter)
+		self.y_combo.currentIndexChanged.connect(self._restart_scatter)
+		self._points = None
+		self._scatter_series = None
+		self._scatter_timer = QTimer(self)
+		self._scatter_timer.setInterval(0)
+		self._scatter_timer.timeout.connect(self._add_points)
+
+		self._filter_timer = QTimer(self)
+		self._filter_timer.setSingleShot(True)
+		self._filter_timer.setInterval(self.FILTER_DEBOUNCE_MS)
+		self._filter_timer.timeout.connect(self._apply_filter)
+		self.filter_edit.textChanged.connect(self._filter_timer.start)
+
+	def open_store(self, path=None):
+		"""Show the cases of a result store directory (see store.py)."""
+		if path is None:
+			path = QFileDialog.getExistingDirectory(self, 'Open Result Store')
+			if not path:
+				return
+		import cases
+		try:
+			source = cases.CaseSource.open(path)
+		except (OSError, ValueError) as e:
+			QMessageBox.warning(self, 'Store Error', str(e))
+			return
+		try:
+			source.set_filter(self.filter_edit.text())
+		except ValueError:
+			pass
+		self.model.set_source(source)
+		self._update_status()
+		self._set_scatter_columns(source)
+		if not source.store.has_inputs:
+			QMessageBox.warning(self, 'Store Without Inputs',
+				'This store has no input columns, so its cases cannot be loaded into the Input page.')
+
+	def import_records(self):
+		"""Evaluate a CSV/Parquet file of test records into a new result store in the background, then open it."""
+		input_path, _ = QFileDialog.getOpenFileName(
+			self, 'Import Records', '', 'Test records (*.csv *.parquet *.pq);;All files (*)')
+		if not input_path:
+			return
+		output_path, _ = QFileDialog.getSaveFileName(self, 'Save Result Store', '', 'Result store (*.store)')
+		if not output_path:
+			return
+		if not output_path.lower().endswith('.store'):
+			output_path += '.store'
+		task = self.task_manager.submit('Case import', _run_batch, input_path, output_path)
+		task.finished.connect(lambda stats: self.open_store(output_path))
+		task.failed.connect(lambda e: QMessageBox.warning(self, 'Import Error', str(e)))
+
+	def _apply_filter(self):
+		try:
+			self.model.set_filter(self.filter_edit.text())
+		except ValueError as e:
+			self.filter_edit.setStyleSheet('border: 1px solid red;')
+			self.status.setText(str(e))
+			return
+		self.filter_edit.setStyleSheet('')
+		self._update_status()
+		self._restart_scatter()
+
+	def _update_status(self):
+		source = self.model.source
+		if source is not None:
+			self.status.setText(f"{len(source):,} of {len(source.store):,} cases")
+
+	def _load_row(self, current, previous):
+		if not current.isValid():
+			return
+		values = self.model.source.inputs(current.row())
+		if values is not None:
+			self.input_page.load_case(values)
+
+	def _set_scatter_columns(self, source):
+		numeric = [(name, header) for name, header in source.columns if name != 'error']
+		for combo, default in zip((self.x_combo, self.y_combo), self.SCATTER_COLUMNS):
+			combo.blockSignals(True)
+			combo.clear()
+			for name, header in numeric:
+				combo.addItem(header, name)
+			combo.setCurrentIndex(max(combo.findData(default), 0))
+			combo.blockSignals(False)
+		self._restart_scatter()
+
+	def _restart_scatter(self):
+		"""Start streaming the scatter of the selected columns over the current filter."""
+		import decimate
+		source = self.model.source
+		x, y = self.x_combo.currentData(), self.y_combo.currentData()
+		self.scatter.clear()
+		if source is None or x is None or y is None:
+			self._scatter_timer.stop()
+			return
+		self.scatter.x_label = f"{self.y_combo.currentText()} vs {self.x_combo.currentText()}"
+		self._scatter_series = decimate.Series()
+		self.scatter.add_layer(self._scatter_series, '#08519c', 'scatter')
+		self._points = source.iter_points(x, y)
+		self._scatter_timer.start()
+
+	def _add_points(self):
+		try:
+			x, y = next(self._points)
+		except StopIteration:
+			self._scatter_timer.stop()
+			return
+		self._scatter_series.add(x, y)
+		self.scatter.update()
+
+
+class UncertaintyDialog(QDialog):
+	"""Table of Monte Carlo confidence intervals for every output, filled in as samples come in."""
+	COLUMNS = ('Output', 'Nominal', 'Mean', 'Std. dev.', 'Lower bound', 'Upper bound', '± % of nominal')
+
+	def __init__(self, parent=None):
+		super().__init__(parent)
+		self.setWindowTitle('Measurement Uncertainty')
+		self.resize(720, 520)
+		layout = QVBoxLayout()
+		self.summary = QLabel('Sampling...')
+		layout.addWidget(self.summary)
+		self.table = QTableWidget(0, len(self.COLUMNS))
+		self.table.setHorizontalHeaderLabels(self.COLUMNS)
+		self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+		self.table.verticalHeader().setVisible(False)
+		self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+		layout.addWidget(self.table)
+		self.setLayout(layout)
+
+	def show_result(self, result):
+		"""Display an uncertainty.UncertaintyResult."""
+		self.summary.setText(
+			f"{result.samples:,} samples, {result.valid:,} valid, X_eq clamped to zero in "
+			f"{result.clamped_fraction * 100:.1f}% of them. Bounds of the {result.confidence * 100:g}% interval.")
+		self.table.setRowCount(len(result.outputs))
+		for row, (name, output) in enumerate(result.outputs.items()):
+			cells = (name, output.nominal, output.mean, output.std, output.low, output.high, output.relative_half_width)
+			for column, value in enumerate(cells):
+				text = value if isinstance(value, str) else ('' if value is None else f"{value:.6g}")
+				self.table.setItem(row, column, QTableWidgetItem(text))
+
+
+class WaveformDialog(QDialog):
+	"""Choice of open- and short-circuit capture files and the channel layout and scales they share.
+
+	WAV files describe themselves; raw captures (.bin/.raw/.dat) need the sample
+	rate, channel count, sample type and header size given here.
+	"""
+	def __init__(self, parent=None):
+		super().__init__(parent)
+		self.setWindowTitle('Test Waveforms')
+		form = QFormLayout()
+		self.open_circuit = self._add_file_row(form, 'Open-circuit capture:')
+		self.short_circuit = self._add_file_row(form, 'Short-circuit capture:')
+		self.voltage_channel = QLineEdit('0')
+		self.current_channel = QLineEdit('1')
+		self.voltage_scale = QLineEdit('1')
+		self.current_scale = QLineEdit('1')
+		form.addRow('Voltage channel:', self.voltage_channel)
+		form.addRow('Current channel:', self.current_channel)
+		form.addRow('Voltage scale (V per unit):', self.voltage_scale)
+		form.addRow('Current scale (A per unit):', self.current_scale)
+		self.sample_rate = QLineEdit()
+		self.sample_rate.setPlaceholderText('raw captures only')
+		self.channels = QLineEdit('2')
+		self.dtype = QLineEdit('<i2')
+		self.offset = QLineEdit('0')
+		form.addRow('Raw sample rate (Hz):', self.sample_rate)
+		form.addRow('Raw channels:', self.channels)
+		form.addRow('Raw sample type (NumPy):', self.dtype)
+		form.addRow('Raw header bytes:', self.offset)
+		buttons = QHBoxLayout()
+		buttons.addStretch()
+		ok_btn = QPushButton('OK')
+		ok_btn.clicked.connect(self.accept)
+		cancel_btn = QPushButton('Cancel')
+		cancel_btn.clicked.connect(self.reject)
+		buttons.addWidget(ok_btn)
+		buttons.addWidget(cancel_btn)
+		layout = QVBoxLayout()
+		layout.addLayout(form)
+		layout.addLayout(buttons)
+		self.setLayout(layout)
+
+	def _add_file_row(self, form, label):
+		path = QLineEdit()
+		browse_btn = QPushButton('Browse...')
+		browse_btn.clicked.connect(lambda: self._browse(path))
+		row = QHBoxLayout()
+		row.addWidget(path)
+		row.addWidget(browse_btn)
+		form.addRow(label, row)
+		return path
+
+	def _browse(self, line_edit):
+		path, _ = QFileDialog.getOpenFileName(
+			self, 'Waveform Capture', '',
+			'Captures (*.wav *.bin *.raw *.dat);;WAV captures (*.wav);;Raw captures (*.bin *.raw *.dat);;All files (*)')
+		if path:
+			line_edit.setText(path)
+
+	def options(self):
+		"""Keyword arguments for waveform.measure_tests() (raises ValueError for non-numeric entries)."""
+		sample_rate = self.sample_rate.text().strip()
+		return {
+			'voltage_channel': int(self.voltage_channel.text()),
+			'current_channel': int(self.current_channel.text()),
+			'voltage_scale': float(self.voltage_scale.text()),
+			'current_scale': float(self.current_scale.text()),
+			'sample_rate': float(sample_rate) if sample_rate else None,
+			'channels': int(self.channels.text()),
+			'dtype': self.dtype.text().strip(),
+			'offset': int(self.offset.text()),
+		}
+
+
+class TaskStatus(QWidget):
+	"""Status bar display of the latest background task's progress, with a Cancel button."""
+	def __init__(self, task_manager, parent=None):
+		super().__init__(parent)
+		self.task_manager = task_manager
+		self.task = None
+		layout = QHBoxLayout()
+		layout.setContentsMargins(0, 0, 0, 0)
+		self.label = QLabel('')
+		self.bar = QProgressBar()
+		self.bar.setFixedWidth(160)
+		self.bar.setTextVisible(False)
+		cancel_btn = QPushButton('Cancel')
+		cancel_btn.setStyleSheet('padding: 2px 8px;')
+		cancel_btn.clicked.connect(self.cancel)
+		layout.addWidget(self.label)
+		layout.addWidget(self.bar)
+		layout.addWidget(cancel_btn)
+		self.setLayout(layout)
+		self.hide()
+		task_manager.task_submitted.connect(self._on_submitted)
+
+	def _on_submitted(self, task):
+		task.progressed.connect(lambda done, total: self._on_progress(task, done, total))
+		task.done.connect(lambda: self._on_done(task))
+		self._track(task)
+
+	def _track(self, task):
+		self.task = task
+		self.label.setText(task.name)
+		# Busy indicator until the task reports a total
+		self.bar.setRange(0, 0)
+		self.show()
+
+	def _on_progress(self, task, done, total):
+		if task is not self.task:
+			return
+		if total:
+			self.bar.setRange(0, 1000)
+			self.bar.setValue(int(1000 * min(done / total, 1.0)))
+			self.label.setText(f"{task.name}: {done:,} / {total:,}")
+		else:
+			self.bar.setRange(0, 0)
+			self.label.setText(f"{task.name}: {done:,}")
+
+	def _on_done(self, task):
+		if task is not self.task:
+			return
+		active = self.task_manager.active()
+		if active:
+			self._track(active[-1])
+		else:
+			self.task = None
+			self.hide()
+
+	def cancel(self):
+		"""Cancel the task being shown."""
+		if self.task is not None:
+			self.task.cancel()
+			self.label.setText(f"{self.task.name}: cancelling...")
+
+
 class MainWindow(QMainWindow):
 	"""Main application window with tabbed interface for transformer calculations."""
+	# Delay after startup before the calculation modules are imported
+	WARM_UP_DELAY_MS = 300
+
 	def __init__(self):
 		super().__init__()
 		self.setWindowTitle('Single Phase Transformer Calculator')
@@ -815,25 +1503,113 @@ class MainWindow(QMainWindow):
 		
 		# Create tab widget
 		tabs = QTabWidget()
-		tabs.addTab(InputPage(), 'Input')
-		tabs.addTab(ImpedancesPage(), 'Impedances')
-		tabs.addTab(VoltageRegulationPage(), 'Voltage Regulation')
-		tabs.addTab(EfficiencyPage(), 'Efficiency')
-		tabs.addTab(InfoPage(), 'Info')
+		# Background computations, with their progress shown in the status bar
+		self.task_manager = tasks.TaskManager(self)
+		self.statusBar().addPermanentWidget(TaskStatus(self.task_manager))
+		QApplication.instance().aboutToQuit.connect(self.task_manager.shutdown)
+
+		# Results are computed once and rendered only on the tab being shown
+		self.results = resultmodel.ResultModel(self)
+
+		input_page = InputPage(task_manager=self.task_manager, results=self.results)
+		tabs.addTab(input_page, 'Input')
+		# Other pages are built on first activation to keep startup fast
+		impedances = LazyTab(ImpedancesPage)
+		voltage = LazyTab(VoltageRegulationPage)
+		effi = LazyTab(EfficiencyPage)
+		self.results.subscribe(impedances, ('result',), lambda v: impedances.ensure_built().show_result(v['result']), 'impedances')
+		# Live edits show a coarse sweep; the dense one follows once the inputs settle
+		self.results.subscribe(voltage, ('regulation', 'regulation_sweep_live'), lambda v: voltage.ensure_built().show_regulation(
+			v['regulation'], v['regulation_sweep_live']), 'voltage_regulation')
+		self.results.subscribe(voltage, ('regulation', 'regulation_sweep'), lambda v: voltage.ensure_built().show_regulation(
+			v['regulation'], v['regulation_sweep']), 'voltage_regulation.sweep', idle=True)
+		self.results.subscribe(effi, ('efficiency', 'max_efficiency', 'efficiency_curves'),
+			lambda v: effi.ensure_built().show_efficiency(
+				v['efficiency'], v['max_efficiency'], v['efficiency_curves']), 'efficiency')
+		tabs.addTab(impedances, 'Impedances')
+		tabs.addTab(voltage, 'Voltage Regulation')
+		tabs.addTab(effi, 'Efficiency')
+		tabs.addTab(LazyTab(lambda: CasesPage(input_page, self.task_manager)), 'Cases')
+		tabs.addTab(LazyTab(InfoPage), 'Info')
 		
 		self.setCentralWidget(tabs)
 
+		# Decode the other pages' images in the background once the event loop runs
+		QTimer.singleShot(0, lambda: pixmaps.cache.preload(pixmaps.PAGE_IMAGES))
+		# Load the calculation modules shortly after the window is up, so the first edit does not wait for them
+		QTimer.singleShot(self.WARM_UP_DELAY_MS, _warm_up)
+
+
+def _warm_up():
+	"""Import the NumPy-based calculation modules kept off the startup path."""
+	# Imported for the side effect only: the first live update then finds them loaded
+	importlib.import_module('depgraph')
+
+
+class _FirstPaintTimer(QObject):
+	"""Reports the time from process start to the window's first paint, then quits."""
+	def eventFilter(self, watched, event):
+		if event.type() == QEvent.Type.Paint:
+			watched.removeEventFilter(self)
+			elapsed_ms = (time.perf_counter() - _START_TIME) * 1000.0
+			print(f"Time to first paint: {elapsed_ms:.1f} ms")
+			QTimer.singleShot(0, QApplication.instance().quit)
+		return False
+
 
 def main():
 	"""Application entry point."""
 	app = QApplication(sys.argv)
 	window = MainWindow()
 	window.resize(750, 550)
+	# --metrics PATH: time the calculation stages and page updates, written to PATH on exit
+	if '--metrics' in sys.argv[1:-1]:
+		path = sys.argv[sys.argv.index('--metrics') + 1]
+		metrics.enable()
+		app.aboutToQuit.connect(lambda: metrics.write(path))
+	# --startup-time: measure time to first paint and exit
+	if '--startup-time' in sys.argv:
+		first_paint = _FirstPaintTimer(window)
+		window.centralWidget().installEventFilter(first_paint)
 	window.show()
 	sys.exit(app.exec())
 
 
+def _run_batch(task, input_path, output_path):
+	"""Task function: batch.run() reporting rows done as progress."""
+	import batch
+	return batch.run(input_path, output_path, progress=lambda stats: task.progress(stats.rows))
+
+
+def _run_uncertainty(task, values):
+	"""Task function: uncertainty.propagate() streaming each chunk's running result."""
+	import uncertainty
+	return uncertainty.propagate(*values, progress=task.progress, partial=task.partial)
+
+
+def _run_waveforms(task, open_circuit_path, short_circuit_path, options):
+	"""Task function: waveform.measure_tests() reporting frames done as progress."""
+	import waveform
+	return waveform.measure_tests(open_circuit_path, short_circuit_path, progress=task.progress, **options)
+
+
+def batch_main(argv=None):
+	"""Command-line batch entry point: evaluate a CSV/Parquet file without opening the GUI."""
+	import batch
+	return batch.run_cli(argv)
+
+
+def service_main(argv=None):
+	"""Command-line service entry point: serve the calculations over HTTP/JSON without opening the GUI."""
+	import service
+	return service.run_cli(argv)
+
+
 if __name__ == '__main__':
+	if len(sys.argv) > 1 and sys.argv[1] == '--batch':
+		sys.exit(batch_main(sys.argv[2:]))
+	if len(sys.argv) > 1 and sys.argv[1] == '--serve':
+		sys.exit(service_main(sys.argv[2:]))
 	main()
 
 
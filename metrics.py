@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+"""Switchable timing spans and counters, exported as JSON or Prometheus text."""
+import bisect
+import json
+import math
+import threading
+import time
+
+
+# Histogram bucket upper bounds in seconds (the last bucket, +Inf, is implicit)
+BUCKETS = (
+	1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4,
+	1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0,
+)
+
+# Prefix of the exported Prometheus metric names
+NAMESPACE = 'transformer'
+
+# Checked by instrumented code before taking any timestamp; toggle with enable() and disable()
+enabled = False
+
+clock = time.perf_counter
+
+
+class Histogram:
+	"""Count, sum, extremes and bucket counts of the durations recorded for one span."""
+	__slots__ = ('count', 'sum', 'min', 'max', 'buckets')
+
+	def __init__(self):
+		self.count = 0
+		self.sum = 0.0
+		self.min = math.inf
+		self.max = 0.0
+		self.buckets = [0] * (len(BUCKETS) + 1)
+
+	def __repr__(self):
+		return f"Histogram(count={self.count}, sum={self.sum!r})"
+
+	def observe(self, seconds):
+		self.count += 1
+		self.sum += seconds
+		self.min = min(self.min, seconds)
+		self.max = max(self.max, seconds)
+		self.buckets[bisect.bisect_left(BUCKETS, seconds)] += 1
+
+	def as_dict(self):
+		cumulative = 0
+		buckets = {}
+		for bound, count in zip(BUCKETS + (math.inf,), self.buckets):
+			cumulative += count
+			buckets[_format_bound(bound)] = cumulative
+		return {
+			'count': self.count, 'sum': self.sum,
+			'min': self.min if self.count else None, 'max': self.max if self.count else None,
+			'mean': self.sum / self.count if self.count else None,
+			'buckets': buckets,
+		}
+
+
+class Registry:
+	"""Span histograms and event counters; safe to update from worker threads."""
+	def __init__(self):
+		self.spans = {}
+		self.counters = {}
+		self._lock = threading.Lock()
+
+	def observe(self, name, seconds):
+		with self._lock:
+			histogram = self.spans.get(name)
+			if histogram is None:
+				histogram = self.spans[name] = Histogram()
+			histogram.observe(seconds)
+
+	def count(self, name, n=1):
+		with self._lock:
+			self.counters[name] = self.counters.get(name, 0) + n
+
+	def clear(self):
+		with self._lock:
+			self.spans.clear()
+			self.counters.clear()
+
+	def as_dict(self):
+		with self._lock:
+			return {
+				'spans': {name: histogram.as_dict() for name, histogram in sorted(self.spans.items())},
+				'counters': dict(sorted(self.counters.items())),
+			}
+
+	def prometheus_text(self):
+		"""The metrics in the Prometheus text exposition format."""
+		data = self.as_dict()
+		lines = [
+			f"# HELP {NAMESPACE}_span_seconds Time spent in instrumented stages.",
+			f"# TYPE {NAMESPACE}_span_seconds histogram",
+		]
+		for name, histogram in data['spans'].items():
+			label = f'span="{_escape(name)}"'
+			for bound, count in histogram['buckets'].items():
+				lines.append(f'{NAMESPACE}_span_seconds_bucket{{{label},le="{bound}"}} {count}')
+			lines.append(f"{NAMESPACE}_span_seconds_sum{{{label}}} {histogram['sum']!r}")
+			lines.append(f"{NAMESPACE}_span_seconds_count{{{label}}} {histogram['count']}")
+		lines += [
+			f"# HELP {NAMESPACE}_events_total Counted events.",
+			f"# TYPE {NAMESPACE}_events_total counter",
+		]
+		for name, count in data['counters'].items():
+			lines.append(f'{NAMESPACE}_events_total{{event="{_escape(name)}"}} {count}')
+		return '\n'.join(lines) + '\n'
+
+
+def _format_bound(bound):
+	return '+Inf' if bound == math.inf else repr(bound)
+
+
+def _escape(text):
+	return text.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class _Span:
+	__slots__ = ('name', 'start')
+
+	def __init__(self, name):
+		self.name = name
+
+	def __enter__(self):
+		self.start = clock()
+		return self
+
+	def __exit__(self, *exc_info):
+		registry.observe(self.name, clock() - self.start)
+		return False
+
+
+class _NullSpan:
+	__slots__ = ()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc_info):
+		return False
+
+
+_NULL_SPAN = _NullSpan()
+
+# Process-wide registry used by the module-level functions
+registry = Registry()
+
+
+def enable():
+	global enabled
+	enabled = True
+
+
+def disable():
+	global enabled
+	enabled = False
+
+
+def span(name):
+	"""Context manager timing its block as one observation of span name (a no-op when disabled).
+
+	Hot loops should test the module-level enabled flag and call observe() instead.
+	"""
+	return _Span(name) if enabled else _NULL_SPAN
+
+
+def observe(name, seconds):
+	"""Record a duration for span name."""
+	registry.observe(name, seconds)
+
+
+def count(name, n=1):
+	"""Add n to counter name (ignored when disabled)."""
+	if enabled:
+		registry.count(name, n)
+
+
+def write(path):
+	"""Write the metrics to path, as Prometheus text for .prom/.txt files and JSON otherwise."""
+	if path.lower().endswith(('.prom', '.txt')):
+		text = registry.prometheus_text()
+	else:
+		text = json.dumps(registry.as_dict(), indent=2) + '\n'
+	with open(path, 'w', encoding='utf-8') as f:
+		f.write(text)
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""Multi-core evaluation of large record sets, exchanging data through shared memory."""
+import concurrent.futures
+import os
+import sys
+import threading
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import vectorized
+
+
+DEFAULT_CHUNK_SIZE = 1 << 17
+
+# Flag rows stored next to the float outputs in shared memory (int8, one row per flag)
+FLAG_FIELDS = ('error', 'valid', 'x_eq_clamped', 'has_r_c', 'has_x_m')
+
+
+def _layout(n):
+	"""Byte offsets of the input, output and flag blocks for n records."""
+	inputs_size = len(vectorized.INPUT_FIELDS) * n * 8
+	outputs_size = len(vectorized.OUTPUT_FIELDS) * n * 8
+	flags_size = len(FLAG_FIELDS) * n
+	return inputs_size, inputs_size + outputs_size, inputs_size + outputs_size + flags_size
+
+
+def _views(buffer, n):
+	"""NumPy views of the (inputs, outputs, flags) blocks laid out by _layout()."""
+	outputs_offset, flags_offset, _ = _layout(n)
+	inputs = np.ndarray((len(vectorized.INPUT_FIELDS), n), dtype=np.float64, buffer=buffer)
+	outputs = np.ndarray((len(vectorized.OUTPUT_FIELDS), n), dtype=np.float64, buffer=buffer, offset=outputs_offset)
+	flags = np.ndarray((len(FLAG_FIELDS), n), dtype=np.int8, buffer=buffer, offset=flags_offset)
+	return inputs, outputs, flags
+
+
+def _attach(name):
+	"""Attach to the parent's block; workers share the parent's resource tracker, which owns it."""
+	if sys.version_info >= (3, 13):
+		return shared_memory.SharedMemory(name=name, track=False)
+	return shared_memory.SharedMemory(name=name)
+
+
+def _evaluate_slice(name, n, start, stop):
+	"""Worker: evaluate records [start, stop) in place inside the shared block."""
+	shm = _attach(name)
+	try:
+		inputs, outputs, flags = _views(shm.buf, n)
+		result = vectorized.evaluate(*inputs[:, start:stop])
+		for row, field in enumerate(vectorized.OUTPUT_FIELDS):
+			outputs[row, start:stop] = getattr(result, field)
+		for row, field in enumerate(FLAG_FIELDS):
+			flags[row, start:stop] = getattr(result, field)
+		# Drop the views before closing, or the buffer is still exported
+		del inputs, outputs, flags, result
+	finally:
+		shm.close()
+	return start
+
+
+class ParallelEvaluator:
+	"""Process pool that evaluates record arrays chunk by chunk across all cores.
+
+	Use as a context manager (or call close()) so the worker processes are
+	reused across evaluate() calls and shut down at the end.
+	"""
+	def __init__(self, workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+		self.workers = workers or os.cpu_count() or 1
+		self.chunk_size = chunk_size
+		self._pool = None
+		self._cancel = threading.Event()
+		self._futures = []
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc_info):
+		self.close()
+
+	def close(self):
+		"""Shut down the worker processes."""
+		if self._pool is not None:
+			self._pool.shutdown(cancel_futures=True)
+			self._pool = None
+
+	def cancel(self):
+		"""Cancel the running evaluate() call; it raises concurrent.futures.CancelledError.
+
+		A cancel while no call is running applies to the next one.
+		"""
+		self._cancel.set()
+		for future in list(self._futures):
+			future.cancel()
+
+	def evaluate(self, power, vp, vs, voc, ioc, poc, vsc, isc, psc, progress=None):
+		"""Evaluate the nine input arrays in parallel; results are in input order.
+
+		progress, if given, is called with (records done, records total) as chunks finish.
+		"""
+		columns = [np.ravel(np.asarray(c, dtype=np.float64)) for c in (power, vp, vs, voc, ioc, poc, vsc, isc, psc)]
+		n = np.broadcast(*columns).size
+		# The flag is cleared when a run ends, not when it starts, so a cancel() just before the call still counts
+		try:
+			if self._cancel.is_set():
+				raise concurrent.futures.CancelledError()
+			# Small inputs are not worth the inter-process round trip
+			if self.workers == 1 or n <= self.chunk_size:
+				return vectorized.evaluate(*columns)
+			return self._evaluate_shared(columns, n, progress)
+		finally:
+			self._cancel.clear()
+
+	def _evaluate_shared(self, columns, n, progress):
+		"""Evaluate chunks of the columns in the worker processes through one shared memory block."""
+		if self._pool is None:
+			self._pool = concurrent.futures.ProcessPoolExecutor(max_workers=self.workers)
+		shm = shared_memory.SharedMemory(create=True, size=max(_layout(n)[2], 1))
+		try:
+			inputs, outputs, flags = _views(shm.buf, n)
+			for row, column in enumerate(columns):
+				inputs[row] = column
+			self._futures = [
+				self._pool.submit(_evaluate_slice, shm.name, n, start, min(start + self.chunk_size, n))
+				for start in range(0, n, self.chunk_size)]
+			done = 0
+			for future in concurrent.futures.as_completed(self._futures):
+				if self._cancel.is_set():
+					raise concurrent.futures.CancelledError()
+				start = future.result()
+				done += min(start + self.chunk_size, n) - start
+				if progress is not None:
+					progress(done, n)
+
+			result = vectorized.BatchResult(
+				**{field: outputs[row].copy() for row, field in enumerate(vectorized.OUTPUT_FIELDS)},
+				**{field: flags[row].astype(np.int8 if field == 'error' else bool)
+				   for row, field in enumerate(FLAG_FIELDS)})
+			return result
+		except BaseException:
+			for future in self._futures:
+				future.cancel()
+			# Workers still running must finish before the block is released
+			concurrent.futures.wait(self._futures)
+			raise
+		finally:
+			self._futures = []
+			# Drop the views before closing, or the buffer is still exported
+			inputs = outputs = flags = None
+			shm.close()
+			shm.unlink()
+
+
+def evaluate(power, vp, vs, voc, ioc, poc, vsc, isc, psc, workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+	"""One-shot parallel evaluation with a temporary process pool."""
+	with ParallelEvaluator(workers, chunk_size) as evaluator:
+		return evaluator.evaluate(power, vp, vs, voc, ioc, poc, vsc, isc, psc)
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""Cache of pre-scaled pixmaps, decoded off the GUI thread."""
+import atexit
+
+from PyQt6.QtCore import QCoreApplication, QObject, QRunnable, QSize, Qt, QThreadPool, pyqtSignal
+from PyQt6.QtGui import QImage, QImageReader, QPixmap
+
+
+class _Notifier(QObject):
+	"""Carries decoded images from pool threads back to the GUI thread."""
+	decoded = pyqtSignal(object, QImage)
+
+
+class _DecodeTask(QRunnable):
+	"""Decode and scale one image file into a QImage (QPixmap is GUI-thread only)."""
+	def __init__(self, key, notifier):
+		super().__init__()
+		self.key = key
+		self.notifier = notifier
+
+	def run(self):
+		path, width, height = self.key
+		reader = QImageReader(path)
+		reader.setAutoTransform(True)
+		size = reader.size()
+		if size.isValid():
+			# Scaled decoding lets the JPEG decoder skip most of the full-resolution work
+			reader.setScaledSize(size.scaled(QSize(width, height), Qt.AspectRatioMode.KeepAspectRatio))
+			reader.setQuality(100)
+		self.notifier.decoded.emit(self.key, reader.read())
+
+
+class PixmapCache:
+	"""Pre-scaled pixmaps keyed by (path, width, height), decoded asynchronously on first use."""
+	def __init__(self):
+		self._pixmaps = {}
+		self._waiting = {}
+		self._pending = set()
+		self._notifier = None
+
+	def set_image(self, label, path, width, height):
+		"""Show the image scaled to fit width x height on label, decoding it in the background if needed."""
+		key = (path, width, height)
+		pixmap = self._pixmaps.get(key)
+		if pixmap is not None:
+			_apply(label, pixmap)
+			return
+		self._waiting.setdefault(key, []).append(label)
+		self._decode(key)
+
+	def preload(self, images):
+		"""Start decoding (path, width, height) images that are not cached yet."""
+		for key in images:
+			if key not in self._pixmaps:
+				self._decode(key)
+
+	def _decode(self, key):
+		if key in self._pending:
+			return
+		self._pending.add(key)
+		# Created lazily so importing this module does not require a QApplication
+		if self._notifier is None:
+			self._notifier = _Notifier()
+			self._notifier.decoded.connect(self._on_decoded)
+			# Decoders still running at shutdown would emit into a destroyed notifier
+			pool = QThreadPool.globalInstance()
+			application = QCoreApplication.instance()
+			if application is not None:
+				application.aboutToQuit.connect(pool.waitForDone)
+			atexit.register(_wait_for_decoders)
+		QThreadPool.globalInstance().start(_DecodeTask(key, self._notifier))
+
+	def _on_decoded(self, key, image):
+		self._pending.discard(key)
+		pixmap = QPixmap.fromImage(image) if not image.isNull() else QPixmap()
+		self._pixmaps[key] = pixmap
+		for label in self._waiting.pop(key, []):
+			_apply(label, pixmap)
+
+
+def _wait_for_decoders():
+	# Fallback for exits that skip aboutToQuit; there is no pool left once the application is gone
+	pool = QThreadPool.globalInstance()
+	if pool is not None:
+		pool.waitForDone()
+
+
+def _apply(label, pixmap):
+	try:
+		if pixmap.isNull():
+			label.setText('Image not found')
+		else:
+			label.setPixmap(pixmap)
+	except RuntimeError:
+		# The label was deleted while its image was decoding
+		pass
+
+
+# Shared by every page in the application
+cache = PixmapCache()
+
+# Images shown by the pages, with the size each is scaled to
+PAGE_IMAGES = (
+	('img1.jpeg', 200, 200),
+	('img2.jpeg', 320, 250),
+	('img3.jpeg', 320, 250),
+	('img4.jpeg', 320, 250),
+	('img5.jpeg', 320, 250),
+)
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""Voltage-regulation sweeps over power factor and load fraction."""
+import numpy as np
+
+import vectorized
+
+
+# Default grid: 0.5 to unity power factor (lagging and leading) and 0 to 125% load
+DEFAULT_POWER_FACTORS = np.linspace(0.5, 1.0, 101)
+DEFAULT_LOAD_FRACTIONS = np.linspace(0.0, 1.25, 126)
+# Coarse grid over the same range, cheap enough to recompute on every live edit
+LIVE_POWER_FACTORS = np.linspace(0.5, 1.0, 21)
+LIVE_LOAD_FRACTIONS = np.linspace(0.0, 1.25, 26)
+
+
+class RegulationSweep:
+	"""VR surface over current angle (rows) and load fraction (columns) for one unit."""
+	__slots__ = ('angles_deg', 'power_factors', 'leading', 'load_fractions', 'vr',
+				 'worst_vr', 'worst_power_factor', 'worst_leading', 'worst_load_fraction')
+
+	def __init__(self, angles_deg, load_fractions, vr):
+		self.angles_deg = angles_deg
+		self.power_factors = np.cos(np.radians(angles_deg))
+		self.leading = angles_deg > 0
+		self.load_fractions = load_fractions
+		self.vr = vr
+
+		# Worst case is the largest regulation anywhere on the grid
+		if np.isnan(vr).all():
+			self.worst_vr = self.worst_power_factor = self.worst_leading = self.worst_load_fraction = None
+			return
+		row, col = np.unravel_index(np.nanargmax(vr), vr.shape)
+		self.worst_vr = float(vr[row, col])
+		self.worst_power_factor = float(self.power_factors[row])
+		self.worst_leading = bool(self.leading[row])
+		self.worst_load_fraction = float(load_fractions[col])
+
+	def at_load(self, load_fraction):
+		"""VR versus current angle at the grid load fraction closest to load_fraction."""
+		return self.vr[:, np.abs(self.load_fractions - load_fraction).argmin()]
+
+
+def sweep_angles(power_factors):
+	"""Sorted current angles in degrees (negative lagging, positive leading) for the given power factors."""
+	phi = np.degrees(np.arccos(np.clip(np.asarray(power_factors, dtype=np.float64), 0.0, 1.0)))
+	# Unity appears once even though it is both the last lagging and first leading point
+	return np.unique(np.concatenate((-phi, phi)))
+
+
+def regulation_surface(vs, i2_rated, r_eq_sec, x_eq_sec, angles_deg, load_fractions):
+	"""VR in percent for every (angle, load fraction) pair in one broadcast evaluation."""
+	phi = np.radians(np.asarray(angles_deg, dtype=np.float64))[:, None]
+	i2 = i2_rated * np.asarray(load_fractions, dtype=np.float64)[None, :]
+	v2_fl = vectorized.full_load_voltage(vs, i2, r_eq_sec, x_eq_sec, np.cos(phi), np.sin(phi))
+	return vectorized.voltage_regulation(vs, v2_fl)
+
+
+def sweep(result, power_factors=DEFAULT_POWER_FACTORS, load_fractions=DEFAULT_LOAD_FRACTIONS):
+	"""Evaluate VR of an engine.TransformerResult on a lagging/leading power factor by load grid."""
+	angles_deg = sweep_angles(power_factors)
+	load_fractions = np.asarray(load_fractions, dtype=np.float64)
+	vr = regulation_surface(result.vs, result.i2_rated, result.r_eq_sec, result.x_eq_sec, angles_deg, load_fractions)
+	return RegulationSweep(angles_deg, load_fractions, vr)
+
+
+def live_sweep(result):
+	"""sweep() on the coarse live-edit grid."""
+	return sweep(result, LIVE_POWER_FACTORS, LIVE_LOAD_FRACTIONS)
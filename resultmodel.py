@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""Result model that computes the transformer quantities once and renders only the views on screen."""
+import traceback
+
+from PyQt6.QtCore import QEvent, QObject, QTimer
+
+import metrics
+
+
+class _View:
+	"""One subscriber: a widget, the graph nodes it shows, and the function that displays them."""
+	__slots__ = ('widget', 'nodes', 'render', 'name', 'idle', 'span', 'versions')
+
+	def __init__(self, widget, nodes, render, name, idle=False):
+		self.widget = widget
+		self.nodes = tuple(nodes)
+		self.render = render
+		self.name = name
+		self.idle = idle
+		self.span = f"page.{name}"
+		# Node versions last rendered (None: never rendered)
+		self.versions = None
+
+
+class ResultModel(QObject):
+	"""Publishes the nodes of a depgraph.transformer_graph() to subscribed views.
+
+	Inputs set with set_inputs() only mark the graph dirty. Dispatch runs once
+	per event-loop turn however many times the inputs changed, and computes and
+	renders just the views that are visible and whose nodes changed since they
+	last rendered. Hidden views cost nothing until they are shown, when they
+	catch up with the latest values. Idle views hold detail too slow for every
+	edit; they render once the inputs have been still for IDLE_DELAY_MS.
+	"""
+	IDLE_DELAY_MS = 250
+
+	def __init__(self, parent=None):
+		super().__init__(parent)
+		self.graph = None
+		self._views = []
+		self._scheduled = False
+		self._idle_timer = QTimer(self)
+		self._idle_timer.setSingleShot(True)
+		self._idle_timer.setInterval(self.IDLE_DELAY_MS)
+		self._idle_timer.timeout.connect(self.flush_idle)
+
+	def subscribe(self, widget, nodes, render, name=None, idle=False):
+		"""Call render({node: value}) when nodes change and widget is visible; errors become None values.
+
+		With idle=True the render waits until the inputs have been still for
+		IDLE_DELAY_MS. Renders are timed under the metrics span page.<name>
+		(default: the widget class name).
+		"""
+		self._views.append(_View(widget, nodes, render, name or type(widget).__name__, idle))
+		widget.installEventFilter(self)
+
+	def set_inputs(self, values):
+		"""Set input nodes from a {name: value} mapping and schedule a dispatch."""
+		if self.graph is None:
+			# The calculation modules pull in NumPy, so they are loaded on the first input
+			import depgraph
+			self.graph = depgraph.transformer_graph()
+		for name, value in values.items():
+			self.graph.set(name, value)
+		if not self._scheduled:
+			self._scheduled = True
+			QTimer.singleShot(0, self.flush)
+
+	def flush(self):
+		"""Render the visible views now instead of on the next event-loop turn."""
+		self._scheduled = False
+		for view in self._views:
+			if not view.idle and view.widget.isVisible():
+				self._render(view)
+		self._idle_timer.start()
+
+	def flush_idle(self):
+		"""Render the visible idle views now."""
+		self._idle_timer.stop()
+		for view in self._views:
+			if view.idle and view.widget.isVisible():
+				self._render(view)
+
+	def get(self, name):
+		"""Current value of a node, computing it if needed (None if it could not be computed)."""
+		if self.graph is None:
+			return None
+		self.graph.update((name,))
+		value = self.graph.value(name)
+		return None if isinstance(value, Exception) else value
+
+	def eventFilter(self, watched, event):
+		if event.type() == QEvent.Type.Show:
+			for view in self._views:
+				if view.widget is watched:
+					if view.idle:
+						self._idle_timer.start()
+					else:
+						self._render(view)
+		return False
+
+	def _render(self, view):
+		if self.graph is None:
+			return
+		self.graph.update(view.nodes)
+		versions = tuple(self.graph.version(name) for name in view.nodes)
+		if versions == view.versions:
+			return
+		view.versions = versions
+		values = {}
+		for name in view.nodes:
+			value = self.graph.value(name)
+			# Nodes that could not be computed clear their displays
+			values[name] = None if isinstance(value, Exception) else value
+		try:
+			with metrics.span(view.span):
+				view.render(values)
+		except Exception as e:
+			print(f"Error updating {view.name}: {e}")
+			traceback.print_exc()
@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+"""Exact Jacobian of every output with respect to the nine inputs, by vectorized forward-mode differentiation."""
+import numpy as np
+
+import vectorized
+
+
+DEFAULT_CHUNK_SIZE = 65536
+
+
+class Dual:
+	"""Array of values carrying their gradients with respect to the inputs (forward-mode differentiation).
+
+	grad has one row per input: grad[k] holds d(value)/d(input k) for every record.
+	"""
+	__slots__ = ('value', 'grad')
+
+	def __init__(self, value, grad):
+		self.value = value
+		self.grad = grad
+
+	def __repr__(self):
+		return f"Dual(value={self.value!r}, grad={self.grad!r})"
+
+	def __neg__(self):
+		return Dual(-self.value, -self.grad)
+
+	def __add__(self, other):
+		if isinstance(other, Dual):
+			return Dual(self.value + other.value, self.grad + other.grad)
+		return Dual(self.value + other, self.grad)
+
+	__radd__ = __add__
+
+	def __sub__(self, other):
+		if isinstance(other, Dual):
+			return Dual(self.value - other.value, self.grad - other.grad)
+		return Dual(self.value - other, self.grad)
+
+	def __rsub__(self, other):
+		return Dual(other - self.value, -self.grad)
+
+	def __mul__(self, other):
+		if isinstance(other, Dual):
+			return Dual(self.value * other.value, self.grad * other.value + other.grad * self.value)
+		return Dual(self.value * other, self.grad * other)
+
+	__rmul__ = __mul__
+
+	def __truediv__(self, other):
+		if isinstance(other, Dual):
+			value = self.value / other.value
+			return Dual(value, (self.grad - other.grad * value) / other.value)
+		return Dual(self.value / other, self.grad / other)
+
+	def __rtruediv__(self, other):
+		value = other / self.value
+		return Dual(value, -self.grad * (value / self.value))
+
+
+def _chain(grad, derivative):
+	"""grad times the local derivative, staying zero where grad is zero (a clamp) even if the derivative is infinite."""
+	return np.where(grad == 0.0, 0.0, grad * derivative)
+
+
+# ELEMENTARY FUNCTIONS on Dual arrays, matching the NumPy calls in vectorized.evaluate()
+def sqrt(x):
+	value = np.sqrt(x.value)
+	return Dual(value, _chain(x.grad, 0.5 / value))
+
+
+def absolute(x):
+	return Dual(np.abs(x.value), x.grad * np.sign(x.value))
+
+
+def clip(x, low, high):
+	"""np.clip(); the derivative is zero where the value is clipped."""
+	inside = (x.value >= low) & (x.value <= high)
+	return Dual(np.clip(x.value, low, high), np.where(inside, x.grad, 0.0))
+
+
+def maximum(x, floor):
+	"""np.maximum(x, floor) for a constant floor; the derivative is zero below it."""
+	above = x.value >= floor
+	return Dual(np.maximum(x.value, floor), np.where(above, x.grad, 0.0))
+
+
+def arccos_degrees(x):
+	"""np.degrees(np.arccos(x)); d/dx = -180 / (π sqrt(1 - x²))."""
+	return Dual(np.degrees(np.arccos(x.value)), _chain(x.grad, -np.degrees(1.0) / np.sqrt(1.0 - x.value * x.value)))
+
+
+def hypot(x, y):
+	value = np.hypot(x.value, y.value)
+	return Dual(value, (x.grad * x.value + y.grad * y.value) / value)
+
+
+def where(condition, x, y):
+	"""np.where() for a Dual x and a Dual or constant y."""
+	if isinstance(y, Dual):
+		return Dual(np.where(condition, x.value, y.value), np.where(condition, x.grad, y.grad))
+	return Dual(np.where(condition, x.value, y), np.where(condition, x.grad, np.nan if np.isnan(y) else 0.0))
+
+
+def _full_load_voltage(vs, i2, r_eq_sec, x_eq_sec, cos_phi=1.0, sin_phi=0.0):
+	re = vs - i2 * (r_eq_sec * cos_phi - x_eq_sec * sin_phi)
+	im = i2 * (r_eq_sec * sin_phi + x_eq_sec * cos_phi)
+	return hypot(re, im)
+
+
+def _voltage_regulation(vs, v2_fl):
+	return where(v2_fl.value != 0, (vs - v2_fl) / v2_fl * 100.0, np.nan)
+
+
+def _outputs(power, vp, vs, voc, ioc, poc, vsc, isc, psc):
+	"""Every output of vectorized.evaluate() as a Dual, by the same formulas."""
+	turns_ratio = vp / vs
+	a_squared = turns_ratio * turns_ratio
+
+	# SHORT-CIRCUIT TEST
+	pf_sc = psc / (vsc * isc)
+	theta_sc_deg = arccos_degrees(clip(pf_sc, -1.0, 1.0))
+	z_eq_mag = vsc / isc
+	r_eq = psc / (isc * isc)
+	x_eq = sqrt(maximum(z_eq_mag * z_eq_mag - r_eq * r_eq, 0.0))
+
+	# OPEN-CIRCUIT TEST
+	y_phi_mag = a_squared * ioc / voc
+	pf_oc = poc / (voc * ioc)
+	pf_oc_clamped = clip(pf_oc, -1.0, 1.0)
+	theta_oc_deg = arccos_degrees(pf_oc_clamped)
+	g_phi = absolute(y_phi_mag) * pf_oc_clamped
+	b_phi = -y_phi_mag * sqrt(1.0 - pf_oc_clamped * pf_oc_clamped)
+	a_fourth = a_squared * a_squared
+	r_c = where(g_phi.value > 1e-12, a_fourth / g_phi, np.nan)
+	x_m = where(np.abs(b_phi.value) > 1e-12, a_fourth / absolute(b_phi), np.nan)
+
+	# REFERRED PARAMETERS
+	r_eq_sec = r_eq / a_squared
+	x_eq_sec = x_eq / a_squared
+	r_c_sec = r_c / a_squared
+
+	# VOLTAGE REGULATION at rated current
+	i2_rated = power / vs
+	v2_fl = _full_load_voltage(vs, i2_rated, r_eq_sec, x_eq_sec)
+	cos_08, sin_08 = vectorized.PF_08_COS, vectorized.PF_08_SIN
+
+	# EFFICIENCY at rated current and unity power factor
+	p_cu = i2_rated * i2_rated * r_eq_sec
+	p_core = vs * vs / r_c_sec
+	p_out = v2_fl * i2_rated
+	p_in = p_out + p_cu + p_core
+
+	return {
+		'turns_ratio': turns_ratio, 'i2_rated': i2_rated,
+		'pf_sc': pf_sc, 'theta_sc_deg': theta_sc_deg, 'z_eq_mag': z_eq_mag, 'r_eq': r_eq, 'x_eq': x_eq,
+		'pf_oc': pf_oc, 'theta_oc_deg': theta_oc_deg, 'y_phi_mag': y_phi_mag, 'g_phi': g_phi, 'b_phi': b_phi,
+		'r_c': r_c, 'x_m': x_m,
+		'z_eq_mag_sec': z_eq_mag / a_squared, 'r_eq_sec': r_eq_sec, 'x_eq_sec': x_eq_sec,
+		'y_phi_mag_sec': y_phi_mag / a_squared, 'g_phi_sec': g_phi / a_squared, 'b_phi_sec': b_phi / a_squared,
+		'r_c_sec': r_c_sec, 'x_m_sec': x_m / a_squared,
+		'v2_fl': v2_fl, 'vr': _voltage_regulation(vs, v2_fl),
+		'vr_08_lag': _voltage_regulation(vs, _full_load_voltage(vs, i2_rated, r_eq_sec, x_eq_sec, cos_08, -sin_08)),
+		'vr_08_lead': _voltage_regulation(vs, _full_load_voltage(vs, i2_rated, r_eq_sec, x_eq_sec, cos_08, sin_08)),
+		'p_in': p_in, 'p_out': p_out, 'p_cu': p_cu, 'p_core': p_core,
+		'eta': where(p_in.value != 0, p_out / p_in * 100.0, np.nan),
+	}
+
+
+class SensitivityResult:
+	"""Outputs of a batch together with their Jacobian with respect to the inputs.
+
+	values is the vectorized.BatchResult of the records. jacobian[i, j, k] is
+	d(outputs[j]) / d(vectorized.INPUT_FIELDS[k]) for record i; it is NaN for
+	invalid records and where an output is undefined, and zero where a clamp
+	(PF > 1, X_eq² < 0) holds the output constant.
+	"""
+	__slots__ = ('values', 'outputs', 'jacobian')
+
+	def __init__(self, values, outputs, jacobian):
+		self.values = values
+		self.outputs = outputs
+		self.jacobian = jacobian
+
+	def __repr__(self):
+		return f"SensitivityResult(records={len(self.values)}, outputs={len(self.outputs)})"
+
+	def __len__(self):
+		return len(self.values)
+
+	def derivative(self, output, input_name):
+		"""d(output) / d(input) for every record, e.g. derivative('r_c', 'poc')."""
+		return self.jacobian[:, self.outputs.index(output), vectorized.INPUT_FIELDS.index(input_name)]
+
+	def elasticity(self, output, input_name, inputs):
+		"""Relative sensitivity (dy/y) / (dx/x): the percent change of output per percent change of input.
+
+		inputs is the mapping (or structured array) of input columns the result was computed from.
+		"""
+		with np.errstate(divide='ignore', invalid='ignore'):
+			return self.derivative(output, input_name) * np.asarray(inputs[input_name]) / getattr(self.values, output)
+
+	def matrix(self, index):
+		"""Jacobian of one record as an (outputs x inputs) array."""
+		return self.jacobian[index]
+
+
+def jacobian(power, vp, vs, voc, ioc, poc, vsc, isc, psc, outputs=vectorized.OUTPUT_FIELDS,
+			 chunk_size=DEFAULT_CHUNK_SIZE):
+	"""Evaluate the records and the exact derivatives of the requested outputs in one vectorized pass.
+
+	Arguments broadcast like vectorized.evaluate(). Records are differentiated
+	chunk_size at a time; the returned Jacobian holds len(outputs) x 9 floats
+	per record, so restrict outputs for very large fleets.
+	"""
+	outputs = tuple(outputs)
+	for name in outputs:
+		if name not in vectorized.OUTPUT_FIELDS:
+			raise ValueError(f"Unknown output '{name}'.")
+	columns = [np.ravel(c) for c in np.broadcast_arrays(
+		*(np.asarray(c, dtype=np.float64) for c in (power, vp, vs, voc, ioc, poc, vsc, isc, psc)))]
+	values = vectorized.evaluate(*columns)
+	n = len(columns[0])
+	count = len(vectorized.INPUT_FIELDS)
+	result = np.empty((n, len(outputs), count), dtype=np.float64)
+	with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+		for start in range(0, n, chunk_size):
+			stop = min(start + chunk_size, n)
+			size = stop - start
+			duals = []
+			for k, column in enumerate(columns):
+				grad = np.zeros((count, size), dtype=np.float64)
+				grad[k] = 1.0
+				duals.append(Dual(column[start:stop], grad))
+			derived = _outputs(*duals)
+			for j, name in enumerate(outputs):
+				result[start:stop, j, :] = derived[name].grad.T
+	result[~values.valid] = np.nan
+	return SensitivityResult(values, outputs, result)
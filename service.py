@@ -0,0 +1,320 @@
+# -*- coding: utf-8 -*-
+"""Local HTTP/JSON calculation service on asyncio: single units, vectorized batches, keep-alive and metrics."""
+import argparse
+import asyncio
+import concurrent.futures
+import json
+import math
+import os
+import sys
+
+import numpy as np
+
+import cache
+import engine
+import metrics
+import vectorized
+
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8080
+
+# Idle keep-alive connections are closed after this many seconds
+KEEP_ALIVE_TIMEOUT = 15.0
+MAX_HEADER_BYTES = 64 * 1024
+MAX_BODY_BYTES = 64 * 1024 * 1024
+MAX_BATCH_RECORDS = 1000000
+# Batch bodies at least this large are handled in a worker process: json parsing and encoding hold
+# the GIL for the whole call, so on a thread they would still stall the other connections
+PROCESS_BODY_BYTES = 1 << 20
+
+REASONS = {
+	200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 413: 'Payload Too Large',
+	422: 'Unprocessable Entity', 500: 'Internal Server Error',
+}
+
+
+class HttpError(Exception):
+	"""Ends a request with an HTTP error status and a JSON {'error', 'message'} body."""
+	def __init__(self, status, message, title=None):
+		super().__init__(message)
+		self.status = status
+		self.title = title or REASONS[status]
+
+	def __reduce__(self):
+		# Raised in batch worker processes, so it must survive pickling
+		return type(self), (self.status, str(self), self.title)
+
+
+def _dumps(value):
+	return json.dumps(value, separators=(',', ':'), allow_nan=False).encode()
+
+
+def _json_column(column):
+	"""Array as a JSON-ready list, NaN and infinities as null."""
+	values = column.tolist()
+	if column.dtype.kind == 'f':
+		finite = np.isfinite(column)
+		if not finite.all():
+			return [v if ok else None for v, ok in zip(values, finite.tolist())]
+	return values
+
+
+def _float_column(values):
+	"""List of JSON numbers as float64; null and non-numeric entries become NaN (input errors)."""
+	try:
+		return np.array(values, dtype=np.float64)
+	except (TypeError, ValueError):
+		column = np.empty(len(values), dtype=np.float64)
+		for i, value in enumerate(values):
+			try:
+				column[i] = float(value)
+			except (TypeError, ValueError):
+				column[i] = np.nan
+		return column
+
+
+def _parse_json(body):
+	try:
+		return json.loads(body)
+	except (UnicodeDecodeError, ValueError):
+		raise HttpError(400, 'The request body is not valid JSON.') from None
+
+
+def batch_response(body):
+	"""(record count, JSON response bytes) of a /batch request body; raises HttpError for a bad request."""
+	data = _parse_json(body)
+	if not isinstance(data, dict):
+		raise HttpError(400, "Expected a JSON object with 'records' or 'columns'.")
+	columns = _batch_columns(data)
+	outputs = data.get('outputs', vectorized.OUTPUT_FIELDS)
+	if not isinstance(outputs, (list, tuple)) or not all(isinstance(name, str) for name in outputs):
+		raise HttpError(400, "'outputs' must be a list of output names.")
+	unknown = [name for name in outputs if name not in vectorized.OUTPUT_FIELDS]
+	if unknown:
+		raise HttpError(400, f"Unknown outputs: {', '.join(map(str, unknown))}.")
+	result = cache.evaluate_deduplicated(*columns)
+	response = {'error': _json_column(result.error)}
+	for name in outputs:
+		response[name] = _json_column(getattr(result, name))
+	return len(result), _dumps({
+		'count': len(result), 'errors': int(np.count_nonzero(result.error)), 'columns': response})
+
+
+def _batch_columns(data):
+	if 'columns' in data:
+		source = data['columns']
+		if not isinstance(source, dict):
+			raise HttpError(400, "'columns' must map input names to lists.")
+		missing = [name for name in vectorized.INPUT_FIELDS if name not in source]
+		if missing:
+			raise HttpError(400, f"Missing input columns: {', '.join(missing)}.")
+		lists = [source[name] for name in vectorized.INPUT_FIELDS]
+		if any(not isinstance(values, list) for values in lists) or len({len(values) for values in lists}) != 1:
+			raise HttpError(400, 'Input columns must be lists of the same length.')
+	elif 'records' in data:
+		records = data['records']
+		if not isinstance(records, list) or not all(isinstance(record, dict) for record in records):
+			raise HttpError(400, "'records' must be a list of objects.")
+		try:
+			lists = [[record[name] for record in records] for name in vectorized.INPUT_FIELDS]
+		except KeyError as e:
+			raise HttpError(400, f"A record is missing input {e.args[0]!r}.") from None
+	else:
+		raise HttpError(400, "Expected 'records' or 'columns'.")
+	if len(lists[0]) > MAX_BATCH_RECORDS:
+		raise HttpError(413, f"At most {MAX_BATCH_RECORDS} records per request.")
+	return [_float_column(values) for values in lists]
+
+
+class Service:
+	"""Request handlers and the connection loop of the calculation service."""
+	def __init__(self, cache_size=cache.DEFAULT_MAXSIZE):
+		self.cache = cache.ResultCache(cache_size)
+		self._pool = None
+		# Path: (method, handler, metrics span)
+		self.routes = {
+			'/calculate': ('POST', self.calculate, 'http.calculate'),
+			'/batch': ('POST', self.batch, 'http.batch'),
+			'/health': ('GET', self.health, 'http.health'),
+			'/metrics': ('GET', self.prometheus, 'http.metrics'),
+		}
+
+	# ENDPOINTS: each returns (content type, body bytes)
+	async def calculate(self, body):
+		"""One unit: the nine inputs as a JSON object; returns the equivalent circuit, VR and efficiency."""
+		data = _parse_json(body)
+		if not isinstance(data, dict):
+			raise HttpError(400, 'Expected a JSON object with the nine inputs.')
+		try:
+			values = [float(data[name]) for name in vectorized.INPUT_FIELDS]
+		except KeyError as e:
+			raise HttpError(400, f"Missing input {e.args[0]!r}.") from None
+		except (TypeError, ValueError):
+			raise HttpError(400, 'Please ensure all fields are numeric and not empty.') from None
+		# 'nan', 'inf' and overflowing numbers such as 1e400 parse as floats; /batch treats them as input errors too
+		invalid = [name for name, value in zip(vectorized.INPUT_FIELDS, values) if not math.isfinite(value)]
+		if invalid:
+			raise HttpError(400, f"Inputs must be finite numbers: {', '.join(invalid)}.")
+		try:
+			result = self.cache.calculate(*values)
+		except engine.CalculationError as e:
+			raise HttpError(422, str(e), e.title) from None
+		point = engine.rated_load_point(result)
+		fields = result.as_dict()
+		fields['warnings'] = list(fields['warnings'])
+		eff = engine.efficiency(result, point)
+		return 'application/json', _dumps({
+			'result': fields,
+			'regulation': engine.regulation_summary(result, point),
+			'efficiency': {name: getattr(eff, name) for name in eff.__slots__},
+		})
+
+	async def batch(self, body):
+		"""Many units, as {'records': [{inputs}, ...]} or {'columns': {input: [values]}}, evaluated vectorized.
+
+		An optional 'outputs' list limits the returned columns. Invalid records get
+		an error code and null outputs instead of failing the request. Parsing,
+		evaluation and encoding all run off the event loop (in a worker process
+		for large bodies), so a large batch does not hold up the other connections.
+		"""
+		executor = self._processes() if len(body) >= PROCESS_BODY_BYTES else None
+		records, payload = await asyncio.get_running_loop().run_in_executor(executor, batch_response, body)
+		metrics.count('http.batch.records', records)
+		return 'application/json', payload
+
+	def _processes(self):
+		if self._pool is None:
+			self._pool = concurrent.futures.ProcessPoolExecutor(max_workers=os.cpu_count() or 1)
+		return self._pool
+
+	def close(self):
+		"""Shut down the batch worker processes."""
+		if self._pool is not None:
+			self._pool.shutdown(cancel_futures=True)
+			self._pool = None
+
+	async def health(self, body):
+		return 'application/json', _dumps({'status': 'ok', 'cache': self.cache.stats()})
+
+	async def prometheus(self, body):
+		return 'text/plain; version=0.0.4', metrics.registry.prometheus_text().encode()
+
+	# CONNECTIONS
+	async def _respond(self, method, path, body):
+		"""(status, content type, body, span name) of one request."""
+		route = self.routes.get(path.split('?', 1)[0])
+		if route is None:
+			return (404, 'application/json', _dumps({'error': 'Not Found', 'message': f"No endpoint {path}."}),
+					'http.not_found')
+		allowed, handler, span = route
+		if method != allowed:
+			return 405, 'application/json', _dumps({'error': 'Method Not Allowed', 'message': f"Use {allowed}."}), span
+		try:
+			content_type, payload = await handler(body)
+			return 200, content_type, payload, span
+		except HttpError as e:
+			return e.status, 'application/json', _dumps({'error': e.title, 'message': str(e)}), span
+		except Exception as e:
+			return 500, 'application/json', _dumps({'error': 'Internal Server Error', 'message': str(e)}), span
+
+	async def handle_connection(self, reader, writer):
+		"""Serve requests on one connection until the client closes it, asks to, or goes idle."""
+		try:
+			while True:
+				try:
+					head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), KEEP_ALIVE_TIMEOUT)
+				except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError, ConnectionError):
+					return
+				start = metrics.clock()
+				lines = head.decode('latin-1').split('\r\n')
+				try:
+					method, path, version = lines[0].split(' ', 2)
+				except ValueError:
+					writer.write(_response(400, 'application/json', _dumps(
+						{'error': 'Bad Request', 'message': 'Malformed request line.'}), False))
+					return
+				headers = {}
+				for line in lines[1:]:
+					name, _, value = line.partition(':')
+					if name:
+						headers[name.strip().lower()] = value.strip()
+				connection = headers.get('connection', '').lower()
+				keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+				try:
+					length = int(headers.get('content-length', 0))
+				except ValueError:
+					length = -1
+				if not 0 <= length <= MAX_BODY_BYTES:
+					status = 413 if length > MAX_BODY_BYTES else 400
+					writer.write(_response(status, 'application/json', _dumps(
+						{'error': REASONS[status], 'message': 'Invalid or too large Content-Length.'}), False))
+					return
+				body = await reader.readexactly(length) if length else b''
+
+				status, content_type, payload, span = await self._respond(method, path, body)
+				writer.write(_response(status, content_type, payload, keep_alive))
+				await writer.drain()
+				if metrics.enabled:
+					metrics.observe(span, metrics.clock() - start)
+					metrics.count('http.requests')
+					metrics.count(f"http.status.{status}")
+				if not keep_alive:
+					return
+		except (asyncio.IncompleteReadError, ConnectionError):
+			pass
+		finally:
+			writer.close()
+
+	async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+		"""Listening asyncio.Server (port 0 picks a free port)."""
+		return await asyncio.start_server(self.handle_connection, host, port, limit=MAX_HEADER_BYTES)
+
+
+def _response(status, content_type, payload, keep_alive):
+	return (f"HTTP/1.1 {status} {REASONS[status]}\r\nContent-Type: {content_type}\r\n"
+			f"Content-Length: {len(payload)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+			).encode('latin-1') + payload
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, cache_size=cache.DEFAULT_MAXSIZE, ready=None):
+	"""Run the service until cancelled; ready, if given, is called with the bound (host, port)."""
+	service = Service(cache_size)
+	server = await service.start(host, port)
+	address = server.sockets[0].getsockname()[:2]
+	if ready is not None:
+		ready(address)
+	try:
+		async with server:
+			await server.serve_forever()
+	finally:
+		service.close()
+
+
+def run_cli(argv=None):
+	"""Command-line entry point: serve until interrupted."""
+	parser = argparse.ArgumentParser(prog='service.py', description='Serve the transformer calculations over HTTP/JSON.')
+	parser.add_argument('--host', default=DEFAULT_HOST, help='interface to listen on (default: %(default)s)')
+	parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='port, 0 for any free port (default: %(default)s)')
+	parser.add_argument('--cache-size', type=int, default=cache.DEFAULT_MAXSIZE,
+		help='single-unit results kept in memory (default: %(default)s)')
+	parser.add_argument('--no-metrics', action='store_true', help='do not time requests (GET /metrics stays empty)')
+	args = parser.parse_args(argv)
+	if not args.no_metrics:
+		metrics.enable()
+
+	def ready(address):
+		print(f"Serving on http://{address[0]}:{address[1]}", flush=True)
+
+	try:
+		asyncio.run(serve(args.host, args.port, args.cache_size, ready))
+	except KeyboardInterrupt:
+		pass
+	except OSError as e:
+		print(f"Error: {e}", file=sys.stderr)
+		return 1
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(run_cli())
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""Columnar result store on disk: one memory-mapped file per output, reopened instantly, exported to Arrow without copies."""
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+import vectorized
+
+
+FORMAT = 'transformer-results'
+VERSION = 1
+META_FILE = 'meta.json'
+STORE_EXTENSION = '.store'
+
+# One record of the store; inputs are optional, outputs and flags always present
+INPUT_SCHEMA = np.dtype([(name, '<f8') for name in vectorized.INPUT_FIELDS])
+SCHEMA = np.dtype(
+	[(name, '<f8') for name in vectorized.OUTPUT_FIELDS]
+	+ [('error', 'i1'), ('valid', '?'), ('x_eq_clamped', '?'), ('has_r_c', '?'), ('has_x_m', '?')])
+
+# Rows per Arrow record batch when writing IPC files
+DEFAULT_BATCH_ROWS = 1 << 20
+
+
+def _column_path(path, name):
+	return os.path.join(path, name + '.bin')
+
+
+class StoreWriter:
+	"""Appends BatchResult chunks to a store directory, column by column.
+
+	The store becomes readable when the writer is closed (use as a context
+	manager); until then an existing store at path is no longer valid. With
+	inputs=True, the nine input columns are stored as well.
+	"""
+	def __init__(self, path, inputs=False):
+		self.path = path
+		self.dtype = np.dtype(INPUT_SCHEMA.descr + SCHEMA.descr) if inputs else SCHEMA
+		self.rows = 0
+		os.makedirs(path, exist_ok=True)
+		meta = os.path.join(path, META_FILE)
+		if os.path.exists(meta):
+			os.remove(meta)
+		self._files = {name: open(_column_path(path, name), 'wb') for name in self.dtype.names}
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc_info):
+		self.close()
+
+	def append(self, result, inputs=None):
+		"""Add the records of a vectorized.BatchResult; inputs, if stored, is the nine input arrays or a dict of them."""
+		n = len(result)
+		if self.dtype is not SCHEMA:
+			if inputs is None:
+				raise ValueError('This store keeps the inputs; pass them with each chunk.')
+			if not isinstance(inputs, dict):
+				inputs = dict(zip(vectorized.INPUT_FIELDS, inputs))
+		for name in self.dtype.names:
+			values = inputs[name] if name in INPUT_SCHEMA.names else getattr(result, name)
+			column = np.ascontiguousarray(np.broadcast_to(values, (n,)), dtype=self.dtype[name])
+			column.tofile(self._files[name])
+		self.rows += n
+
+	def write(self, extra, result, inputs=None):
+		"""batch.run() sink interface; passthrough columns are not stored."""
+		self.append(result, inputs)
+
+	def close(self):
+		if self._files is None:
+			return
+		for f in self._files.values():
+			f.close()
+		self._files = None
+		# Written last, so an interrupted store never looks complete
+		with open(os.path.join(self.path, META_FILE), 'w', encoding='utf-8') as f:
+			json.dump({'format': FORMAT, 'version': VERSION, 'rows': self.rows,
+					   'columns': [[name, self.dtype[name].str] for name in self.dtype.names]}, f, indent=1)
+
+
+def save(path, result, inputs=None):
+	"""Write one BatchResult (and optionally its nine input arrays) as a store."""
+	with StoreWriter(path, inputs=inputs is not None) as writer:
+		writer.append(result, inputs)
+
+
+class ResultStore:
+	"""Read-only view of a store: every column is memory-mapped, so opening is instant and slices read only their rows."""
+	def __init__(self, path):
+		self.path = path
+		try:
+			with open(os.path.join(path, META_FILE), encoding='utf-8') as f:
+				meta = json.load(f)
+		except FileNotFoundError:
+			raise ValueError(f"{path} is not a result store, or it was not closed after writing.") from None
+		if meta.get('format') != FORMAT or meta.get('version') != VERSION:
+			raise ValueError(f"{path} is not a version {VERSION} result store.")
+		self.rows = meta['rows']
+		self.dtype = np.dtype([(name, dtype) for name, dtype in meta['columns']])
+		self._columns = {}
+		for name in self.dtype.names:
+			file = _column_path(path, name)
+			if os.path.getsize(file) != self.rows * self.dtype[name].itemsize:
+				raise ValueError(f"Column {name} of {path} does not match its row count.")
+			self._columns[name] = np.memmap(file, dtype=self.dtype[name], mode='r', shape=(self.rows,)) \
+				if self.rows else np.empty(0, dtype=self.dtype[name])
+
+	def __len__(self):
+		return self.rows
+
+	def __repr__(self):
+		return f"ResultStore({self.path!r}, rows={self.rows}, columns={len(self.dtype.names)})"
+
+	def __contains__(self, name):
+		return name in self._columns
+
+	def __getitem__(self, name):
+		"""Memory-mapped column."""
+		return self._columns[name]
+
+	@property
+	def columns(self):
+		return self.dtype.names
+
+	@property
+	def has_inputs(self):
+		return all(name in self._columns for name in vectorized.INPUT_FIELDS)
+
+	def result(self, index=slice(None)):
+		"""vectorized.BatchResult of the selected rows (a slice, mask or index array), read into memory."""
+		return vectorized.BatchResult(**{name: np.array(self._columns[name][index]) for name in SCHEMA.names})
+
+	def inputs(self, index=slice(None)):
+		"""The nine input arrays of the selected rows, or None if the store has no inputs."""
+		if not self.has_inputs:
+			return None
+		return [np.array(self._columns[name][index]) for name in vectorized.INPUT_FIELDS]
+
+	def structured(self, index=slice(None), columns=None):
+		"""Selected rows as a NumPy structured array (a copy), with all or the named columns."""
+		names = columns or self.dtype.names
+		first = self._columns[names[0]][index]
+		records = np.empty(np.shape(first), dtype=[(name, self.dtype[name]) for name in names])
+		for name in names:
+			records[name] = self._columns[name][index]
+		return records
+
+	def to_arrow(self, columns=None):
+		"""pyarrow.Table over the store's memory maps (requires pyarrow).
+
+		Numeric columns share the mapped pages without copying; boolean flags are
+		bit-packed by Arrow, so only they are copied (one bit per row).
+		"""
+		pa = _pyarrow()
+		arrays = {}
+		for name in columns or self.dtype.names:
+			column = self._columns[name]
+			if column.dtype.kind == 'b':
+				arrays[name] = pa.array(column)
+			else:
+				arrays[name] = pa.Array.from_buffers(
+					pa.from_numpy_dtype(column.dtype), len(column), [None, pa.py_buffer(column)])
+		return pa.table(arrays)
+
+	def write_ipc(self, path, columns=None, batch_rows=DEFAULT_BATCH_ROWS):
+		"""Write the store as an Arrow IPC file, batch_rows rows per record batch (requires pyarrow)."""
+		pa = _pyarrow()
+		table = self.to_arrow(columns)
+		with pa.OSFile(path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+			for batch in table.to_batches(max_chunksize=batch_rows):
+				writer.write_batch(batch)
+
+
+def _pyarrow():
+	try:
+		import pyarrow
+	except ImportError:
+		raise RuntimeError('Arrow export requires pyarrow (pip install pyarrow).') from None
+	return pyarrow
+
+
+def open_store(path):
+	"""Open a store written by StoreWriter or save()."""
+	return ResultStore(path)
+
+
+def is_store(path):
+	return os.path.splitext(path.rstrip('/\\'))[1].lower() == STORE_EXTENSION
+
+
+def run_cli(argv=None):
+	"""Describe a store, or export it to an Arrow IPC file."""
+	parser = argparse.ArgumentParser(prog='store.py', description='Inspect or export a columnar result store.')
+	parser.add_argument('store', help='store directory (written by batch.py with a .store output)')
+	parser.add_argument('--arrow', metavar='PATH', help='write the store as an Arrow IPC file')
+	parser.add_argument('--columns', help='comma-separated columns to export (default: all)')
+	args = parser.parse_args(argv)
+
+	try:
+		store = open_store(args.store)
+		columns = args.columns.split(',') if args.columns else None
+		unknown = [name for name in columns or () if name not in store]
+		if unknown:
+			raise ValueError(f"Unknown columns: {', '.join(unknown)}.")
+		if args.arrow:
+			store.write_ipc(args.arrow, columns)
+	except (OSError, ValueError, RuntimeError) as e:
+		print(f"Error: {e}", file=sys.stderr)
+		return 1
+	errors = int(np.count_nonzero(store['error'])) if len(store) else 0
+	print(f"{len(store)} rows, {errors} with errors, {len(store.columns)} columns"
+		  f"{' (inputs included)' if store.has_inputs else ''}")
+	if args.arrow:
+		print(f"Wrote {args.arrow}")
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(run_cli())
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""Background tasks for the GUI: thread-pool execution with progress, partial results and cancellation."""
+import concurrent.futures
+import threading
+import time
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+# Minimum time between two progress signals, so tight loops do not flood the GUI event queue
+PROGRESS_INTERVAL = 0.05
+
+PENDING = 'pending'
+RUNNING = 'running'
+FINISHED = 'finished'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+
+class Task(QObject):
+	"""Handle of one background computation; its signals are delivered on the GUI thread.
+
+	The function runs on a pool thread as function(task, *args, **kwargs). It
+	reports progress with task.progress(done, total), which can be passed as the
+	progress callback of parallel.ParallelEvaluator.evaluate(), and streams
+	intermediate values with task.partial(value). Cancellation is cooperative:
+	after cancel(), the next progress() or check_cancelled() call inside the
+	function raises concurrent.futures.CancelledError.
+	"""
+	# done, total (total is None when unknown)
+	progressed = pyqtSignal(object, object)
+	partial_result = pyqtSignal(object)
+	finished = pyqtSignal(object)
+	failed = pyqtSignal(object)
+	cancelled = pyqtSignal()
+	# Emitted after any of finished, failed or cancelled
+	done = pyqtSignal()
+
+	def __init__(self, name, function, args, kwargs, parent=None):
+		super().__init__(parent)
+		self.name = name
+		self.function = function
+		self.args = args
+		self.kwargs = kwargs
+		self.state = PENDING
+		self.result = None
+		self.error = None
+		self._cancel = threading.Event()
+		self._last_progress = 0.0
+
+	def __repr__(self):
+		return f"Task({self.name!r}, state={self.state!r})"
+
+	def cancel(self):
+		"""Ask the task to stop at its next progress() or check_cancelled() call."""
+		self._cancel.set()
+
+	def is_cancelled(self):
+		return self._cancel.is_set()
+
+	def is_done(self):
+		return self.state in (FINISHED, FAILED, CANCELLED)
+
+	def check_cancelled(self):
+		"""Raise concurrent.futures.CancelledError if cancel() was called (from the task function)."""
+		if self._cancel.is_set():
+			raise concurrent.futures.CancelledError()
+
+	def progress(self, done, total=None):
+		"""Report progress from the task function; raises CancelledError if the task was cancelled."""
+		self.check_cancelled()
+		now = time.perf_counter()
+		if now - self._last_progress >= PROGRESS_INTERVAL or (total is not None and done >= total):
+			self._last_progress = now
+			self.progressed.emit(done, total)
+
+	def partial(self, value):
+		"""Send an intermediate result to the GUI thread (from the task function)."""
+		self.check_cancelled()
+		self.partial_result.emit(value)
+
+	def _run(self):
+		if self._cancel.is_set():
+			self._finish(CANCELLED)
+			return
+		self.state = RUNNING
+		try:
+			result = self.function(self, *self.args, **self.kwargs)
+		except concurrent.futures.CancelledError:
+			self._finish(CANCELLED)
+		except Exception as e:
+			self.error = e
+			self._finish(FAILED)
+		else:
+			self.result = result
+			self._finish(FINISHED)
+
+	def _finish(self, state):
+		self.state = state
+		if state == FINISHED:
+			self.finished.emit(self.result)
+		elif state == FAILED:
+			self.failed.emit(self.error)
+		else:
+			self.cancelled.emit()
+		self.done.emit()
+
+
+class _Runner(QRunnable):
+	"""Runs a Task on a pool thread."""
+	def __init__(self, task):
+		super().__init__()
+		self.task = task
+
+	def run(self):
+		self.task._run()
+
+
+class TaskManager(QObject):
+	"""Runs Tasks on a dedicated thread pool and keeps track of the ones not done yet."""
+	# Emitted with each Task as it is submitted
+	task_submitted = pyqtSignal(object)
+
+	def __init__(self, parent=None, max_threads=None):
+		super().__init__(parent)
+		# Separate from the global pool, so long computations do not hold up image decoding
+		self._pool = QThreadPool(self)
+		if max_threads is not None:
+			self._pool.setMaxThreadCount(max_threads)
+		self._tasks = []
+
+	def submit(self, name, function, *args, **kwargs):
+		"""Start function(task, *args, **kwargs) in the background and return its Task."""
+		task = Task(name, function, args, kwargs, self)
+		self._tasks.append(task)
+		task.done.connect(lambda: self._forget(task))
+		self.task_submitted.emit(task)
+		self._pool.start(_Runner(task))
+		return task
+
+	def _forget(self, task):
+		if task in self._tasks:
+			self._tasks.remove(task)
+		task.deleteLater()
+
+	def active(self):
+		"""Tasks submitted and not done yet, oldest first."""
+		return [task for task in self._tasks if not task.is_done()]
+
+	def cancel_all(self):
+		for task in self._tasks:
+			task.cancel()
+
+	def wait(self, msecs=-1):
+		"""Block until every running task has returned; returns False on timeout."""
+		return self._pool.waitForDone(msecs)
+
+	def shutdown(self):
+		"""Cancel every task and wait for the pool threads to return."""
+		self.cancel_all()
+		self._pool.waitForDone()
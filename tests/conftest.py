@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+"""Shared fixtures: random but valid input records scattered around an example transformer."""
+import numpy as np
+import pytest
+
+
+# Nameplate and test values of the example unit: S, V1, V2, Voc, Ioc, Poc, Vsc, Isc, Psc
+EXAMPLE = (20000, 8000, 240, 8000, 0.214, 400, 489, 2.5, 240)
+
+
+def _random_records(n, seed=0):
+	rng = np.random.default_rng(seed)
+	return tuple(value * rng.uniform(0.9, 1.1, n) for value in EXAMPLE)
+
+
+@pytest.fixture(scope='session')
+def random_records():
+	"""random_records(n, seed=0): the nine input arrays of n valid, distinct records."""
+	return _random_records
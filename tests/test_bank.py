@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+"""Load sharing of banks of parallel units."""
+import numpy as np
+import pytest
+
+import bank
+import circuit
+import engine
+
+
+@pytest.fixture(scope='module')
+def units(random_records):
+	records = random_records(4, seed=11)
+	return [engine.calculate(*(column[k] for column in records)) for k in range(4)]
+
+
+def test_bank_power_balance(units):
+	solution = bank.solve(bank.Bank.from_results(units), load=np.linspace(0.1, 1.2, 12), pf=0.85)
+	np.testing.assert_allclose(solution.p_unit_out.sum(axis=-1), solution.p_out, rtol=1e-9)
+	np.testing.assert_allclose(solution.share.sum(axis=-1), 1.0, rtol=1e-9)
+	np.testing.assert_allclose(solution.p_in, solution.p_out + solution.p_cu + solution.p_core, rtol=1e-12)
+
+
+def test_identical_units_share_equally(units):
+	solution = bank.solve(bank.Bank.from_results([units[0]] * 3), load=0.8, pf=0.9)
+	np.testing.assert_allclose(solution.share, 1.0 / 3.0, rtol=1e-9)
+	np.testing.assert_allclose(solution.i_circulating, 0.0, atol=1e-9)
+	# A bank of identical units behaves like one of them at the same per-unit load
+	single = circuit.solve_exact(units[0], 0.8, 0.9, split=0.0)
+	assert float(solution.v2) == pytest.approx(float(single.v2_fl), rel=1e-9)
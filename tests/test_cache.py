@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+"""Batch deduplication against the plain vectorized evaluation."""
+import numpy as np
+
+import cache
+import vectorized
+
+
+def test_deduplicated_matches_vectorized(random_records):
+	unique = [column.copy() for column in random_records(50, seed=31)]
+	unique[4][7] = 0.0
+	order = np.random.default_rng(32).integers(0, 50, 1000)
+	records = [column[order] for column in unique]
+	columns, inverse = cache.deduplicate(*records)
+	assert len(columns[0]) == len(np.unique(order))
+	np.testing.assert_array_equal(columns[0][inverse], records[0])
+	expected = vectorized.evaluate(*records)
+	result = cache.evaluate_deduplicated(*records)
+	for name in vectorized.OUTPUT_FIELDS + ('error', 'valid'):
+		np.testing.assert_array_equal(getattr(result, name), getattr(expected, name), err_msg=name)
+
+
+def test_distinct_records_are_not_merged(random_records):
+	records = random_records(100, seed=33)
+	columns, inverse = cache.deduplicate(*records)
+	assert inverse is None
+	assert len(columns[0]) == 100
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""The approximate and exact circuit solvers."""
+import numpy as np
+import pytest
+
+import circuit
+import engine
+import vectorized
+
+
+RECORDS = 200
+
+
+@pytest.fixture(scope='module')
+def records(random_records):
+	return random_records(RECORDS, seed=7)
+
+
+def test_approximate_circuit_is_the_engine_model(records):
+	for k in range(0, RECORDS, 10):
+		result = engine.calculate(*(column[k] for column in records))
+		summary = engine.regulation_summary(result)
+		eff = engine.efficiency(result)
+		# Rated current at unity power factor goes through the same arithmetic
+		rated = circuit.solve_approximate(result)
+		assert float(rated.v2_fl) == summary['v2_fl']
+		assert float(rated.vr) == summary['vr']
+		for name in eff.__slots__:
+			assert float(getattr(rated, name)) == getattr(eff, name), name
+		# The engine builds 0.8 PF from acos(), so only the last bits may differ
+		for leading, key in ((False, 'vr_08_lag'), (True, 'vr_08_lead')):
+			point = circuit.solve_approximate(result, 1.0, vectorized.PF_08_COS, leading)
+			assert float(point.vr) == pytest.approx(summary[key], rel=1e-12)
+
+
+def test_batch_circuit_needs_vs(records):
+	batch = vectorized.evaluate(*records)
+	with pytest.raises(ValueError, match='vs'):
+		circuit.solve(batch)
+	assert circuit.solve(batch, vs=records[2]).vr == pytest.approx(batch.vr, rel=1e-12)
+
+
+def test_exact_circuit_balances_power(records):
+	batch = vectorized.evaluate(*records)
+	load = np.linspace(0.0, 1.25, 6)
+	exact = circuit.solve_exact(batch, load, 0.85, vs=records[2])
+	np.testing.assert_allclose(exact.p_in, exact.p_out + exact.p_cu + exact.p_core, rtol=1e-12)
+	# Moving the magnetizing branch changes the results only slightly
+	approximate = circuit.solve_approximate(batch, load, 0.85, vs=records[2])
+	np.testing.assert_allclose(exact.eta[:, 1:], approximate.eta[:, 1:], rtol=1e-3)
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""The vectorized evaluation against the scalar engine."""
+import numpy as np
+import pytest
+
+import engine
+import vectorized
+
+
+RECORDS = 200
+
+
+@pytest.fixture(scope='module')
+def records(random_records):
+	return random_records(RECORDS, seed=7)
+
+
+def test_vectorized_matches_engine(records):
+	batch = vectorized.evaluate(*records)
+	assert batch.valid.all()
+	for k in range(RECORDS):
+		result = engine.calculate(*(column[k] for column in records))
+		summary = engine.regulation_summary(result)
+		eff = engine.efficiency(result)
+		expected = dict(result.as_dict(), **summary, **{name: getattr(eff, name) for name in eff.__slots__})
+		for name in vectorized.OUTPUT_FIELDS:
+			assert getattr(batch, name)[k] == pytest.approx(expected[name], rel=1e-12), name
+
+
+def test_vectorized_flags_invalid_records(records):
+	columns = [column[:3].copy() for column in records]
+	columns[1][1] = 0.0
+	columns[8][2] = np.nan
+	batch = vectorized.evaluate(*columns)
+	assert batch.valid.tolist() == [True, False, False]
+	assert (batch.error[1:] != 0).all()
+	assert np.isnan(batch.eta[1:]).all()
+
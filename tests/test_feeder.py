@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+"""Radial feeder power flow."""
+import numpy as np
+
+import feeder
+import vectorized
+
+
+def test_feeder_power_balance(random_records):
+	records = random_records(3, seed=12)
+	batch = vectorized.evaluate(*records)
+	# Source at the first unit's rated primary voltage
+	network = feeder.Feeder(float(records[1][0]))
+	line = network.add_line(0, 0.5, 0.8)
+	secondaries = network.add_transformers([line, line, 0], batch)
+	services = network.add_branches(np.repeat(secondaries, 2), 0.01, 0.005)
+	n = len(network)
+	p = np.zeros((5, n))
+	q = np.zeros((5, n))
+	p[:, services] = np.linspace(1000.0, 6000.0, 5)[:, None]
+	q[:, services] = 0.3 * p[:, services]
+	solution = feeder.solve(network, p, q)
+	assert solution.converged.all()
+	np.testing.assert_allclose(solution.p_source, p.sum(axis=1) + solution.p_loss, rtol=1e-7)
+	assert (solution.p_loss > 0).all()
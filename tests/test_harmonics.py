@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""Harmonic losses of a known spectrum, and spectra of synthetic currents."""
+import numpy as np
+import pytest
+
+import harmonics
+import waveform
+
+
+SAMPLE_RATE = 7680.0
+FUNDAMENTAL = 60.0
+# RMS current of each order (0 is DC)
+COMPONENTS = {0: 0.5, 1: 10.0, 3: 1.5, 5: 2.0, 7: 1.43}
+
+
+def _current(seconds=1.0):
+	t = np.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+	current = np.full(len(t), COMPONENTS[0])
+	for order, rms in COMPONENTS.items():
+		if order:
+			current += rms * np.sqrt(2.0) * np.sin(2 * np.pi * FUNDAMENTAL * order * t + 0.1 * order)
+	return current
+
+
+def test_known_spectrum_losses():
+	losses = harmonics.load_losses(1.0, 1.0, [1, 5, 7], [1.0, 0.2, 0.143], per_unit=True, eddy_fraction=0.1)
+	assert float(losses.k_factor) == pytest.approx(2.831, abs=1e-3)
+	assert float(losses.derating) == pytest.approx(0.926, abs=1e-3)
+	assert float(losses.thd) == pytest.approx(np.hypot(0.2, 0.143) * 100.0, rel=1e-12)
+	assert float(losses.p_load_loss) == pytest.approx(float(losses.p_dc + losses.p_eddy), rel=1e-12)
+	# A pure sinusoid loses exactly what the sinusoidal model says and needs no derating
+	sine = harmonics.load_losses(0.02, 80.0, [1, 5], [80.0, 0.0])
+	assert float(sine.harmonic_loss_ratio) == pytest.approx(1.0, rel=1e-12)
+	assert float(sine.derating) == 1.0
+
+
+def test_current_spectrum_recovers_components():
+	orders, rms = harmonics.current_spectrum(_current(), SAMPLE_RATE, FUNDAMENTAL, max_order=9)
+	expected = np.array([COMPONENTS.get(order, 0.0) for order in orders])
+	np.testing.assert_allclose(rms, expected, atol=1e-9)
+	# Many recordings at once give the same spectra
+	_, both = harmonics.current_spectrum(np.stack([_current(), 2.0 * _current()]), SAMPLE_RATE, FUNDAMENTAL,
+										 max_order=9)
+	np.testing.assert_allclose(both, [expected, 2.0 * expected], atol=1e-9)
+
+
+def test_capture_spectrum_matches_in_memory(tmp_path):
+	current = _current()
+	path = tmp_path / 'load.bin'
+	np.column_stack((np.zeros_like(current), current * 1000.0)).round().astype('<i2').tofile(path)
+	capture = waveform.open_raw(str(path), SAMPLE_RATE, 2)
+	_, streamed = harmonics.capture_spectrum(capture, channel=1, scale=0.001, fundamental=FUNDAMENTAL, max_order=9)
+	_, in_memory = harmonics.current_spectrum(current, SAMPLE_RATE, FUNDAMENTAL, max_order=9)
+	# Only the 16-bit rounding of the samples differs
+	np.testing.assert_allclose(streamed, in_memory, atol=1e-3)
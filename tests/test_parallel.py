@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+"""Shared-memory process pool against the in-process evaluation."""
+import concurrent.futures
+
+import numpy as np
+import pytest
+
+import parallel
+import vectorized
+
+
+def test_pool_matches_vectorized(random_records):
+	records = list(random_records(1000, seed=21))
+	records[5][3] = 0.0
+	expected = vectorized.evaluate(*records)
+	with parallel.ParallelEvaluator(workers=2, chunk_size=128) as evaluator:
+		progress = []
+		result = evaluator.evaluate(*records, progress=lambda done, total: progress.append((done, total)))
+	for name in vectorized.OUTPUT_FIELDS + parallel.FLAG_FIELDS:
+		np.testing.assert_array_equal(getattr(result, name), getattr(expected, name), err_msg=name)
+	assert progress[-1] == (1000, 1000)
+
+
+def test_cancel_before_the_call_is_honoured(random_records):
+	records = random_records(1000, seed=22)
+	with parallel.ParallelEvaluator(workers=2, chunk_size=128) as evaluator:
+		evaluator.cancel()
+		with pytest.raises(concurrent.futures.CancelledError):
+			evaluator.evaluate(*records)
+		# The cancel applied to that call only
+		assert len(evaluator.evaluate(*records)) == 1000
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+"""Analytic Jacobian against central finite differences."""
+import numpy as np
+
+import sensitivity
+import vectorized
+
+
+def test_jacobian_matches_finite_differences(random_records):
+	records = random_records(50, seed=3)
+	result = sensitivity.jacobian(*records)
+	step = 1e-6
+	for k, name in enumerate(vectorized.INPUT_FIELDS):
+		up = [column.copy() for column in records]
+		down = [column.copy() for column in records]
+		h = step * np.abs(records[k])
+		up[k] += h
+		down[k] -= h
+		plus = vectorized.evaluate(*up)
+		minus = vectorized.evaluate(*down)
+		for j, output in enumerate(result.outputs):
+			numeric = (getattr(plus, output) - getattr(minus, output)) / (2.0 * h)
+			analytic = result.jacobian[:, j, k]
+			# Scale by the output so derivatives of tiny outputs are compared relatively
+			scale = np.abs(getattr(result.values, output)) / np.abs(records[k]) + np.abs(analytic)
+			np.testing.assert_array_less(np.abs(numeric - analytic), 1e-5 * scale + 1e-300,
+										 err_msg=f"d {output} / d {name}")
+
+
+def test_jacobian_is_nan_for_invalid_records(random_records):
+	records = [column[:2].copy() for column in random_records(2, seed=4)]
+	records[4][0] = 0.0
+	result = sensitivity.jacobian(*records)
+	assert np.isnan(result.jacobian[0]).all()
+	assert np.isfinite(result.jacobian[1]).all()
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""Calculation service handlers and the load-test request bodies they must accept."""
+import asyncio
+import json
+
+import numpy as np
+import pytest
+
+import engine
+import loadtest
+import service
+import vectorized
+
+
+@pytest.fixture(scope='module')
+def unit(random_records):
+	return {name: float(column[0]) for name, column in zip(vectorized.INPUT_FIELDS, random_records(1, seed=61))}
+
+
+def _calculate(data):
+	body = data if isinstance(data, bytes) else json.dumps(data).encode()
+	_, payload = asyncio.run(service.Service().calculate(body))
+	return json.loads(payload)
+
+
+def _status(call, *args):
+	with pytest.raises(service.HttpError) as error:
+		call(*args)
+	return error.value.status
+
+
+def test_calculate_matches_engine(unit):
+	response = _calculate(unit)
+	result = engine.calculate(*unit.values())
+	assert response['result']['r_eq'] == result.r_eq
+	assert response['regulation'] == engine.regulation_summary(result)
+	assert response['efficiency']['eta'] == engine.efficiency(result).eta
+
+
+def test_calculate_rejects_bad_inputs(unit):
+	missing = dict(unit)
+	del missing['psc']
+	assert _status(_calculate, missing) == 400
+	assert _status(_calculate, dict(unit, ioc='abc')) == 400
+	assert _status(_calculate, dict(unit, power='nan')) == 400
+	assert _status(_calculate, json.dumps(unit).replace(str(unit['vp']), '1e400').encode()) == 400
+	assert _status(_calculate, [1, 2]) == 400
+	# Numeric but physically impossible inputs are the engine's to reject
+	assert _status(_calculate, dict(unit, vp=0.0)) == 422
+
+
+def test_batch_response(random_records):
+	columns = [column.copy() for column in random_records(20, seed=62)]
+	columns[3][5] = np.nan
+	body = {'columns': {name: column.tolist() for name, column in zip(vectorized.INPUT_FIELDS, columns)},
+			'outputs': ['eta', 'vr']}
+	count, payload = service.batch_response(json.dumps(body).encode())
+	response = json.loads(payload)
+	expected = vectorized.evaluate(*columns)
+	assert count == response['count'] == 20
+	assert response['errors'] == 1
+	assert set(response['columns']) == {'error', 'eta', 'vr'}
+	assert response['columns']['eta'][5] is None
+	np.testing.assert_array_equal(np.array(response['columns']['eta'], dtype=np.float64), expected.eta)
+
+
+def test_batch_rejects_bad_requests(unit, monkeypatch):
+	records = {'records': [unit] * 3}
+	for outputs in (5, 'eta', [1], ['no_such_output']):
+		assert _status(service.batch_response, json.dumps(dict(records, outputs=outputs)).encode()) == 400
+	assert _status(service.batch_response, b'{"records": 5}') == 400
+	assert _status(service.batch_response, b'not json') == 400
+	monkeypatch.setattr(service, 'MAX_BATCH_RECORDS', 2)
+	assert _status(service.batch_response, json.dumps(records).encode()) == 413
+
+
+def test_load_test_bodies_are_accepted():
+	path, bodies = loadtest.request_bodies('calculate', units=3, seed=63)
+	assert path == '/calculate'
+	# Distinct units, so the service's cache does not answer them all
+	assert len(set(bodies)) == 3
+	for body in bodies:
+		_calculate(body)
+	path, bodies = loadtest.request_bodies('batch', batch_size=50, seed=64)
+	assert path == '/batch'
+	count, _ = service.batch_response(bodies[0])
+	assert count == 50
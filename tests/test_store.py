@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""Result store round trip."""
+import numpy as np
+
+import store
+import vectorized
+
+
+def test_round_trip(tmp_path, random_records):
+	records = list(random_records(1000, seed=5))
+	records[6][10] = -1.0
+	result = vectorized.evaluate(*records)
+	path = str(tmp_path / 'fleet.store')
+	with store.StoreWriter(path, inputs=True) as writer:
+		writer.append(result[:600], [column[:600] for column in records])
+		writer.append(result[600:], [column[600:] for column in records])
+
+	results = store.open_store(path)
+	assert len(results) == 1000
+	assert results.has_inputs
+	loaded = results.result()
+	for name in store.SCHEMA.names:
+		np.testing.assert_array_equal(getattr(loaded, name), getattr(result, name), err_msg=name)
+	for column, original in zip(results.inputs(), records):
+		np.testing.assert_array_equal(column, original)
+	np.testing.assert_array_equal(results.result(np.array([10, 3])).eta, result.eta[[10, 3]])
+
+
+def test_unclosed_store_is_rejected(tmp_path, random_records):
+	path = str(tmp_path / 'partial.store')
+	writer = store.StoreWriter(path)
+	writer.append(vectorized.evaluate(*random_records(10)))
+	try:
+		store.open_store(path)
+	except ValueError:
+		pass
+	else:
+		raise AssertionError('An unclosed store opened.')
+	finally:
+		writer.close()
+	assert len(store.open_store(path)) == 10
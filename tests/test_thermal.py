@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""IEEE C57.91 thermal model: rated steady state, step response and streaming."""
+import numpy as np
+import pytest
+
+import thermal
+
+
+def _profile(minutes, seed=51):
+	t = np.arange(minutes)
+	rng = np.random.default_rng(seed)
+	load = 0.9 + 0.4 * np.sin(2 * np.pi * t / 1440) + rng.uniform(-0.1, 0.1, minutes)
+	ambient = 25.0 + 8.0 * np.sin(2 * np.pi * (t - 300) / 1440)
+	return load, ambient
+
+
+def test_rated_steady_state():
+	parameters = thermal.ThermalParameters(np.array([3.0, 5.0, 8.0]))
+	result = thermal.simulate(parameters, thermal.iter_arrays(np.ones(2880), 30.0))
+	# A 65 °C rise unit at rated load and 30 °C ambient: 85 °C top oil, 110 °C hot spot, normal ageing
+	np.testing.assert_allclose(result.peak_top_oil, 85.0, rtol=1e-12)
+	np.testing.assert_allclose(result.peak_hot_spot, 110.0, rtol=1e-12)
+	np.testing.assert_allclose(result.equivalent_ageing_factor, 1.0, rtol=1e-12)
+	assert thermal.ageing_factor(110.0) == pytest.approx(1.0, rel=1e-15)
+	assert (result.hours_over_limit == 0).all()
+
+
+def test_step_response():
+	parameters = thermal.ThermalParameters(5.0)
+	load = np.concatenate([np.full(1, 0.5), np.ones(600)])
+	trace = []
+	thermal.simulate(parameters, thermal.iter_arrays(load, 30.0),
+					 trace=lambda minute, top_oil, hot_spot: trace.append((top_oil, hot_spot)))
+	top_oil, hot_spot = (np.ravel(values) for values in trace[0])
+	oil_before, oil_after = (float(np.ravel(parameters.ultimate_top_oil_rise(k))[0]) for k in (0.5, 1.0))
+	gradient_before, gradient_after = (float(np.ravel(parameters.ultimate_hot_spot_gradient(k))[0]) for k in (0.5, 1.0))
+	# Exact first-order lags of the ultimate rises, sampled at the steps
+	k = np.arange(len(load))
+	oil = oil_after + (oil_before - oil_after) * np.exp(-k / thermal.DEFAULT_OIL_TIME_CONSTANT)
+	gradient = gradient_after + (gradient_before - gradient_after) * np.exp(-k / thermal.DEFAULT_WINDING_TIME_CONSTANT)
+	np.testing.assert_allclose(top_oil, 30.0 + oil, rtol=1e-12)
+	np.testing.assert_allclose(hot_spot, 30.0 + oil + gradient, rtol=1e-12)
+
+
+def test_independent_of_chunk_size():
+	load, ambient = _profile(3 * 1440)
+	parameters = thermal.ThermalParameters(np.array([3.0, 6.0]), oil_time_constant=np.array([150.0, 210.0]))
+	reference = thermal.simulate(parameters, thermal.iter_arrays(load, ambient))
+	for chunk in (37, 1000, 1440):
+		result = thermal.simulate(parameters, thermal.iter_arrays(load, ambient, chunk))
+		for name in ('peak_top_oil', 'peak_hot_spot', 'aged_hours', 'hours_over_limit'):
+			np.testing.assert_allclose(getattr(result, name), getattr(reference, name), rtol=1e-12, err_msg=name)
+		np.testing.assert_array_equal(result.peak_minute, reference.peak_minute)
+
+
+def test_units_match_separate_runs():
+	load, ambient = _profile(2000)
+	loss_ratio = np.array([3.0, 5.0, 8.0])
+	winding = np.array([3.0, 4.0, 7.0])
+	together = thermal.simulate(thermal.ThermalParameters(loss_ratio, winding_time_constant=winding),
+								thermal.iter_arrays(load, ambient))
+	for unit in range(3):
+		alone = thermal.simulate(thermal.ThermalParameters(loss_ratio[unit], winding_time_constant=winding[unit]),
+								 thermal.iter_arrays(load, ambient))
+		assert together.peak_hot_spot[unit] == pytest.approx(float(np.ravel(alone.peak_hot_spot)[0]), rel=1e-12)
+		assert together.aged_hours[unit] == pytest.approx(float(np.ravel(alone.aged_hours)[0]), rel=1e-12)
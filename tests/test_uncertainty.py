@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+"""Streaming Monte Carlo histogram against NumPy quantiles."""
+import numpy as np
+
+import uncertainty
+
+
+def test_histogram_quantiles_match_numpy():
+	rng = np.random.default_rng(41)
+	# Later chunks are wider on both sides, so the range has to grow while streaming
+	chunks = [rng.normal(0.0, scale, 5000) for scale in (0.1, 1.0, 5.0)]
+	chunks[1][:10] = np.nan
+	histogram = uncertainty.StreamingHistogram()
+	for chunk in chunks:
+		histogram.add(chunk)
+	values = np.concatenate(chunks)
+	values = values[np.isfinite(values)]
+	assert histogram.counts.sum() == len(values)
+	assert (histogram.min, histogram.max) == (values.min(), values.max())
+	for q in (0.025, 0.5, 0.975):
+		assert abs(histogram.quantile(q) - np.quantile(values, q)) <= histogram.width
+
+
+def test_empty_histogram_has_no_quantile():
+	histogram = uncertainty.StreamingHistogram()
+	histogram.add(np.array([np.nan, np.inf]))
+	assert histogram.quantile(0.5) is None
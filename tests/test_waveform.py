@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""Streaming waveform reduction."""
+import numpy as np
+import pytest
+
+import waveform
+
+
+SAMPLE_RATE = 10000.0
+
+
+@pytest.fixture(scope='module')
+def capture(tmp_path_factory):
+	"""10.5 cycles of 50 Hz voltage and a lagging current, as raw int16."""
+	t = np.arange(int(SAMPLE_RATE * 0.21)) / SAMPLE_RATE
+	v = 10000.0 * np.sin(2 * np.pi * 50.0 * t + 0.3)
+	i = 8000.0 * np.sin(2 * np.pi * 50.0 * t + 0.3 - 0.5)
+	path = tmp_path_factory.mktemp('captures') / 'test.bin'
+	np.column_stack((v, i)).round().astype('<i2').tofile(path)
+	return waveform.open_raw(str(path), SAMPLE_RATE, 2)
+
+
+def test_independent_of_chunk_size(capture):
+	reference = waveform.measure(capture, chunk_frames=capture.frames)
+	for chunk in (7, 64, 199, 1000):
+		measured = waveform.measure(capture, chunk_frames=chunk)
+		assert measured.cycles == reference.cycles
+		assert measured.samples == reference.samples
+		for name in ('v_rms', 'i_rms', 'power', 'frequency'):
+			assert getattr(measured, name) == pytest.approx(getattr(reference, name), rel=1e-12), name
+
+
+def test_whole_cycles(capture):
+	measured = waveform.measure(capture, voltage_scale=0.01, current_scale=0.001)
+	# Whole cycles between the first and last rising zero crossings
+	assert measured.cycles == 9
+	assert measured.frequency == pytest.approx(50.0, rel=1e-3)
+	assert measured.v_rms == pytest.approx(100.0 / np.sqrt(2), rel=1e-3)
+	assert measured.power == pytest.approx(100.0 * 8.0 / 2 * np.cos(0.5), rel=1e-3)
+
+
+def test_measure_tests_reads_raw_captures(capture):
+	values = waveform.measure_tests(capture.path, capture.path, sample_rate=SAMPLE_RATE, channels=2)
+	expected = waveform.measure(capture)
+	assert values['voc'] == values['vsc'] == expected.v_rms
+	assert values['poc'] == expected.power
@@ -0,0 +1,333 @@
+# -*- coding: utf-8 -*-
+"""Top-oil and hot-spot temperatures, insulation ageing and loss of life over load profiles (IEEE C57.91, clause 7)."""
+import argparse
+import csv
+import sys
+
+import numpy as np
+
+import vectorized
+
+
+# Exponents (n for oil, m for winding) of each cooling mode, IEEE C57.91 table 4
+COOLING_EXPONENTS = {
+	'ONAN': (0.8, 0.8),
+	'ONAF': (0.9, 0.8),
+	'OFAF': (0.9, 0.8),
+	'ODAF': (1.0, 1.0),
+}
+
+# Rated rises of a 65 °C rise unit: 110 °C hot spot at 30 °C ambient
+DEFAULT_TOP_OIL_RISE = 55.0
+DEFAULT_HOT_SPOT_GRADIENT = 25.0
+# Time constants in minutes
+DEFAULT_OIL_TIME_CONSTANT = 180.0
+DEFAULT_WINDING_TIME_CONSTANT = 4.0
+
+# Ageing relative to a 110 °C hot spot, and the normal insulation life it is measured against
+AGEING_REFERENCE = 110.0
+AGEING_B = 15000.0
+NORMAL_LIFE_HOURS = 180000.0
+
+DEFAULT_STEP_MINUTES = 1.0
+# Profile minutes per streamed chunk
+DEFAULT_CHUNK_MINUTES = 7 * 1440
+# Largest decay exponent integrated in one block (exp(50) stays well inside float range)
+_MAX_EXPONENT = 50.0
+
+
+class ThermalParameters:
+	"""Thermal data of one or many units (each attribute a scalar or an array over units)."""
+	__slots__ = ('loss_ratio', 'top_oil_rise', 'hot_spot_gradient', 'oil_time_constant',
+				 'winding_time_constant', 'n', 'm')
+
+	def __init__(self, loss_ratio, top_oil_rise=DEFAULT_TOP_OIL_RISE, hot_spot_gradient=DEFAULT_HOT_SPOT_GRADIENT,
+				 oil_time_constant=DEFAULT_OIL_TIME_CONSTANT, winding_time_constant=DEFAULT_WINDING_TIME_CONSTANT,
+				 cooling='ONAN'):
+		if cooling not in COOLING_EXPONENTS:
+			raise ValueError(f"Unknown cooling mode '{cooling}' (expected one of {', '.join(COOLING_EXPONENTS)}).")
+		# R: rated load loss over no-load loss
+		self.loss_ratio = np.asarray(loss_ratio, dtype=np.float64)
+		self.top_oil_rise = np.asarray(top_oil_rise, dtype=np.float64)
+		self.hot_spot_gradient = np.asarray(hot_spot_gradient, dtype=np.float64)
+		self.oil_time_constant = np.asarray(oil_time_constant, dtype=np.float64)
+		self.winding_time_constant = np.asarray(winding_time_constant, dtype=np.float64)
+		self.n, self.m = COOLING_EXPONENTS[cooling]
+
+	def __repr__(self):
+		fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+		return f"{type(self).__name__}({fields})"
+
+	@classmethod
+	def from_losses(cls, p_cu, p_core, **kwargs):
+		"""Parameters whose loss ratio is rated copper loss over core loss (e.g. efficiency.losses(result))."""
+		with np.errstate(divide='ignore', invalid='ignore'):
+			return cls(np.asarray(p_cu, dtype=np.float64) / np.asarray(p_core, dtype=np.float64), **kwargs)
+
+	@classmethod
+	def from_batch(cls, result, **kwargs):
+		"""Parameters of every unit of a vectorized.BatchResult (rated p_cu and p_core columns)."""
+		return cls.from_losses(result.p_cu, result.p_core, **kwargs)
+
+	def ultimate_top_oil_rise(self, load):
+		"""Steady-state top-oil rise at per-unit load K: Δθ_TO,R * ((K²R + 1) / (R + 1))^n."""
+		r = self.loss_ratio[..., None]
+		# K²·R/(R+1) + 1/(R+1): the per-unit coefficients are formed once, K² only at the profile's own shape
+		ratio = np.square(load) * (r / (r + 1.0))
+		ratio += 1.0 / (r + 1.0)
+		np.power(ratio, self.n, out=ratio)
+		ratio *= self.top_oil_rise[..., None]
+		return ratio
+
+	def ultimate_hot_spot_gradient(self, load):
+		"""Steady-state hot-spot rise over top oil at per-unit load K: Δθ_H,R * K^(2m)."""
+		return self.hot_spot_gradient[..., None] * np.square(load) ** self.m
+
+
+class ThermalResult:
+	"""Peak temperatures (°C), ageing and loss of life of each unit over a profile."""
+	__slots__ = ('minutes', 'peak_top_oil', 'peak_hot_spot', 'peak_minute', 'aged_hours', 'hours_over_limit',
+				 'hot_spot_limit')
+
+	def __init__(self, minutes, peak_top_oil, peak_hot_spot, peak_minute, aged_hours, hours_over_limit,
+				 hot_spot_limit):
+		self.minutes = minutes
+		self.peak_top_oil = peak_top_oil
+		self.peak_hot_spot = peak_hot_spot
+		self.peak_minute = peak_minute
+		self.aged_hours = aged_hours
+		self.hours_over_limit = hours_over_limit
+		self.hot_spot_limit = hot_spot_limit
+
+	def __repr__(self):
+		return f"ThermalResult(minutes={self.minutes}, units={np.size(self.aged_hours)})"
+
+	@property
+	def hours(self):
+		return self.minutes / 60.0
+
+	@property
+	def equivalent_ageing_factor(self):
+		"""F_EQA: mean ageing acceleration over the profile."""
+		return self.aged_hours / self.hours if self.minutes else None
+
+	@property
+	def loss_of_life_percent(self):
+		"""Insulation life consumed, in percent of NORMAL_LIFE_HOURS."""
+		return self.aged_hours / NORMAL_LIFE_HOURS * 100.0
+
+
+def ageing_factor(hot_spot):
+	"""Ageing acceleration F_AA = exp(B / 383 - B / (θ_H + 273)) relative to a 110 °C hot spot."""
+	factor = np.empty(np.shape(hot_spot))
+	np.add(hot_spot, 273.0, out=factor)
+	np.divide(-AGEING_B, factor, out=factor)
+	factor += AGEING_B / (AGEING_REFERENCE + 273.0)
+	# [()] gives a scalar back for a scalar hot spot
+	return np.exp(factor, out=factor)[()]
+
+
+def _decay(step_minutes, time_constant, units):
+	"""Δt/τ as a scalar when every unit shares τ, else per unit with shape units + (1,)."""
+	decay = step_minutes / time_constant
+	if decay.ndim and (decay != decay.flat[0]).any():
+		return np.broadcast_to(decay, units)[..., None]
+	return decay.flat[0]
+
+
+def _first_order(target, decay, state):
+	"""Exact response of dy/dt = (target - y) / τ to a stepwise target, per unit along the last axis.
+
+	decay is Δt/τ, a scalar or per unit (shape (units, 1)), and state the value
+	before the first step. The recurrence y[k] = a·y[k-1] + (1 - a)·target[k] with
+	a = exp(-Δt/τ) is solved in closed form, y[k] = a^k (y0 + (1 - a) Σ_j≤k target[j] / a^j),
+	in blocks short enough that 1 / a^k stays representable. The a^-k and a^k rows
+	are computed once per block length, over units only when τ differs between them.
+	"""
+	decay = np.asarray(decay)
+	steps = target.shape[-1]
+	block = max(1, int(_MAX_EXPONENT / float(decay.max())))
+	one_minus_a = -np.expm1(-decay)
+	out = np.empty(np.broadcast_shapes(target.shape, np.shape(state) + (1,), decay.shape))
+	growth = None
+	for start in range(0, steps, block):
+		stop = min(start + block, steps)
+		if growth is None or growth.shape[-1] != stop - start:
+			exponent = decay * np.arange(1, stop - start + 1)
+			growth = np.exp(exponent)
+			shrink = np.exp(-exponent)
+		part = out[..., start:stop]
+		np.multiply(target[..., start:stop], growth, out=part)
+		np.cumsum(part, axis=-1, out=part)
+		part *= one_minus_a
+		part += state[..., None]
+		part *= shrink
+		state = part[..., -1]
+	return out
+
+
+def simulate(parameters, profiles, step_minutes=DEFAULT_STEP_MINUTES, hot_spot_limit=140.0,
+			 progress=None, trace=None):
+	"""Run the thermal model of every unit through streamed (load, ambient) profile chunks.
+
+	profiles yields (load, ambient) pairs: per-unit load K and ambient °C, each
+	of shape (steps,) for a profile shared by all units or (units, steps).
+	Temperatures start at steady state for the first step. progress, if given,
+	is called with (minutes done, None) after each chunk; trace, if given, with
+	(first minute, top oil, hot spot) arrays of each chunk.
+	"""
+	step_hours = step_minutes / 60.0
+	minutes = 0.0
+	top_oil_rise = None
+	for load, ambient in profiles:
+		load = np.asarray(load, dtype=np.float64)
+		ambient = np.asarray(ambient, dtype=np.float64)
+		steps = np.broadcast(load, ambient).shape[-1]
+		if top_oil_rise is None:
+			# Units come from the parameters and any per-unit profile columns (one unit can run many scenarios)
+			units = np.broadcast_shapes(
+				parameters.loss_ratio.shape, parameters.top_oil_rise.shape, parameters.hot_spot_gradient.shape,
+				parameters.oil_time_constant.shape, parameters.winding_time_constant.shape,
+				load.shape[:-1], ambient.shape[:-1])
+			oil_decay = _decay(step_minutes, parameters.oil_time_constant, units)
+			winding_decay = _decay(step_minutes, parameters.winding_time_constant, units)
+			peak_top_oil = np.full(units, -np.inf)
+			peak_hot_spot = np.full(units, -np.inf)
+			peak_minute = np.zeros(units)
+			aged_hours = np.zeros(units)
+			hours_over_limit = np.zeros(units)
+		# A shared profile stays (steps,): work that depends only on the load is done once, not per unit
+		ultimate_oil = parameters.ultimate_top_oil_rise(load)
+		ultimate_gradient = parameters.ultimate_hot_spot_gradient(load)
+		if top_oil_rise is None:
+			top_oil_rise = ultimate_oil[..., 0].copy()
+			hot_spot_rise = ultimate_gradient[..., 0].copy()
+		# Both rises follow first-order lags of their ultimate values (clause 7); ambient adds directly
+		oil = _first_order(ultimate_oil, oil_decay, top_oil_rise)
+		gradient = _first_order(ultimate_gradient, winding_decay, hot_spot_rise)
+		top_oil_rise = oil[..., -1].copy()
+		hot_spot_rise = gradient[..., -1].copy()
+		top_oil = oil + ambient
+		hot_spot = top_oil + gradient
+
+		peak_top_oil = np.maximum(peak_top_oil, top_oil.max(axis=-1))
+		index = hot_spot.argmax(axis=-1)
+		chunk_peak = np.take_along_axis(hot_spot, index[..., None], axis=-1)[..., 0]
+		newer = chunk_peak > peak_hot_spot
+		peak_hot_spot = np.where(newer, chunk_peak, peak_hot_spot)
+		peak_minute = np.where(newer, minutes + index * step_minutes, peak_minute)
+		aged_hours += ageing_factor(hot_spot).sum(axis=-1) * step_hours
+		hours_over_limit += np.count_nonzero(hot_spot > hot_spot_limit, axis=-1) * step_hours
+		if trace is not None:
+			trace(minutes, top_oil, hot_spot)
+		minutes += steps * step_minutes
+		if progress is not None:
+			progress(int(minutes), None)
+	if top_oil_rise is None:
+		raise ValueError('The load profile is empty.')
+	return ThermalResult(minutes, peak_top_oil, peak_hot_spot, peak_minute, aged_hours, hours_over_limit,
+						 hot_spot_limit)
+
+
+# PROFILE SOURCES
+def iter_arrays(load, ambient, chunk_minutes=DEFAULT_CHUNK_MINUTES):
+	"""Chunks of in-memory (or memory-mapped) profiles; time runs along the first axis, units along the second."""
+	load = np.asarray(load)
+	ambient = np.asarray(ambient)
+	steps = max(load.shape[0] if load.ndim else 1, ambient.shape[0] if ambient.ndim else 1)
+	for start in range(0, steps, chunk_minutes):
+		stop = min(start + chunk_minutes, steps)
+		yield (np.ascontiguousarray(_chunk(load, start, stop)), np.ascontiguousarray(_chunk(ambient, start, stop)))
+
+
+def _chunk(profile, start, stop):
+	"""Rows [start, stop) of a time-major profile as a (units, steps) or (steps,) array; scalars are constant."""
+	if profile.ndim == 0:
+		return np.full(stop - start, float(profile))
+	return profile[start:stop].astype(np.float64).T
+
+
+def iter_npy(load_path, ambient=30.0, chunk_minutes=DEFAULT_CHUNK_MINUTES):
+	"""Chunks of .npy profiles read through memory maps: load (minutes,) or (minutes, units), ambient a path or °C."""
+	load = np.load(load_path, mmap_mode='r')
+	if isinstance(ambient, str):
+		ambient = np.load(ambient, mmap_mode='r')
+	return iter_arrays(load, ambient, chunk_minutes)
+
+
+def iter_csv(path, chunk_minutes=DEFAULT_CHUNK_MINUTES):
+	"""Chunks of a shared profile from a CSV file with 'load' and 'ambient' columns, one row per step."""
+	with open(path, newline='', encoding='utf-8-sig') as f:
+		reader = csv.reader(f)
+		header = [name.strip().lower() for name in next(reader, [])]
+		if 'load' not in header or 'ambient' not in header:
+			raise ValueError(f"{path} needs 'load' and 'ambient' columns.")
+		columns = (header.index('load'), header.index('ambient'))
+		while True:
+			rows = [row for _, row in zip(range(chunk_minutes), reader)]
+			if not rows:
+				return
+			values = np.array([[float(row[i]) for i in columns] for row in rows])
+			yield values[:, 0], values[:, 1]
+
+
+def run_cli(argv=None):
+	"""Simulate one unit, or every unit of a file of test records, through a load and ambient profile."""
+	import batch
+
+	parser = argparse.ArgumentParser(
+		prog='thermal.py', description='Hot-spot temperature, ageing and loss of life over a load profile.')
+	parser.add_argument('profile', help="per-unit load profile: .npy (minutes,) or (minutes, units), "
+		"or .csv with 'load' and 'ambient' columns")
+	units = parser.add_mutually_exclusive_group(required=True)
+	units.add_argument('--inputs', nargs=9, type=float, metavar=('S', 'V1', 'V2', 'VOC', 'IOC', 'POC', 'VSC', 'ISC', 'PSC'),
+		help='nameplate and test values of one unit')
+	units.add_argument('--fleet', metavar='RECORDS', help='.csv or .parquet test records, one unit per row (as batch.py)')
+	parser.add_argument('--ambient', default='30', help='ambient °C, or a .npy profile (default: %(default)s; .npy only)')
+	parser.add_argument('--step', type=float, default=DEFAULT_STEP_MINUTES, help='profile step in minutes (default: %(default)s)')
+	parser.add_argument('--cooling', choices=COOLING_EXPONENTS, default='ONAN', help='cooling mode (default: %(default)s)')
+	parser.add_argument('--top-oil-rise', type=float, default=DEFAULT_TOP_OIL_RISE,
+		help='rated top-oil rise in °C (default: %(default)s)')
+	parser.add_argument('--hot-spot-gradient', type=float, default=DEFAULT_HOT_SPOT_GRADIENT,
+		help='rated hot-spot rise over top oil in °C (default: %(default)s)')
+	parser.add_argument('--oil-time-constant', type=float, default=DEFAULT_OIL_TIME_CONSTANT,
+		help='oil time constant in minutes (default: %(default)s)')
+	parser.add_argument('--winding-time-constant', type=float, default=DEFAULT_WINDING_TIME_CONSTANT,
+		help='winding time constant in minutes (default: %(default)s)')
+	args = parser.parse_args(argv)
+
+	try:
+		if args.inputs:
+			records = vectorized.evaluate(*(np.array([value]) for value in args.inputs))
+		else:
+			chunks = batch.iter_parquet(args.fleet) if batch.is_parquet(args.fleet) else batch.iter_csv(args.fleet)
+			parts = [inputs for _, inputs in chunks]
+			records = vectorized.evaluate(*(np.concatenate([part[name] for part in parts])
+											for name in vectorized.INPUT_FIELDS))
+		if not records.valid.all():
+			raise ValueError(f"{np.count_nonzero(~records.valid)} unit(s) have invalid test records.")
+		parameters = ThermalParameters.from_batch(
+			records, top_oil_rise=args.top_oil_rise, hot_spot_gradient=args.hot_spot_gradient,
+			oil_time_constant=args.oil_time_constant, winding_time_constant=args.winding_time_constant,
+			cooling=args.cooling)
+		if args.profile.lower().endswith('.csv'):
+			profiles = iter_csv(args.profile)
+		else:
+			ambient = args.ambient if args.ambient.lower().endswith('.npy') else float(args.ambient)
+			profiles = iter_npy(args.profile, ambient)
+		result = simulate(parameters, profiles, args.step)
+	except (OSError, ValueError) as e:
+		print(f"Error: {e}", file=sys.stderr)
+		return 1
+	count = np.size(result.aged_hours)
+	print(f"{result.hours / 8760:.2f} years of profile, {count} unit(s)")
+	print(f"{'unit':>6} {'peak oil °C':>12} {'peak HS °C':>11} {'F_EQA':>9} {'aged h':>11} {'loss of life':>13}")
+	for i in range(count):
+		print(f"{i:>6} {result.peak_top_oil[i]:>12.1f} {result.peak_hot_spot[i]:>11.1f} "
+			  f"{result.equivalent_ageing_factor[i]:>9.4f} {result.aged_hours[i]:>11.1f} "
+			  f"{result.loss_of_life_percent[i]:>12.4f}%")
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(run_cli())
@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""Monte Carlo propagation of test-instrument errors through the equivalent-circuit calculation."""
+import math
+
+import numpy as np
+
+import vectorized
+
+
+# Limits of error of the test instruments, in percent of reading (accuracy class)
+DEFAULT_ACCURACY = {'voc': 0.5, 'ioc': 0.5, 'poc': 1.0, 'vsc': 0.5, 'isc': 0.5, 'psc': 1.0}
+
+DEFAULT_SAMPLES = 1000000
+DEFAULT_CHUNK_SIZE = 100000
+DEFAULT_CONFIDENCE = 0.95
+
+# Bins per output histogram; quantiles are resolved to 1/HISTOGRAM_BINS of the sampled range
+HISTOGRAM_BINS = 4096
+
+DISTRIBUTIONS = ('uniform', 'normal')
+
+
+class StreamingHistogram:
+	"""Equal-width histogram with a fixed number of bins whose range doubles as samples require.
+
+	Memory does not depend on how many values are added, and quantiles are
+	accurate to one bin width.
+	"""
+	def __init__(self, bins=HISTOGRAM_BINS):
+		self.bins = bins
+		self.counts = np.zeros(bins, dtype=np.int64)
+		self.low = None
+		self.width = None
+		self.min = math.inf
+		self.max = -math.inf
+
+	def add(self, values):
+		"""Add the finite entries of an array."""
+		values = values[np.isfinite(values)]
+		if not len(values):
+			return
+		lo = float(values.min())
+		hi = float(values.max())
+		self.min = min(self.min, lo)
+		self.max = max(self.max, hi)
+		if self.low is None:
+			self.low = lo
+			span = hi - lo
+			self.width = span / self.bins if span > 0 else max(abs(lo), 1.0) * 1e-12
+		while lo < self.low:
+			self._grow(downward=True)
+		while hi > self.low + self.width * self.bins:
+			self._grow(downward=False)
+		index = ((values - self.low) / self.width).astype(np.int64)
+		np.clip(index, 0, self.bins - 1, out=index)
+		self.counts += np.bincount(index, minlength=self.bins)
+
+	def _grow(self, downward):
+		"""Double the bin width by merging neighbouring bins, extending the range down or up."""
+		merged = self.counts.reshape(-1, 2).sum(axis=1)
+		self.counts = np.zeros(self.bins, dtype=np.int64)
+		half = self.bins // 2
+		if downward:
+			self.counts[half:] = merged
+			self.low -= self.width * self.bins
+		else:
+			self.counts[:half] = merged
+		self.width *= 2.0
+
+	def quantile(self, q):
+		"""Value below which a fraction q of the added values lie (None if there are none)."""
+		total = int(self.counts.sum())
+		if total == 0:
+			return None
+		cumulative = np.cumsum(self.counts)
+		target = q * total
+		i = min(int(np.searchsorted(cumulative, target)), self.bins - 1)
+		before = int(cumulative[i - 1]) if i else 0
+		fraction = (target - before) / self.counts[i] if self.counts[i] else 0.0
+		value = self.low + (i + fraction) * self.width
+		return float(min(max(value, self.min), self.max))
+
+
+class OutputUncertainty:
+	"""Sample statistics of one output: nominal value, mean, standard deviation and confidence interval."""
+	__slots__ = ('nominal', 'mean', 'std', 'low', 'high', 'count')
+
+	def __init__(self, nominal, mean, std, low, high, count):
+		self.nominal = nominal
+		self.mean = mean
+		self.std = std
+		self.low = low
+		self.high = high
+		self.count = count
+
+	def __repr__(self):
+		fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+		return f"{type(self).__name__}({fields})"
+
+	@property
+	def relative_half_width(self):
+		"""Half the interval width as a percentage of the nominal value (None if undefined)."""
+		if self.low is None or not self.nominal:
+			return None
+		return (self.high - self.low) / 2.0 / abs(self.nominal) * 100.0
+
+
+class UncertaintyResult:
+	"""Per-output statistics of a Monte Carlo run, keyed by vectorized.OUTPUT_FIELDS name."""
+	__slots__ = ('outputs', 'confidence', 'samples', 'valid', 'x_eq_clamped')
+
+	def __init__(self, outputs, confidence, samples, valid, x_eq_clamped):
+		self.outputs = outputs
+		self.confidence = confidence
+		self.samples = samples
+		# Samples the calculation accepted, and those where X_eq² < 0 was clamped to zero
+		self.valid = valid
+		self.x_eq_clamped = x_eq_clamped
+
+	def __repr__(self):
+		return (f"UncertaintyResult(samples={self.samples}, valid={self.valid}, "
+				f"x_eq_clamped={self.x_eq_clamped}, confidence={self.confidence})")
+
+	def __getitem__(self, name):
+		return self.outputs[name]
+
+	@property
+	def clamped_fraction(self):
+		"""Fraction of valid samples that fell into the X_eq clamp."""
+		return self.x_eq_clamped / self.valid if self.valid else 0.0
+
+
+class _Accumulator:
+	"""Running moments and histograms of every output, merged chunk by chunk."""
+	def __init__(self, fields):
+		self.fields = fields
+		self.histograms = {name: StreamingHistogram() for name in fields}
+		self.count = dict.fromkeys(fields, 0)
+		self.mean = dict.fromkeys(fields, 0.0)
+		self.m2 = dict.fromkeys(fields, 0.0)
+		self.samples = 0
+		self.valid = 0
+		self.x_eq_clamped = 0
+
+	def add(self, batch):
+		self.samples += len(batch)
+		self.valid += int(np.count_nonzero(batch.valid))
+		self.x_eq_clamped += int(np.count_nonzero(batch.x_eq_clamped))
+		for name in self.fields:
+			values = getattr(batch, name)
+			values = values[np.isfinite(values)]
+			n = len(values)
+			if not n:
+				continue
+			self.histograms[name].add(values)
+			# Chan et al. pairwise update of the mean and sum of squared deviations
+			mean = float(values.mean())
+			m2 = float(((values - mean) ** 2).sum())
+			total = self.count[name] + n
+			delta = mean - self.mean[name]
+			self.mean[name] += delta * n / total
+			self.m2[name] += m2 + delta * delta * self.count[name] * n / total
+			self.count[name] = total
+
+	def result(self, nominal, confidence):
+		tail = (1.0 - confidence) / 2.0
+		outputs = {}
+		for name in self.fields:
+			count = self.count[name]
+			histogram = self.histograms[name]
+			outputs[name] = OutputUncertainty(
+				nominal=nominal.get(name),
+				mean=self.mean[name] if count else None,
+				std=math.sqrt(self.m2[name] / (count - 1)) if count > 1 else None,
+				low=histogram.quantile(tail),
+				high=histogram.quantile(1.0 - tail),
+				count=count)
+		return UncertaintyResult(outputs, confidence, self.samples, self.valid, self.x_eq_clamped)
+
+
+def _nominal(values):
+	batch = vectorized.evaluate(*(np.array([v], dtype=np.float64) for v in values))
+	return {name: float(getattr(batch, name)[0]) if np.isfinite(getattr(batch, name)[0]) else None
+			for name in vectorized.OUTPUT_FIELDS}
+
+
+def _draw(rng, value, limit, n, distribution):
+	"""n readings of a true value through an instrument with the given limit of error (percent)."""
+	if distribution == 'uniform':
+		error = rng.uniform(-1.0, 1.0, n)
+	else:
+		# Same standard deviation as the rectangular distribution: limit / sqrt(3)
+		error = rng.standard_normal(n) / math.sqrt(3.0)
+	return value * (1.0 + limit / 100.0 * error)
+
+
+def propagate(power, vp, vs, voc, ioc, poc, vsc, isc, psc, accuracy=None, samples=DEFAULT_SAMPLES,
+			  confidence=DEFAULT_CONFIDENCE, distribution='uniform', seed=None,
+			  chunk_size=DEFAULT_CHUNK_SIZE, progress=None, partial=None):
+	"""Confidence intervals of every output under instrument errors, by Monte Carlo sampling.
+
+	accuracy maps input names to limits of error in percent of reading (default
+	DEFAULT_ACCURACY; inputs not listed are exact). Errors are rectangular
+	within the limits, or normal with the same standard deviation. Samples are
+	drawn and evaluated chunk_size at a time, so memory does not grow with
+	samples. progress, if given, is called with (samples done, samples); partial,
+	if given, with the UncertaintyResult so far after each chunk.
+	"""
+	if distribution not in DISTRIBUTIONS:
+		raise ValueError(f"Unknown distribution '{distribution}' (expected one of {', '.join(DISTRIBUTIONS)}).")
+	if not 0.0 < confidence < 1.0:
+		raise ValueError('Confidence must be between 0 and 1.')
+	accuracy = DEFAULT_ACCURACY if accuracy is None else accuracy
+	for name in accuracy:
+		if name not in vectorized.INPUT_FIELDS:
+			raise ValueError(f"Unknown input '{name}'.")
+	values = (power, vp, vs, voc, ioc, poc, vsc, isc, psc)
+	nominal = _nominal(values)
+	rng = np.random.default_rng(seed)
+	accumulator = _Accumulator(vectorized.OUTPUT_FIELDS)
+	done = 0
+	while done < samples:
+		n = min(chunk_size, samples - done)
+		columns = [
+			_draw(rng, value, accuracy[name], n, distribution) if accuracy.get(name) else np.full(n, float(value))
+			for name, value in zip(vectorized.INPUT_FIELDS, values)]
+		accumulator.add(vectorized.evaluate(*columns))
+		done += n
+		if progress is not None:
+			progress(done, samples)
+		if partial is not None:
+			partial(accumulator.result(nominal, confidence))
+	return accumulator.result(nominal, confidence)
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+"""NumPy-vectorized evaluation of many transformers' OC/SC test records at once."""
+import numpy as np
+
+
+# Input columns, in the same order as engine.calculate()
+INPUT_FIELDS = ('power', 'vp', 'vs', 'voc', 'ioc', 'poc', 'vsc', 'isc', 'psc')
+INPUT_DTYPE = np.dtype([(name, np.float64) for name in INPUT_FIELDS])
+
+# Per-record error codes, in the order engine.calculate() checks them (0 = valid)
+OK = 0
+ERR_INPUT = 1       # Non-numeric, empty or non-finite input
+ERR_STEP_UP = 2     # Vs > Vp
+ERR_ZERO_VS = 3     # Vs == 0
+ERR_ZERO_SC = 4     # Vsc * Isc == 0
+ERR_ZERO_VOC = 5    # Voc == 0
+ERR_ZERO_OC = 6     # Voc * Ioc == 0
+
+ERROR_MESSAGES = {
+	OK: '',
+	ERR_INPUT: 'Please ensure all fields are numeric and not empty.',
+	ERR_STEP_UP: 'Only step-down transformers are permitted (Vs ≤ Vp).',
+	ERR_ZERO_VS: 'Secondary voltage cannot be zero.',
+	ERR_ZERO_SC: 'Vsc and Isc must be non-zero to compute power factor.',
+	ERR_ZERO_VOC: 'Voc cannot be zero.',
+	ERR_ZERO_OC: 'Voc and Ioc must be non-zero.',
+}
+
+# cos/sin of the 0.8 power factor angle used for the lagging and leading VR cases
+PF_08_COS = 0.8
+PF_08_SIN = 0.6
+
+# Float outputs of evaluate(), undefined entries are NaN
+OUTPUT_FIELDS = (
+	# Common parameters
+	'turns_ratio', 'i2_rated',
+	# Short-circuit test (series branch), primary side
+	'pf_sc', 'theta_sc_deg', 'z_eq_mag', 'r_eq', 'x_eq',
+	# Open-circuit test (excitation branch), primary side
+	'pf_oc', 'theta_oc_deg', 'y_phi_mag', 'g_phi', 'b_phi', 'r_c', 'x_m',
+	# Referred to secondary
+	'z_eq_mag_sec', 'r_eq_sec', 'x_eq_sec',
+	'y_phi_mag_sec', 'g_phi_sec', 'b_phi_sec', 'r_c_sec', 'x_m_sec',
+	# Voltage regulation at rated current
+	'v2_fl', 'vr', 'vr_08_lag', 'vr_08_lead',
+	# Efficiency at rated current and unity power factor
+	'p_in', 'p_out', 'p_cu', 'p_core', 'eta',
+)
+
+
+class BatchResult:
+	"""Column arrays of all outputs plus per-record validity masks."""
+	__slots__ = OUTPUT_FIELDS + ('error', 'valid', 'x_eq_clamped', 'has_r_c', 'has_x_m')
+
+	def __init__(self, **columns):
+		for name in self.__slots__:
+			setattr(self, name, columns[name])
+
+	def __len__(self):
+		return len(self.error)
+
+	def __getitem__(self, index):
+		"""Slice or mask every column at once."""
+		return BatchResult(**{name: getattr(self, name)[index] for name in self.__slots__})
+
+	def as_dict(self):
+		"""Return the columns as a dictionary of arrays."""
+		return {name: getattr(self, name) for name in self.__slots__}
+
+
+def full_load_voltage(vs, i2, r_eq_sec, x_eq_sec, cos_phi=1.0, sin_phi=0.0):
+	"""|V2,fl| = |V2,nl - Z_eq2 * I2| with I2 = i2 * (cos φ + j sin φ); broadcasts over all arguments."""
+	# Real arithmetic avoids building complex temporaries
+	re = vs - i2 * (r_eq_sec * cos_phi - x_eq_sec * sin_phi)
+	im = i2 * (r_eq_sec * sin_phi + x_eq_sec * cos_phi)
+	return np.hypot(re, im)
+
+
+def voltage_regulation(vs, v2_fl):
+	"""VR = (V_nl - V_fl) / V_fl * 100%, NaN where V_fl is zero."""
+	with np.errstate(divide='ignore', invalid='ignore'):
+		vr = (vs - v2_fl) / v2_fl * 100.0
+	return np.where(v2_fl != 0, vr, np.nan)
+
+
+def error_codes(power, vp, vs, voc, ioc, poc, vsc, isc, psc):
+	"""Per-record error code for the first failing validation, OK where the record is valid."""
+	error = np.zeros(np.broadcast(power, vp, vs, voc, ioc, poc, vsc, isc, psc).shape, dtype=np.int8)
+	finite = np.ones(error.shape, dtype=bool)
+	for column in (power, vp, vs, voc, ioc, poc, vsc, isc, psc):
+		finite &= np.isfinite(column)
+	# Assign in reverse order so the earliest failing check wins
+	checks = (
+		(ERR_ZERO_OC, voc * ioc == 0),
+		(ERR_ZERO_VOC, voc == 0),
+		(ERR_ZERO_SC, vsc * isc == 0),
+		(ERR_ZERO_VS, vs == 0),
+		(ERR_STEP_UP, vs > vp),
+		(ERR_INPUT, ~finite),
+	)
+	for code, failed in checks:
+		error[failed] = code
+	return error
+
+
+def evaluate(power, vp, vs, voc, ioc, poc, vsc, isc, psc):
+	"""Evaluate every record of the nine input arrays in one vectorized pass."""
+	power, vp, vs, voc, ioc, poc, vsc, isc, psc = (
+		np.asarray(column, dtype=np.float64) for column in (power, vp, vs, voc, ioc, poc, vsc, isc, psc))
+	error = error_codes(power, vp, vs, voc, ioc, poc, vsc, isc, psc)
+	valid = error == OK
+
+	with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+		turns_ratio = vp / vs
+		a_squared = turns_ratio * turns_ratio
+
+		# SHORT-CIRCUIT TEST
+		pf_sc = psc / (vsc * isc)
+		pf_sc_clamped = np.clip(pf_sc, -1.0, 1.0)
+		theta_sc_deg = np.degrees(np.arccos(pf_sc_clamped))
+		z_eq_mag = vsc / isc
+		r_eq = psc / (isc * isc)
+		x_eq_sq = z_eq_mag * z_eq_mag - r_eq * r_eq
+		x_eq_clamped = x_eq_sq < 0
+		x_eq = np.sqrt(np.maximum(x_eq_sq, 0.0))
+
+		# OPEN-CIRCUIT TEST
+		y_phi_mag = a_squared * ioc / voc
+		pf_oc = poc / (voc * ioc)
+		pf_oc_clamped = np.clip(pf_oc, -1.0, 1.0)
+		theta_oc_deg = np.degrees(np.arccos(pf_oc_clamped))
+		# cos(-θ) = PF and sin(-θ) = -sqrt(1 - PF²), so no trigonometry is needed
+		g_phi = np.abs(y_phi_mag) * pf_oc_clamped
+		b_phi = -y_phi_mag * np.sqrt(1.0 - pf_oc_clamped * pf_oc_clamped)
+		has_r_c = g_phi > 1e-12
+		has_x_m = np.abs(b_phi) > 1e-12
+		a_fourth = a_squared * a_squared
+		r_c = np.where(has_r_c, a_fourth / g_phi, np.nan)
+		x_m = np.where(has_x_m, a_fourth / np.abs(b_phi), np.nan)
+
+		# REFERRED PARAMETERS
+		z_eq_mag_sec = z_eq_mag / a_squared
+		r_eq_sec = r_eq / a_squared
+		x_eq_sec = x_eq / a_squared
+		y_phi_mag_sec = y_phi_mag / a_squared
+		g_phi_sec = g_phi / a_squared
+		b_phi_sec = b_phi / a_squared
+		r_c_sec = r_c / a_squared
+		x_m_sec = x_m / a_squared
+
+		# VOLTAGE REGULATION at rated current
+		i2_rated = power / vs
+		v2_fl = full_load_voltage(vs, i2_rated, r_eq_sec, x_eq_sec)
+		vr = voltage_regulation(vs, v2_fl)
+		vr_08_lag = voltage_regulation(vs, full_load_voltage(vs, i2_rated, r_eq_sec, x_eq_sec, PF_08_COS, -PF_08_SIN))
+		vr_08_lead = voltage_regulation(vs, full_load_voltage(vs, i2_rated, r_eq_sec, x_eq_sec, PF_08_COS, PF_08_SIN))
+
+		# EFFICIENCY at rated current and unity power factor
+		p_cu = i2_rated * i2_rated * r_eq_sec
+		p_core = vs * vs / r_c_sec
+		p_out = v2_fl * i2_rated
+		p_in = p_out + p_cu + p_core
+		eta = np.where(p_in != 0, p_out / p_in * 100.0, np.nan)
+
+	columns = {
+		'turns_ratio': turns_ratio, 'i2_rated': i2_rated,
+		'pf_sc': pf_sc, 'theta_sc_deg': theta_sc_deg, 'z_eq_mag': z_eq_mag, 'r_eq': r_eq, 'x_eq': x_eq,
+		'pf_oc': pf_oc, 'theta_oc_deg': theta_oc_deg, 'y_phi_mag': y_phi_mag, 'g_phi': g_phi, 'b_phi': b_phi,
+		'r_c': r_c, 'x_m': x_m,
+		'z_eq_mag_sec': z_eq_mag_sec, 'r_eq_sec': r_eq_sec, 'x_eq_sec': x_eq_sec,
+		'y_phi_mag_sec': y_phi_mag_sec, 'g_phi_sec': g_phi_sec, 'b_phi_sec': b_phi_sec,
+		'r_c_sec': r_c_sec, 'x_m_sec': x_m_sec,
+		'v2_fl': v2_fl, 'vr': vr, 'vr_08_lag': vr_08_lag, 'vr_08_lead': vr_08_lead,
+		'p_in': p_in, 'p_out': p_out, 'p_cu': p_cu, 'p_core': p_core, 'eta': eta,
+	}
+	# Invalid records carry NaN in every output rather than partial garbage
+	if not valid.all():
+		invalid = ~valid
+		for name in OUTPUT_FIELDS:
+			column = np.array(columns[name], dtype=np.float64, copy=True)
+			column[invalid] = np.nan
+			columns[name] = column
+	return BatchResult(
+		error=error, valid=valid,
+		x_eq_clamped=x_eq_clamped & valid, has_r_c=has_r_c & valid, has_x_m=has_x_m & valid,
+		**columns)
+
+
+def evaluate_records(records):
+	"""Evaluate a structured array (or any mapping of columns) with the INPUT_FIELDS names."""
+	return evaluate(*(records[name] for name in INPUT_FIELDS))
@@ -0,0 +1,308 @@
+# -*- coding: utf-8 -*-
+"""True RMS and real power of OC/SC test waveform captures, streamed from memory-mapped files."""
+import argparse
+import os
+import struct
+import sys
+
+import numpy as np
+
+import engine
+
+
+# Frames per chunk; each chunk is mapped, reduced and unmapped before the next
+DEFAULT_CHUNK_FRAMES = 1 << 20
+
+# Rising zero crossings closer together than 1 / DEFAULT_MAX_FREQUENCY are taken as noise
+DEFAULT_MAX_FREQUENCY = 1000.0
+
+# WAVE format tags
+_WAVE_FORMAT_PCM = 0x0001
+_WAVE_FORMAT_IEEE_FLOAT = 0x0003
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+RAW_EXTENSIONS = ('.bin', '.raw', '.dat')
+
+
+class Capture:
+	"""A multichannel sample file: interleaved frames of one dtype starting at a byte offset."""
+	__slots__ = ('path', 'sample_rate', 'channels', 'dtype', 'offset', 'frames', 'zero')
+
+	def __init__(self, path, sample_rate, channels, dtype, offset=0, frames=None, zero=0):
+		self.path = path
+		self.sample_rate = float(sample_rate)
+		self.channels = int(channels)
+		self.dtype = np.dtype(dtype)
+		self.offset = int(offset)
+		frame_bytes = self.dtype.itemsize * self.channels
+		available = max(os.path.getsize(path) - self.offset, 0) // frame_bytes
+		self.frames = available if frames is None else min(int(frames), available)
+		# Sample value of zero signal (128 for unsigned 8-bit PCM)
+		self.zero = zero
+
+	def __repr__(self):
+		return (f"Capture({self.path!r}, sample_rate={self.sample_rate:g}, channels={self.channels}, "
+				f"dtype={self.dtype.str!r}, frames={self.frames})")
+
+	@property
+	def seconds(self):
+		return self.frames / self.sample_rate
+
+	def read(self, start, stop):
+		"""Frames [start, stop) as a read-only (frames, channels) memory map of just that window."""
+		return np.memmap(self.path, dtype=self.dtype, mode='r', offset=self.offset + start * self.dtype.itemsize
+						 * self.channels, shape=(stop - start, self.channels))
+
+
+def open_raw(path, sample_rate, channels, dtype='<i2', offset=0):
+	"""Headerless capture of interleaved samples (offset skips a fixed-size header)."""
+	if sample_rate <= 0:
+		raise ValueError('Sample rate must be positive.')
+	if channels < 1:
+		raise ValueError('A capture needs at least one channel.')
+	return Capture(path, sample_rate, channels, dtype, offset)
+
+
+def _wave_dtype(format_tag, bits):
+	if format_tag == _WAVE_FORMAT_PCM:
+		if bits == 8:
+			return np.dtype('u1'), 128
+		if bits in (16, 32):
+			return np.dtype(f"<i{bits // 8}"), 0
+		raise ValueError(f"{bits}-bit PCM samples cannot be memory-mapped; record or convert to 16 or 32 bits.")
+	if format_tag == _WAVE_FORMAT_IEEE_FLOAT and bits in (32, 64):
+		return np.dtype(f"<f{bits // 8}"), 0
+	raise ValueError(f"Unsupported WAV sample format {format_tag:#06x} with {bits} bits.")
+
+
+def open_wav(path):
+	"""WAV (or RF64, for captures over 4 GB) file; only the header chunks are read."""
+	with open(path, 'rb') as f:
+		riff, _, wave = struct.unpack('<4sI4s', f.read(12))
+		if riff not in (b'RIFF', b'RF64') or wave != b'WAVE':
+			raise ValueError(f"{path} is not a WAV file.")
+		fmt = None
+		data_size_64 = None
+		while True:
+			header = f.read(8)
+			if len(header) < 8:
+				raise ValueError(f"{path} has no data chunk.")
+			chunk_id, size = struct.unpack('<4sI', header)
+			if chunk_id == b'ds64':
+				_, data_size_64 = struct.unpack('<QQ', f.read(16))
+				f.seek(size - 16, os.SEEK_CUR)
+			elif chunk_id == b'fmt ':
+				body = f.read(size)
+				format_tag, channels, sample_rate, _, _, bits = struct.unpack('<HHIIHH', body[:16])
+				if format_tag == _WAVE_FORMAT_EXTENSIBLE and len(body) >= 26:
+					# The sub-format GUID starts with the actual format tag
+					format_tag = struct.unpack('<H', body[24:26])[0]
+				fmt = (format_tag, channels, sample_rate, bits)
+			elif chunk_id == b'data':
+				if fmt is None:
+					raise ValueError(f"{path} has no fmt chunk before its data.")
+				if size == 0xFFFFFFFF and data_size_64 is not None:
+					size = data_size_64
+				format_tag, channels, sample_rate, bits = fmt
+				dtype, zero = _wave_dtype(format_tag, bits)
+				return Capture(path, sample_rate, channels, dtype, f.tell(), size // (dtype.itemsize * channels), zero)
+			else:
+				# Chunks are padded to an even size
+				f.seek(size + (size & 1), os.SEEK_CUR)
+
+
+def open_capture(path, sample_rate=None, channels=2, dtype='<i2', offset=0):
+	"""WAV file, or a raw capture (.bin/.raw/.dat) described by the other arguments."""
+	if os.path.splitext(path)[1].lower() in RAW_EXTENSIONS:
+		if sample_rate is None:
+			raise ValueError('Raw captures need a sample rate.')
+		return open_raw(path, sample_rate, channels, dtype, offset)
+	return open_wav(path)
+
+
+class WaveformMeasurement:
+	"""True RMS voltage and current and real power over the whole cycles of a capture."""
+	__slots__ = ('v_rms', 'i_rms', 'power', 'frequency', 'cycles', 'samples', 'seconds')
+
+	def __init__(self, v_rms, i_rms, power, frequency, cycles, samples, seconds):
+		self.v_rms = v_rms
+		self.i_rms = i_rms
+		self.power = power
+		self.frequency = frequency
+		self.cycles = cycles
+		self.samples = samples
+		self.seconds = seconds
+
+	def __repr__(self):
+		fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+		return f"{type(self).__name__}({fields})"
+
+	@property
+	def apparent_power(self):
+		return self.v_rms * self.i_rms
+
+	@property
+	def power_factor(self):
+		s = self.apparent_power
+		return self.power / s if s else None
+
+
+class _CycleSums:
+	"""Sums of v², i² and v·i, committed only at rising zero crossings of the voltage."""
+	def __init__(self, min_spacing):
+		self.min_spacing = min_spacing
+		self.committed = np.zeros(3)
+		self.committed_samples = 0
+		self.pending = np.zeros(3)
+		self.pending_samples = 0
+		self.cycles = 0
+		self.started = False
+		self.last_crossing = None
+		self.previous_positive = None
+
+	def _crossings(self, v, start):
+		"""Chunk-local indices of accepted rising crossings (a negative sample followed by a non-negative one)."""
+		positive = v >= 0.0
+		rising = np.flatnonzero(~positive[:-1] & positive[1:]) + 1
+		if self.previous_positive is not None and not self.previous_positive and positive[0]:
+			rising = np.concatenate(([0], rising))
+		self.previous_positive = bool(positive[-1])
+		accepted = []
+		for index in rising.tolist():
+			if self.last_crossing is None or start + index - self.last_crossing >= self.min_spacing:
+				accepted.append(index)
+				self.last_crossing = start + index
+		return accepted
+
+	@staticmethod
+	def _sums(v, i):
+		return np.array((np.dot(v, v), np.dot(i, i), np.dot(v, i)))
+
+	def add(self, v, i, start):
+		crossings = self._crossings(v, start)
+		if not crossings:
+			if self.started:
+				self.pending += self._sums(v, i)
+				self.pending_samples += len(v)
+			return
+		first, last = crossings[0], crossings[-1]
+		if self.started:
+			# The samples up to the first crossing complete the cycle in progress
+			self.committed += self.pending + self._sums(v[:first], i[:first])
+			self.committed_samples += self.pending_samples + first
+			self.cycles += 1
+		self.started = True
+		self.committed += self._sums(v[first:last], i[first:last])
+		self.committed_samples += last - first
+		self.cycles += len(crossings) - 1
+		self.pending = self._sums(v[last:], i[last:])
+		self.pending_samples = len(v) - last
+
+
+def measure(capture, voltage_channel=0, current_channel=1, voltage_scale=1.0, current_scale=1.0,
+			chunk_frames=DEFAULT_CHUNK_FRAMES, max_frequency=DEFAULT_MAX_FREQUENCY, progress=None):
+	"""Stream a capture chunk by chunk into true RMS voltage and current and real power.
+
+	Samples times the scales are volts and amperes. Only whole cycles count,
+	from the first to the last rising zero crossing of the voltage, so a partial
+	cycle at either end does not bias the result. Each chunk is mapped, reduced
+	and released in turn, so memory does not depend on the capture size.
+	progress, if given, is called with (frames done, frames).
+	"""
+	for channel in (voltage_channel, current_channel):
+		if not 0 <= channel < capture.channels:
+			raise ValueError(f"Channel {channel} does not exist in a {capture.channels}-channel capture.")
+	sums = _CycleSums(capture.sample_rate / max_frequency)
+	for start in range(0, capture.frames, chunk_frames):
+		stop = min(start + chunk_frames, capture.frames)
+		block = capture.read(start, stop)
+		v = (block[:, voltage_channel].astype(np.float64) - capture.zero) * voltage_scale
+		i = (block[:, current_channel].astype(np.float64) - capture.zero) * current_scale
+		del block
+		sums.add(v, i, start)
+		if progress is not None:
+			progress(stop, capture.frames)
+	if sums.cycles == 0:
+		raise ValueError(f"{capture.path} does not contain a whole cycle of the voltage waveform.")
+	n = sums.committed_samples
+	sum_vv, sum_ii, sum_vi = sums.committed
+	seconds = n / capture.sample_rate
+	return WaveformMeasurement(
+		v_rms=float(np.sqrt(sum_vv / n)), i_rms=float(np.sqrt(sum_ii / n)), power=float(sum_vi / n),
+		frequency=sums.cycles / seconds, cycles=sums.cycles, samples=n, seconds=seconds)
+
+
+def test_inputs(open_circuit, short_circuit):
+	"""The six test values of engine.calculate() from open- and short-circuit WaveformMeasurements."""
+	return {
+		'voc': open_circuit.v_rms, 'ioc': open_circuit.i_rms, 'poc': open_circuit.power,
+		'vsc': short_circuit.v_rms, 'isc': short_circuit.i_rms, 'psc': short_circuit.power,
+	}
+
+
+def calculate(power, vp, vs, open_circuit, short_circuit):
+	"""engine.calculate() with the test values taken from open- and short-circuit WaveformMeasurements."""
+	return engine.calculate(power, vp, vs, **test_inputs(open_circuit, short_circuit))
+
+
+def measure_tests(open_circuit_path, short_circuit_path, progress=None, sample_rate=None, channels=2, dtype='<i2',
+				  offset=0, **kwargs):
+	"""Measure an open-circuit and a short-circuit capture; returns test_inputs() of the two.
+
+	sample_rate, channels, dtype and offset describe raw captures (see
+	open_capture()); kwargs go to measure(). progress, if given, is called with
+	(frames done, frames) over both captures.
+	"""
+	captures = [open_capture(path, sample_rate, channels, dtype, offset)
+				for path in (open_circuit_path, short_circuit_path)]
+	total = sum(capture.frames for capture in captures)
+	measurements = []
+	done = 0
+	for capture in captures:
+		report = None if progress is None else (lambda frames, _, base=done: progress(base + frames, total))
+		measurements.append(measure(capture, progress=report, **kwargs))
+		done += capture.frames
+	return test_inputs(*measurements)
+
+
+def run_cli(argv=None):
+	"""Print the test values reduced from two captures, and the equivalent circuit if nameplate values are given."""
+	parser = argparse.ArgumentParser(
+		prog='waveform.py', description='Reduce open- and short-circuit test waveform captures to RMS and power.')
+	parser.add_argument('open_circuit', help='open-circuit capture (.wav, or raw .bin/.raw/.dat)')
+	parser.add_argument('short_circuit', help='short-circuit capture')
+	parser.add_argument('--voltage-channel', type=int, default=0, help='voltage channel (default: %(default)s)')
+	parser.add_argument('--current-channel', type=int, default=1, help='current channel (default: %(default)s)')
+	parser.add_argument('--voltage-scale', type=float, default=1.0, help='volts per sample unit (default: %(default)s)')
+	parser.add_argument('--current-scale', type=float, default=1.0, help='amperes per sample unit (default: %(default)s)')
+	parser.add_argument('--sample-rate', type=float, help='raw captures: samples per second per channel')
+	parser.add_argument('--channels', type=int, default=2, help='raw captures: interleaved channels (default: %(default)s)')
+	parser.add_argument('--dtype', default='<i2', help='raw captures: NumPy sample type (default: %(default)s)')
+	parser.add_argument('--offset', type=int, default=0, help='raw captures: header bytes to skip (default: %(default)s)')
+	parser.add_argument('--nameplate', nargs=3, type=float, metavar=('S', 'V1', 'V2'),
+		help='also compute the equivalent circuit for this rating')
+	args = parser.parse_args(argv)
+
+	try:
+		measurements = []
+		for label, path in (('Open circuit', args.open_circuit), ('Short circuit', args.short_circuit)):
+			capture = open_capture(path, args.sample_rate, args.channels, args.dtype, args.offset)
+			m = measure(capture, args.voltage_channel, args.current_channel, args.voltage_scale, args.current_scale)
+			print(f"{label}: V = {m.v_rms:.6g} V, I = {m.i_rms:.6g} A, P = {m.power:.6g} W, PF = {m.power_factor:.4f}, "
+				  f"{m.cycles} cycles at {m.frequency:.3f} Hz")
+			measurements.append(m)
+		if args.nameplate:
+			result = calculate(*args.nameplate, *measurements)
+			for name in ('r_eq', 'x_eq', 'r_c', 'x_m'):
+				value = getattr(result, name)
+				print(f"{name} = {'undefined' if value is None else f'{value:.6g} Ω'}")
+			for message in result.warnings:
+				print(f"Warning: {message}", file=sys.stderr)
+	except (OSError, ValueError) as e:
+		print(f"Error: {e}", file=sys.stderr)
+		return 1
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(run_cli())